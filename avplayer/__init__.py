@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
 from avplayer.apps import av_main
-from avplayer.apps.defaults import AioApp, AioCv, AioTk, IoApp
+from avplayer.apps.base.av_io_batch_pool import AvIoBatchPool
+from avplayer.apps.base.av_io_pool import AvIoPool
+from avplayer.apps.defaults import AioApp, AioBatch, AioCv, AioPool, AioTk, IoApp
 from avplayer.av.av_io import AvIo
 from avplayer.avconfig import AvConfig
 
@@ -9,10 +11,14 @@ __version__ = "1.9.1"
 __all__ = [
     "__version__",
     "AioApp",
+    "AioBatch",
     "AioCv",
+    "AioPool",
     "AioTk",
     "AvConfig",
     "AvIo",
+    "AvIoBatchPool",
+    "AvIoPool",
     "IoApp",
     "av_main",
 ]
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+from typing import Optional
+
+from avplayer.av.av_frame_meta import FrameMeta
+from avplayer.debug.hist_stat import HistStat
+from avplayer.variables import (
+    DEFAULT_DROP_THRESHOLD,
+    DEFAULT_LATENCY_BUDGET,
+    DROP_POLICY_ADAPTIVE,
+    DROP_POLICY_KEYFRAME,
+    DROP_POLICY_NEWEST,
+    DROP_POLICY_NONE,
+    DROP_POLICY_OLDEST,
+)
+
+
+class DropPolicy:
+    """
+    Decides which frames are dropped when the callbacks are slower than decoding.
+
+    `admit()` is called by the decode thread before a frame is handed over to the
+    event loop, and `skip()` by the event loop before the callback of a frame starts.
+    Each of them counts its own drops, so no counter is written by two threads.
+
+    This base policy never drops a frame.
+    """
+
+    name = DROP_POLICY_NONE
+
+    def __init__(self, threshold=DEFAULT_DROP_THRESHOLD):
+        self._threshold = threshold
+        self._rejected = 0
+        self._skipped = 0
+
+    @property
+    def threshold(self) -> int:
+        return self._threshold
+
+    @property
+    def dropped(self) -> int:
+        return self._rejected + self._skipped
+
+    def admit(self, pending: int, meta: Optional[FrameMeta]) -> bool:
+        """
+        :param pending:
+            Frames handed over to the event loop and not yet emitted.
+        :return:
+            `False` if the new frame is dropped.
+        """
+
+        if self.should_reject(pending, meta):
+            self._rejected += 1
+            return False
+        return True
+
+    def skip(self, newer: int, meta: Optional[FrameMeta]) -> bool:
+        """
+        :param newer:
+            Frames handed over to the event loop after this one.
+        :return:
+            `True` if the frame is dropped instead of calling its callback.
+        """
+
+        if self.should_skip(newer, meta):
+            self._skipped += 1
+            return True
+        return False
+
+    def should_reject(self, pending: int, meta: Optional[FrameMeta]) -> bool:
+        return False
+
+    def should_skip(self, newer: int, meta: Optional[FrameMeta]) -> bool:
+        return False
+
+
+class DropNewestPolicy(DropPolicy):
+    """
+    Drops new frames while `threshold` frames are pending.
+    """
+
+    name = DROP_POLICY_NEWEST
+
+    def should_reject(self, pending: int, meta: Optional[FrameMeta]) -> bool:
+        return pending >= self._threshold
+
+
+class DropOldestPolicy(DropPolicy):
+    """
+    Skips the callback of a frame when `threshold` newer frames are waiting behind it,
+    so the callbacks catch up with the latest frames.
+    """
+
+    name = DROP_POLICY_OLDEST
+
+    def should_skip(self, newer: int, meta: Optional[FrameMeta]) -> bool:
+        return newer >= self._threshold
+
+
+class KeyframePolicy(DropNewestPolicy):
+    """
+    Like 'drop-newest', but keyframes are never dropped.
+    """
+
+    name = DROP_POLICY_KEYFRAME
+
+    def should_reject(self, pending: int, meta: Optional[FrameMeta]) -> bool:
+        if meta is not None and meta.keyframe:
+            return False
+        return super().should_reject(pending, meta)
+
+
+class AdaptivePolicy(DropPolicy):
+    """
+    Drops a new frame when its estimated latency exceeds the `budget`.
+
+    The estimate is the moving average of the callback durations, multiplied by
+    the callbacks that run before and including the new frame.
+    If `concurrency` is `None`, every pending callback runs at the same time
+    as the new one, so only the new callback counts.
+    A frame is always admitted when nothing is pending, so the average keeps updating.
+    """
+
+    name = DROP_POLICY_ADAPTIVE
+
+    def __init__(
+        self,
+        callback_stat: HistStat,
+        budget=DEFAULT_LATENCY_BUDGET,
+        concurrency: Optional[int] = 1,
+    ):
+        super().__init__()
+        self._callback_stat = callback_stat
+        self._budget = budget
+        self._concurrency = max(concurrency, 1) if concurrency is not None else None
+
+    @property
+    def budget(self) -> float:
+        return self._budget
+
+    def estimate(self, pending: int) -> float:
+        if self._concurrency is None:
+            return self._callback_stat.ewma
+        rounds = pending // self._concurrency + 1
+        return rounds * self._callback_stat.ewma
+
+    def should_reject(self, pending: int, meta: Optional[FrameMeta]) -> bool:
+        if pending <= 0:
+            return False
+        return self.estimate(pending) > self._budget
+
+
+def create_drop_policy(
+    name: str,
+    threshold=DEFAULT_DROP_THRESHOLD,
+    budget=DEFAULT_LATENCY_BUDGET,
+    callback_stat: Optional[HistStat] = None,
+    concurrency: Optional[int] = 1,
+) -> DropPolicy:
+    if name == DROP_POLICY_NONE:
+        return DropPolicy(threshold)
+    elif name == DROP_POLICY_NEWEST:
+        return DropNewestPolicy(threshold)
+    elif name == DROP_POLICY_OLDEST:
+        return DropOldestPolicy(threshold)
+    elif name == DROP_POLICY_KEYFRAME:
+        return KeyframePolicy(threshold)
+    elif name == DROP_POLICY_ADAPTIVE:
+        if callback_stat is None:
+            raise ValueError("The adaptive drop policy requires the callback stat")
+        return AdaptivePolicy(callback_stat, budget, concurrency)
+    else:
+        raise ValueError(f"Unknown drop policy: {name}")
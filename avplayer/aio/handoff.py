@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import AbstractEventLoop, Event, Task, get_running_loop
+from collections import deque
+from typing import Awaitable, Callable, Deque, Generic, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+
+class FrameHandoff(Generic[_T]):
+    """
+    Hands items from a producer thread to a single long-lived consumer task.
+
+    `put()` only appends to a deque, which needs no lock in CPython,
+    and wakes the event loop once for all the items appended until the consumer
+    drains them. The consumer awaits the items one by one, in order.
+    """
+
+    def __init__(self, consumer: Callable[[_T], Awaitable[None]]):
+        self._consumer = consumer
+        self._items: Deque[_T] = deque()
+        self._loop: Optional[AbstractEventLoop] = None
+        self._ready: Optional[Event] = None
+        self._task: Optional[Task] = None
+        self._wakeup_pending = False
+        self._closing = False
+        self._wakeups = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._items)
+
+    @property
+    def wakeups(self) -> int:
+        """
+        Number of times the producer has woken up the event loop.
+        """
+        return self._wakeups
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """
+        Starts the consumer task. Must be called from the event loop,
+        before the producer thread calls `put()`.
+        """
+
+        assert self._task is None
+        self._loop = get_running_loop()
+        self._ready = Event()
+        self._wakeup_pending = False
+        self._closing = False
+        self._task = self._loop.create_task(self._consume())
+
+    async def close(self) -> None:
+        """
+        Waits for the consumer task to drain the remaining items, then stops it.
+        Must be called after the producer thread has stopped calling `put()`.
+        """
+
+        if self._task is None:
+            return
+
+        assert self._ready is not None
+        self._closing = True
+        self._ready.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    def put(self, item: _T) -> Optional[_T]:
+        """
+        Called from the producer thread.
+
+        :return:
+            The item that the new item replaced, which was never consumed.
+        """
+
+        self._items.append(item)
+        self._wakeup()
+        return None
+
+    def _wakeup(self) -> None:
+        # The consumer clears the flag before draining, so an item appended
+        # after the flag was cleared always schedules another wakeup.
+        if self._wakeup_pending:
+            return
+        self._wakeup_pending = True
+        assert self._loop is not None
+        self._loop.call_soon_threadsafe(self._set_ready)
+
+    def _set_ready(self) -> None:
+        assert self._ready is not None
+        self._wakeups += 1
+        self._ready.set()
+
+    async def _consume(self) -> None:
+        assert self._ready is not None
+        ready = self._ready
+        items = self._items
+        consumer = self._consumer
+
+        while True:
+            await ready.wait()
+            ready.clear()
+            self._wakeup_pending = False
+
+            while items:
+                try:
+                    item = items.popleft()
+                except IndexError:
+                    # The producer replaced the item of a mailbox.
+                    break
+                await consumer(item)
+
+            if self._closing and not items:
+                break
+
+
+class LatestFrameHandoff(FrameHandoff[_T]):
+    """
+    A mailbox of a single item. An item that the consumer has not taken yet
+    is replaced by the newer one, so the consumer always gets the latest frame.
+    """
+
+    def put(self, item: _T) -> Optional[_T]:
+        replaced: Optional[_T] = None
+        try:
+            replaced = self._items.popleft()
+        except IndexError:
+            pass
+        self._items.append(item)
+        self._wakeup()
+        return replaced
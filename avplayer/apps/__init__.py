@@ -2,15 +2,24 @@
 
 from argparse import Namespace
 from asyncio.exceptions import CancelledError
+from typing import Optional
 
 from avplayer.apps.base.base import AppInterface
 from avplayer.apps.defaults import AioApp, AioCv, AioTk, IoApp
 from avplayer.avconfig import AvAppType, AvConfig
+from avplayer.debug.metrics import MetricsExporter
 from avplayer.logging.logging import logger
+from avplayer.variables import DEFAULT_METRICS_SOURCE_ID
 
 
 def create_app(config: AvConfig, coro=None) -> AppInterface:
     app_type = config.app_type
+    if config.stream_copy:
+        if coro is not None:
+            raise ValueError("Stream copy relays packets without a callback")
+        if app_type not in (AvAppType.IO, AvAppType.AIO):
+            raise ValueError(f"Stream copy is not supported by the {app_type.name} app")
+
     if app_type == AvAppType.IO:
         return IoApp(config, coro)
     elif app_type == AvAppType.AIO:
@@ -25,7 +34,12 @@ def create_app(config: AvConfig, coro=None) -> AppInterface:
 
 def default_main_with_config(config: AvConfig, coro=None) -> int:
     app = create_app(config, coro)
+    exporter: Optional[MetricsExporter] = None
     try:
+        if config.metrics_port:
+            exporter = MetricsExporter(config.metrics_host, config.metrics_port)
+            exporter.add_source(DEFAULT_METRICS_SOURCE_ID, app)
+            exporter.start()
         app.start()
     except CancelledError:
         logger.debug("An cancelled signal was detected")
@@ -41,6 +55,9 @@ def default_main_with_config(config: AvConfig, coro=None) -> int:
         return 1
     else:
         return 0
+    finally:
+        if exporter is not None:
+            exporter.stop()
 
 
 def av_main(args: Namespace, coro=None) -> int:
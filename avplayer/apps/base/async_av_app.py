@@ -1,111 +1,455 @@
 # -*- coding: utf-8 -*-
 
-from asyncio import AbstractEventLoop, get_running_loop, run_coroutine_threadsafe
+from asyncio import (
+    AbstractEventLoop,
+    Event,
+    Semaphore,
+    Task,
+    get_running_loop,
+    run_coroutine_threadsafe,
+    sleep,
+)
 from asyncio.exceptions import CancelledError
+from concurrent.futures import Executor
 from concurrent.futures.thread import ThreadPoolExecutor
-from datetime import datetime
 from functools import partial
-from typing import Optional
+from threading import Event as ThreadingEvent
+from time import perf_counter_ns
+from typing import Dict, Final, Optional, Set, Tuple
 
 from numpy import uint8
 from numpy.typing import NDArray
 from overrides import override
 
+from avplayer.aio.drop_policy import DropPolicy, create_drop_policy
+from avplayer.aio.handoff import FrameHandoff, LatestFrameHandoff
 from avplayer.aio.run import aio_run
 from avplayer.apps.base.av_app import AvApp
 from avplayer.apps.interface.av_interface import AsyncAvInterface
+from avplayer.av.av_frame_meta import FrameMeta, accepts_frame_meta
 from avplayer.avconfig import AvConfig
-from avplayer.debug.avg_stat import AvgStat
+from avplayer.debug.avg_stat import stat_name
+from avplayer.debug.frame_trace import TRACE_STAGE_CALLBACK, TRACE_STAGE_ENQUEUE
+from avplayer.debug.hist_stat import HistStat
+from avplayer.debug.metrics import Labels, MetricsWriter
 from avplayer.logging.logging import logger
+from avplayer.variables import (
+    DROP_POLICY_NEWEST,
+    DROP_POLICY_NONE,
+    HANDOFF_MODE_BATCH,
+    HANDOFF_MODE_LATEST,
+    HANDOFF_MODE_TASK,
+)
 from avplayer.variables import VERBOSE_LEVEL_1 as VL1
 from avplayer.variables import VERBOSE_LEVEL_2 as VL2
 
+CREDIT_WAIT_INTERVAL: Final[float] = 0.1
+"""Seconds between the checks of the 'done' flag while waiting for a credit.
+"""
+
+BACKOFF_WAIT_INTERVAL: Final[float] = 0.1
+"""Seconds between the checks of the 'done' flag while waiting for a reconnect.
+"""
+
+_HandoffItem = Tuple[NDArray[uint8], Optional[FrameMeta], int]
+_Reordered = Tuple[NDArray[uint8], Optional[NDArray[uint8]], Optional[int]]
+
 
 class AsyncAvApp(AvApp):
     _callback: Optional[AsyncAvInterface]  # type: ignore[assignment]
 
-    def __init__(self, config: AvConfig, callback: Optional[AsyncAvInterface] = None):
-        super().__init__(config, None)
+    def __init__(
+        self,
+        config: AvConfig,
+        callback: Optional[AsyncAvInterface] = None,
+        name: Optional[str] = None,
+    ):
+        super().__init__(config, None, name)
         self._callback = callback
+        # Callbacks opt in to the frame metadata with a `meta` parameter.
+        self._callback_meta = callback is not None and accepts_frame_meta(
+            callback.on_image
+        )
+        # The image is still in use by `_after()` when `AvIo.iter()` returns.
+        self._avio.auto_release = False
+        # `_pub` is only written by the decode thread, and `_sub` by the event loop.
         self._pub = 0
         self._sub = 0
+        self._handoff = self._create_handoff(self.config.handoff_mode)
+
+        self._max_in_flight = self.config.max_in_flight
+        self._slots: Optional[Semaphore] = None
+        self._drained: Optional[Event] = None
+        self._tasks: Set[Task] = set()
+        # Frames are emitted in the order they were enqueued,
+        # whatever order their callbacks complete in.
+        self._reordered: Dict[int, _Reordered] = dict()
+        self._next_ticket = 0
+        self._next_emit = 0
+
+        self._flow_credits = self.config.flow_credits
+        self._credit_returned = ThreadingEvent()
+        # Only a decode thread of its own can block, not a shared executor.
+        self._blocking_credits = False
 
         step = self.config.logging_step
         verbose = self.config.verbose
-        self._enqueue_step = AvgStat("Enqueue", logger, step, verbose, VL2)
-        self._callback_step = AvgStat("Callback", logger, step, verbose, VL2)
-        self._grab_stat = AvgStat("Grab", logger, step, verbose, VL2)
+        enqueue_name = stat_name("Enqueue", name)
+        handoff_name = stat_name("Handoff", name)
+        callback_name = stat_name("Callback", name)
+        grab_name = stat_name("Grab", name)
+        credit_name = stat_name("Credit", name)
+        self._enqueue_step = HistStat(enqueue_name, logger, step, verbose, VL2)
+        self._handoff_stat = HistStat(handoff_name, logger, step, verbose, VL2)
+        self._callback_step = HistStat(callback_name, logger, step, verbose, VL2)
+        self._grab_stat = HistStat(grab_name, logger, step, verbose, VL2)
+        self._credit_stat = HistStat(credit_name, logger, step, verbose, VL2)
+        self._drop_policy = self._create_drop_policy()
+
+    def _create_handoff(self, mode: str) -> Optional[FrameHandoff[_HandoffItem]]:
+        if mode == HANDOFF_MODE_TASK:
+            return None
+        elif mode == HANDOFF_MODE_BATCH:
+            return FrameHandoff(self._after_handoff)
+        elif mode == HANDOFF_MODE_LATEST:
+            return LatestFrameHandoff(self._after_handoff)
+        else:
+            raise ValueError(f"Unknown handoff mode: {mode}")
+
+    def _create_drop_policy(self) -> DropPolicy:
+        name = self.config.drop_policy
+        if name == DROP_POLICY_NONE and self.config.drop_slow_frame:
+            name = DROP_POLICY_NEWEST
+        return create_drop_policy(
+            name,
+            threshold=self.config.drop_threshold,
+            budget=self.config.latency_budget,
+            callback_stat=self._callback_step,
+            concurrency=self._callback_concurrency(),
+        )
+
+    def _callback_concurrency(self) -> Optional[int]:
+        """
+        Callbacks that can run at the same time, or `None` if there is no limit.
+        """
+
+        if self._max_in_flight > 0:
+            return self._max_in_flight
+        # Without a limit, every frame of the 'task' mode starts its callback at once.
+        return None if self._handoff is None else 1
+
+    @property
+    def drop_policy(self) -> DropPolicy:
+        return self._drop_policy
+
+    @property
+    def handoff(self) -> Optional[FrameHandoff[_HandoffItem]]:
+        """
+        The handoff to the consumer task, or `None` if each frame is a task.
+        """
+        return self._handoff
 
     @property
     def remain_frames(self) -> int:
-        assert self._pub >= self._sub
-        return self._pub - self._sub
+        # The metrics thread also reads the counters, so `_sub` is read first:
+        # `_pub` only grows, and a racing read must never go negative.
+        sub = self._sub
+        pub = self._pub
+        return max(pub - sub, 0)
 
     @property
     def is_slow_consumption(self) -> bool:
         return self.remain_frames >= self.config.drop_threshold
 
-    async def _after(self, image: NDArray[uint8], begin: datetime) -> None:
+    @property
+    def stats(self) -> Dict[str, HistStat]:
+        return {
+            "enqueue": self._enqueue_step,
+            "handoff": self._handoff_stat,
+            "callback": self._callback_step,
+            "grab": self._grab_stat,
+            "credit": self._credit_stat,
+        }
+
+    @override
+    def collect_metrics(self, writer: MetricsWriter, labels: Labels) -> None:
+        super().collect_metrics(writer, labels)
+        writer.stats(labels, self.stats)
+        writer.gauge(
+            "remain_frames",
+            "Frames enqueued to the event loop and not yet consumed",
+            labels,
+            self.remain_frames,
+        )
+        writer.counter(
+            "dropped_frames_total",
+            "Frames dropped by the drop policy",
+            dict(labels, policy=self._drop_policy.name),
+            self._drop_policy.dropped,
+        )
+        if self._handoff is not None:
+            writer.counter(
+                "handoff_wakeups_total",
+                "Wakeups of the event loop by the decode thread",
+                labels,
+                self._handoff.wakeups,
+            )
+
+    async def _after(
+        self,
+        image: NDArray[uint8],
+        meta: Optional[FrameMeta],
+        enqueued: int,
+        acquired=False,
+    ) -> None:
         """
         [IMPORTANT]
         await function calls should be reduced as much as possible.
+
+        :param acquired:
+            Whether the caller has already acquired a slot of `max_in_flight`.
         """
 
+        # Tasks start in the order they were enqueued, and so do the tickets.
+        ticket = self._next_ticket
+        self._next_ticket += 1
+
+        tracer = self._avio.tracer
+        pts = meta.pts if meta is not None else None
+        next_image: Optional[NDArray[uint8]] = None
         try:
-            self._enqueue_step.do_enter(begin)
-            self._enqueue_step.do_exit()
-
-            with self._callback_step:
-                try:
-                    if self._callback:
-                        # [IMPORTANT] --------------------------------------#
-                        # The callback must be the only await function call #
-                        next_image = await self._callback.on_image(image)
-                        # --------------------------------------------------#
+            # Newer frames arrive while this one waits for a slot,
+            # so the policy only decides once it could run.
+            slots = self._slots
+            if slots is not None and not acquired:
+                await slots.acquire()
+
+            if self._drop_policy.skip(self._pub - ticket - 1, meta):
+                if slots is not None:
+                    slots.release()
+                if tracer is not None:
+                    tracer.discard(pts)
+                return
+
+            callback_begin = perf_counter_ns()
+            self._enqueue_step.record(callback_begin - enqueued, callback_begin)
+            if tracer is not None:
+                tracer.stage(pts, TRACE_STAGE_ENQUEUE, enqueued, callback_begin)
+
+            # Coroutines interleave, so the begin time is kept locally.
+            try:
+                if self._callback:
+                    # [IMPORTANT] ------------------------------------------#
+                    # The callback must be the only await function call     #
+                    if self._callback_meta:
+                        on_image = self._callback.on_image
+                        coro = on_image(image, meta=meta)  # type: ignore[call-arg]
                     else:
-                        next_image = image
-                except BaseException as e:
-                    self._avio.latest_exception = e
+                        coro = self._callback.on_image(image)
+                    next_image = await coro
+                    # ------------------------------------------------------#
                 else:
-                    if next_image is None:
-                        return
-
-                    with self._grab_stat:
-                        try:
-                            self.on_grab(next_image)
-                        except BaseException as e:
-                            logger.exception(e)
-
-                    try:
-                        self.avio.send(next_image)
-                    except BaseException as e:
-                        self._avio.latest_exception = e
+                    next_image = image
+            except BaseException as e:
+                next_image = None
+                self._avio.latest_exception = e
+                if tracer is not None:
+                    tracer.discard(pts)
+            else:
+                if tracer is not None:
+                    tracer.stage(
+                        pts,
+                        TRACE_STAGE_CALLBACK,
+                        callback_begin,
+                        perf_counter_ns(),
+                    )
+            finally:
+                if slots is not None:
+                    slots.release()
+                callback_end = perf_counter_ns()
+                self._callback_step.record(callback_end - callback_begin, callback_end)
+                events = self._avio.trace_events
+                if events is not None:
+                    events.complete(
+                        TRACE_STAGE_CALLBACK,
+                        callback_begin,
+                        callback_end,
+                        {"pts": pts},
+                    )
         except BaseException as e:
             logger.exception(e)
         finally:
-            self._sub += 1
+            self._reordered[ticket] = image, next_image, pts
+            self._emit_in_order()
+
+    def _emit_in_order(self) -> None:
+        reordered = self._reordered
+        while self._next_emit in reordered:
+            image, next_image, pts = reordered.pop(self._next_emit)
+            self._next_emit += 1
+            try:
+                self._emit(next_image, pts)
+            except BaseException as e:
+                logger.exception(e)
+            finally:
+                self._avio.release_image(image)
+                self._sub += 1
+
+        if self._drained is not None:
+            self._drained.set()
+        if self._flow_credits > 0:
+            self._credit_returned.set()
+
+    def _emit(self, next_image: Optional[NDArray[uint8]], pts: Optional[int]) -> None:
+        if next_image is None:
+            if self._avio.tracer is not None:
+                self._avio.tracer.finish(pts)
+            return
+
+        with self._grab_stat:
+            try:
+                self.on_grab(next_image)
+            except BaseException as e:
+                logger.exception(e)
+
+        try:
+            self.avio.send(next_image, pts)
+        except BaseException as e:
+            self._avio.latest_exception = e
+
+    async def _after_handoff(self, item: _HandoffItem) -> None:
+        if self._slots is None:
+            await self._after(*item)
+            return
+
+        # The next frames keep waiting in the handoff until a slot is free.
+        await self._slots.acquire()
+        task = get_running_loop().create_task(self._after(*item, acquired=True))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
 
     def on_grab(self, image: NDArray[uint8]) -> None:
         pass
 
+    def _discard_image(self, image: NDArray[uint8], meta: Optional[FrameMeta]) -> None:
+        self._avio.discard_frame()
+        self._avio.release_image(image)
+        if self._avio.tracer is not None and meta is not None:
+            self._avio.tracer.discard(meta.pts)
+
     def _enqueue_on_image_coroutine(
         self, loop: AbstractEventLoop, image: NDArray[uint8]
     ) -> None:
-        if self.is_slow_consumption:
+        if self._blocking_credits:
+            self._wait_for_credit()
+
+        meta = self._avio.frame_meta
+        remain_frames = self.remain_frames
+        if remain_frames >= self.config.drop_threshold:
             if self.config.verbose >= VL1:
                 logger.warning(
-                    f"Frame consumption is slow. remain frame is {self.remain_frames}"
+                    f"Frame consumption is slow. remain frame is {remain_frames}"
                 )
-            if self.config.drop_slow_frame:
-                return
+        if not self._drop_policy.admit(remain_frames, meta):
+            self._discard_image(image, meta)
+            return
 
-        run_coroutine_threadsafe(self._after(image, datetime.now()), loop)
+        # Counted before the event loop can consume it.
         self._pub += 1
+        # The cost of the handoff to the event loop, paid by the decode thread.
+        with self._handoff_stat:
+            if self._handoff is not None:
+                replaced = self._handoff.put((image, meta, perf_counter_ns()))
+            else:
+                replaced = None
+                after = self._after(image, meta, perf_counter_ns())
+                run_coroutine_threadsafe(after, loop)
+
+        if replaced is not None:
+            # The new frame takes the place of the replaced one.
+            self._pub -= 1
+            self._discard_image(replaced[0], replaced[1])
+
+    def _wait_for_credit(self) -> None:
+        """
+        Blocks the decode thread while `flow_credits` frames are unconsumed.
+        """
+
+        credits = self._flow_credits
+        if credits <= 0 or self.remain_frames < credits:
+            return
+
+        returned = self._credit_returned
+        begin = perf_counter_ns()
+        while self.remain_frames >= credits and not self._avio.is_done_enabled:
+            returned.clear()
+            # A credit may have been returned before the flag was cleared.
+            if self.remain_frames < credits:
+                break
+            returned.wait(CREDIT_WAIT_INTERVAL)
+        end = perf_counter_ns()
+        self._credit_stat.record(end - begin, end)
+
+    async def _until_credit(self) -> None:
+        """
+        Like `_wait_for_credit()`, but waits in the event loop between the steps.
+        """
+
+        credits = self._flow_credits
+        if credits <= 0 or self.remain_frames < credits:
+            return
+
+        drained = self._drained
+        assert drained is not None
+        begin = perf_counter_ns()
+        while self.remain_frames >= credits:
+            drained.clear()
+            await drained.wait()
+        end = perf_counter_ns()
+        self._credit_stat.record(end - begin, end)
+
+    async def _until_backoff(self, delay: float) -> None:
+        """
+        Waits for the reconnect backoff in the event loop,
+        so that no thread of the shared executor sleeps in it.
+        """
+
+        loop = get_running_loop()
+        deadline = loop.time() + delay
+        while not self._avio.is_done_enabled:
+            remain = deadline - loop.time()
+            if remain <= 0:
+                break
+            await sleep(min(remain, BACKOFF_WAIT_INTERVAL))
+
+    def _start_consumers(self) -> None:
+        if self._max_in_flight > 0:
+            self._slots = Semaphore(self._max_in_flight)
+        self._drained = Event()
+        if self._handoff is not None:
+            self._handoff.start()
+
+    async def _close_consumers(self) -> None:
+        """
+        Waits until every enqueued frame is emitted, so that none of them
+        is sent after the output is closed.
+        """
+
+        if self._handoff is not None:
+            await self._handoff.close()
+
+        drained = self._drained
+        assert drained is not None
+        while self.remain_frames > 0:
+            drained.clear()
+            await drained.wait()
 
     async def _run_avio(self) -> None:
         executor = ThreadPoolExecutor(max_workers=1)
         try:
             loop = get_running_loop()
+            self._start_consumers()
+            self._blocking_credits = True
             await loop.run_in_executor(
                 executor,
                 self._avio.run,
@@ -121,6 +465,33 @@ class AsyncAvApp(AvApp):
             executor.shutdown(wait=True)
             logger.debug("Executor has terminated")
 
+            if self._drained is not None:
+                await self._close_consumers()
+
+    async def _run_avio_steps(self, executor: Executor) -> None:
+        """
+        Unlike `_run_avio`, each iteration is submitted to the executor separately,
+        so that one executor can be shared by several sources.
+        """
+
+        loop = get_running_loop()
+        coro = partial(self._enqueue_on_image_coroutine, loop)
+        self._start_consumers()
+        try:
+            while True:
+                delay = await loop.run_in_executor(executor, self._avio.step, coro)
+                if delay is None:
+                    break
+                if delay > 0:
+                    await self._until_backoff(delay)
+                await self._until_credit()
+        except CancelledError:
+            logger.debug("A 'cancel' signal was detected in the thread pool.")
+        finally:
+            if not self._avio.is_done_enabled:
+                self._avio.done()
+            await self._close_consumers()
+
     async def _until_avio_complete(self) -> None:
         self._avio.open()
         try:
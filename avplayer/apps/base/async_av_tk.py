@@ -21,6 +21,7 @@ from avplayer.aio.run import aio_run
 from avplayer.apps.base.async_av_app import AsyncAvApp
 from avplayer.apps.interface.av_interface import AsyncAvTckInterface
 from avplayer.avconfig import AvConfig
+from avplayer.ffmpeg.ffmpeg import PIXEL_FORMAT_BGR24
 from avplayer.logging.logging import logger
 from avplayer.variables import VERBOSE_LEVEL_1 as VL1
 from avplayer.variables import VERBOSE_LEVEL_2 as VL2
@@ -340,8 +341,11 @@ class AsyncAvTk(AsyncAvApp):
             try:
                 if self._callback:
                     image = self._callback.on_grap(image)
-                if len(image.shape) == 3:
+                if self._avio.pixel_format == PIXEL_FORMAT_BGR24:
                     image = image[:, :, ::-1]
+                if self._avio.frame_pool is not None:
+                    # The queued image outlives the pooled buffer.
+                    image = image.copy()
                 self._image_queue.put_nowait(image)
             except QueueFull:
                 if self.config.verbose >= VL1:
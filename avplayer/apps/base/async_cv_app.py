@@ -10,7 +10,9 @@ from avplayer.apps.base.async_av_app import AsyncAvApp
 from avplayer.apps.base.base import AppBase
 from avplayer.apps.interface.av_interface import AsyncAvInterface, AsyncCvInterface
 from avplayer.avconfig import AvConfig
+from avplayer.debug.metrics import Labels, MetricsWriter
 from avplayer.logging.logging import logger
+from avplayer.mp.process_callback_pool import ProcessCallbackPool
 
 
 class AsyncCvApp(AppBase, AsyncAvInterface):
@@ -31,6 +33,7 @@ class AsyncCvApp(AppBase, AsyncAvInterface):
         self._exit_codes = self._config.cv_exit_codes
         self._manually_done = False
         self._app = None
+        self._process_callback: Optional[ProcessCallbackPool] = None
 
     @property
     def config(self):
@@ -51,6 +54,13 @@ class AsyncCvApp(AppBase, AsyncAvInterface):
         else:
             return self._cv2.WINDOW_NORMAL
 
+    @override
+    def collect_metrics(self, writer: MetricsWriter, labels: Labels) -> None:
+        # The app is recreated on every reboot.
+        app = self._app
+        if app is not None:
+            app.collect_metrics(writer, labels)
+
     def done(self) -> None:
         self._manually_done = True
         if self._app is not None:
@@ -85,6 +95,12 @@ class AsyncCvApp(AppBase, AsyncAvInterface):
             if self._callback is not None:
                 self._callback.on_reboot(reason)
 
+    def run(self) -> None:
+        if self._config.cv_infinity:
+            self.run_av_app_infinitely()
+        else:
+            self.run_av_app()
+
     @override
     def start(self) -> None:
         if not self._config.cv_headless:
@@ -93,10 +109,11 @@ class AsyncCvApp(AppBase, AsyncAvInterface):
             self._cv2.namedWindow(self.title, self.flags)
 
         try:
-            if self._config.cv_infinity:
-                self.run_av_app_infinitely()
+            if self._process_callback is not None:
+                with self._process_callback:
+                    self.run()
             else:
-                self.run_av_app()
+                self.run()
         finally:
             if not self._config.cv_headless:
                 self._cv2.destroyWindow(self.title)
@@ -113,7 +130,9 @@ class AsyncCvApp(AppBase, AsyncAvInterface):
 
     @override
     async def on_image(self, image: NDArray[uint8]) -> Optional[NDArray[uint8]]:
-        if self._callback is not None:
+        if self._process_callback is not None:
+            preview = await self._process_callback.apply(image)
+        elif self._callback is not None:
             preview = self._callback.on_frame(image)
         else:
             preview = image
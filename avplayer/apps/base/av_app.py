@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from functools import partial
 from typing import Optional
 
 from numpy import uint8
@@ -10,15 +11,25 @@ from avplayer.apps.base.base import AppBase
 from avplayer.apps.interface.av_interface import AvInterface
 from avplayer.av.av_io import AvIo
 from avplayer.avconfig import AvConfig
+from avplayer.debug.metrics import Labels, MetricsWriter
+from avplayer.logging.logging import logger
+from avplayer.mp.process_callback_pool import ProcessCallbackPool
 
 
 class AvApp(AppBase):
     _callback: Optional[AvInterface]
 
-    def __init__(self, config: AvConfig, callback: Optional[AvInterface] = None):
+    def __init__(
+        self,
+        config: AvConfig,
+        callback: Optional[AvInterface] = None,
+        name: Optional[str] = None,
+    ):
         super().__init__(config)
 
         self._callback = callback
+        self._name = name
+        self._process_callback: Optional[ProcessCallbackPool] = None
         self._avio = AvIo(
             source=self.config.input,
             output=self.config.output,
@@ -31,22 +42,77 @@ class AvApp(AppBase):
             destination_size=self.config.output_size,
             logging_step=self.config.logging_step,
             verbose=self.config.verbose,
+            name=name,
+            frame_pool_size=self.config.frame_pool_size,
+            pixel_format=self.config.pixel_format,
+            decode_mode=self.config.decode_mode,
+            analysis_fps=self.config.analysis_fps,
+            encode_queue_size=self.config.encode_queue_size,
+            encode_overflow=self.config.encode_overflow,
+            stream_copy=self.config.stream_copy,
+            encoder_profile=self.config.encoder_profile,
+            reconnect=self.config.reconnect,
+            reconnect_max_attempts=self.config.reconnect_max_attempts,
+            reconnect_backoff_min=self.config.reconnect_backoff_min,
+            reconnect_backoff_max=self.config.reconnect_backoff_max,
+            index_cache=self.config.index_cache,
+            index_cache_dir=self.config.index_cache_dir,
+            latency_trace=self.config.latency_trace,
+            trace_file=self.config.trace_file,
         )
 
+    @property
+    def name(self) -> Optional[str]:
+        return self._name
+
     @property
     def avio(self):
         return self._avio
 
+    @override
+    def collect_metrics(self, writer: MetricsWriter, labels: Labels) -> None:
+        self._avio.collect_metrics(writer, labels)
+
     def _callback_image(self, image: NDArray[uint8]) -> Optional[NDArray[uint8]]:
         if self._callback is not None:
             return self._callback.on_image(image)
         else:
             return image
 
+    def _push_process_callback(
+        self,
+        pool: ProcessCallbackPool,
+        image: NDArray[uint8],
+    ) -> None:
+        meta = self._avio.frame_meta
+        try:
+            pool.submit(image, meta.pts if meta is not None else None)
+        finally:
+            # The pool has its own copy of the image.
+            self._avio.release_image(image)
+
+        # The result is of a frame submitted earlier, so it is sent with its own pts.
+        if pool.is_full:
+            self._avio.send(*pool.pop_with_pts())
+
+    def _run_process_callback(self, pool: ProcessCallbackPool) -> None:
+        # Results are sent here instead of by `AvIo.iter()`.
+        self._avio.auto_release = False
+        with pool:
+            self._avio.run(partial(self._push_process_callback, pool))
+            try:
+                for result, pts in pool.drain_with_pts():
+                    self._avio.send(result, pts)
+            except BaseException as e:
+                logger.error(f"Drain error: {e}")
+
     def _avio_main(self) -> None:
         self._avio.open()
         try:
-            self._avio.run(self._callback_image)
+            if self._process_callback is not None:
+                self._run_process_callback(self._process_callback)
+            else:
+                self._avio.run(self._callback_image)
         finally:
             self._avio.close()
 
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import Future, Task, TimerHandle, create_task, get_running_loop
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from numpy import stack, uint8
+from numpy.typing import NDArray
+from overrides import override
+
+from avplayer.apps.base.av_io_pool import AvIoPool
+from avplayer.apps.interface.av_interface import (
+    AsyncAvBatchInterface,
+    AsyncAvPoolInterface,
+)
+from avplayer.avconfig import AvConfig
+from avplayer.variables import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_WAIT
+
+BatchResult = Optional[Union[NDArray[uint8], Sequence[Optional[NDArray[uint8]]]]]
+BatchCallback = Callable[[Sequence[str], NDArray[uint8]], Awaitable[BatchResult]]
+_BatchItem = Tuple[str, NDArray[uint8], Future]
+
+
+class FrameBatcher:
+    """
+    Collects images from several sources and stacks them into one array.
+
+    A batch is dispatched when `max_batch_size` images are ready,
+    or `max_wait` seconds after its first image arrived.
+    Images with different shapes are dispatched as separate batches.
+    Must be used on a single event loop.
+    """
+
+    def __init__(
+        self,
+        callback: BatchCallback,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        max_wait=DEFAULT_MAX_BATCH_WAIT,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("The maximum batch size must be greater than 0")
+        if max_wait < 0:
+            raise ValueError("The maximum wait must not be negative")
+
+        self._callback = callback
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._pending: List[_BatchItem] = list()
+        self._timer: Optional[TimerHandle] = None
+        self._tasks: Set[Task] = set()
+        self._batches = 0
+        self._images = 0
+
+    @property
+    def max_batch_size(self) -> int:
+        return self._max_batch_size
+
+    @property
+    def max_wait(self) -> float:
+        return self._max_wait
+
+    @property
+    def average_batch_size(self) -> float:
+        return self._images / self._batches if self._batches else 0.0
+
+    async def submit(
+        self, source_id: str, image: NDArray[uint8]
+    ) -> Optional[NDArray[uint8]]:
+        loop = get_running_loop()
+        future = loop.create_future()
+        self._pending.append((source_id, image, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, list()
+        groups: Dict[Tuple[int, ...], List[_BatchItem]] = dict()
+        for item in pending:
+            groups.setdefault(item[1].shape, list()).append(item)
+
+        for items in groups.values():
+            task = create_task(self._run_batch(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, items: List[_BatchItem]) -> None:
+        source_ids = [item[0] for item in items]
+        futures = [item[2] for item in items]
+        self._batches += 1
+        self._images += len(items)
+
+        try:
+            results = await self._callback(source_ids, stack([i[1] for i in items]))
+            if results is not None and len(results) != len(items):
+                raise ValueError(
+                    f"The batch result size ({len(results)}) "
+                    f"does not match the batch size ({len(items)})"
+                )
+        except BaseException as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, future in enumerate(futures):
+            if not future.done():
+                future.set_result(results[i] if results is not None else None)
+
+
+class AvIoBatchPool(AvIoPool, AsyncAvPoolInterface):
+    """
+    An `AvIoPool` that hands the images of all sources to a single
+    `on_batch` call as an (N, H, W, C) array.
+
+    The result of each image is sent to the output of its own source.
+    """
+
+    def __init__(
+        self,
+        configs: Mapping[str, AvConfig],
+        callback: Optional[AsyncAvBatchInterface] = None,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        max_wait=DEFAULT_MAX_BATCH_WAIT,
+        max_workers: Optional[int] = None,
+        use_uvloop=False,
+    ):
+        super().__init__(configs, self, max_workers, use_uvloop)
+        self._batch_callback = callback
+        self._batcher = FrameBatcher(self._on_batch, max_batch_size, max_wait)
+
+    @property
+    def batcher(self) -> FrameBatcher:
+        return self._batcher
+
+    async def _on_batch(
+        self, source_ids: Sequence[str], images: NDArray[uint8]
+    ) -> BatchResult:
+        if self._batch_callback is not None:
+            return await self._batch_callback.on_batch(source_ids, images)
+        else:
+            return images
+
+    @override
+    async def on_open(self) -> None:
+        if self._batch_callback is not None:
+            await self._batch_callback.on_open()
+
+    @override
+    async def on_close(self) -> None:
+        if self._batch_callback is not None:
+            await self._batch_callback.on_close()
+
+    @override
+    async def on_image(
+        self, source_id: str, image: NDArray[uint8]
+    ) -> Optional[NDArray[uint8]]:
+        return await self._batcher.submit(source_id, image)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import gather, get_running_loop
+from concurrent.futures import Executor
+from concurrent.futures.thread import ThreadPoolExecutor
+from os import cpu_count
+from typing import Dict, Mapping, Optional
+
+from numpy import uint8
+from numpy.typing import NDArray
+from overrides import override
+
+from avplayer.aio.run import aio_run
+from avplayer.apps.base.async_av_app import AsyncAvApp
+from avplayer.apps.base.base import AppInterface
+from avplayer.apps.interface.av_interface import (
+    AsyncAvInterface,
+    AsyncAvPoolInterface,
+)
+from avplayer.av.av_frame_meta import FrameMeta, accepts_frame_meta
+from avplayer.avconfig import AvConfig
+from avplayer.debug.metrics import Labels, MetricsWriter
+from avplayer.logging.logging import logger
+
+
+def default_pool_workers(sources: int) -> int:
+    return max(1, min(sources, cpu_count() or 1))
+
+
+class AvIoPoolSource(AsyncAvApp, AsyncAvInterface):
+    """
+    A single source of the `AvIoPool`.
+
+    The drop policy and statistics of `AsyncAvApp` are applied per source.
+    """
+
+    def __init__(
+        self,
+        source_id: str,
+        config: AvConfig,
+        callback: Optional[AsyncAvPoolInterface] = None,
+    ):
+        super().__init__(config, self, source_id)
+        self._source_id = source_id
+        self._pool_callback = callback
+        self._pool_callback_meta = callback is not None and accepts_frame_meta(
+            callback.on_image
+        )
+
+    @property
+    def source_id(self) -> str:
+        return self._source_id
+
+    @override
+    async def on_open(self) -> None:
+        pass
+
+    @override
+    async def on_close(self) -> None:
+        pass
+
+    @override
+    async def on_image(
+        self, image: NDArray[uint8], meta: Optional[FrameMeta] = None
+    ) -> Optional[NDArray[uint8]]:
+        if self._pool_callback is not None:
+            on_image = self._pool_callback.on_image
+            if self._pool_callback_meta:
+                return await on_image(
+                    self._source_id, image, meta=meta  # type: ignore[call-arg]
+                )
+            return await on_image(self._source_id, image)
+        else:
+            return image
+
+    async def run_with_executor(self, executor: Executor) -> None:
+        loop = get_running_loop()
+        await loop.run_in_executor(executor, self._avio.open)
+        try:
+            await self._run_avio_steps(executor)
+        finally:
+            await loop.run_in_executor(executor, self._avio.close)
+
+
+class AvIoPool(AppInterface):
+    """
+    Decode several sources in one process.
+
+    All sources share a single event loop and a core-sized thread pool.
+    Each decoding iteration is submitted to the pool separately,
+    so a source that is waiting for a packet occupies a worker only for
+    the duration of that read.
+    """
+
+    def __init__(
+        self,
+        configs: Mapping[str, AvConfig],
+        callback: Optional[AsyncAvPoolInterface] = None,
+        max_workers: Optional[int] = None,
+        use_uvloop=False,
+    ):
+        if not configs:
+            raise ValueError("At least one source is required")
+
+        self._callback = callback
+        if max_workers:
+            self._max_workers = max_workers
+        else:
+            self._max_workers = default_pool_workers(len(configs))
+        self._use_uvloop = use_uvloop
+        self._sources: Dict[str, AvIoPoolSource] = {
+            source_id: AvIoPoolSource(source_id, config, callback)
+            for source_id, config in configs.items()
+        }
+
+    @property
+    def sources(self) -> Mapping[str, AvIoPoolSource]:
+        return self._sources
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @override
+    def collect_metrics(self, writer: MetricsWriter, labels: Labels) -> None:
+        for source_id, source in self._sources.items():
+            source.collect_metrics(writer, dict(labels, source=source_id))
+
+    def done(self, source_id: Optional[str] = None) -> None:
+        if source_id is not None:
+            self._sources[source_id].avio.done()
+        else:
+            for source in self._sources.values():
+                source.avio.done()
+
+    async def _run_sources(self, executor: Executor) -> None:
+        sources = list(self._sources.values())
+        coros = [source.run_with_executor(executor) for source in sources]
+        results = await gather(*coros, return_exceptions=True)
+        for source, result in zip(sources, results):
+            if isinstance(result, BaseException):
+                logger.error(f"[{source.source_id}] Source error: {result}")
+
+    async def _until_complete(self) -> None:
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix="AvIoPool",
+        )
+        try:
+            if self._callback:
+                await self._callback.on_open()
+                try:
+                    await self._run_sources(executor)
+                finally:
+                    await self._callback.on_close()
+            else:
+                await self._run_sources(executor)
+        finally:
+            logger.debug("Wait for the pool executor to exit ...")
+            executor.shutdown(wait=True)
+            logger.debug("Pool executor has terminated")
+
+    @override
+    def start(self) -> None:
+        logger.info(f"Start avio pool: {len(self._sources)} sources")
+        logger.info(f"Pool workers: {self._max_workers}")
+        aio_run(self._until_complete(), self._use_uvloop)
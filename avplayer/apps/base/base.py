@@ -5,6 +5,7 @@ from abc import ABCMeta, abstractmethod
 from overrides import override
 
 from avplayer.avconfig import AvConfig
+from avplayer.debug.metrics import Labels, MetricsWriter
 from avplayer.ffmpeg.ffmpeg import (
     AUTOMATIC_DETECT_FILE_FORMAT,
     DEFAULT_FILE_FORMAT,
@@ -19,6 +20,9 @@ class AppInterface(metaclass=ABCMeta):
     def start(self) -> None:
         raise NotImplementedError
 
+    def collect_metrics(self, writer: MetricsWriter, labels: Labels) -> None:
+        pass
+
 
 class AppBase(AppInterface):
     def __init__(self, config: AvConfig):
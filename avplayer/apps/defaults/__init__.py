@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 
 from avplayer.apps.defaults.aio import AioApp
+from avplayer.apps.defaults.batch import AioBatch
 from avplayer.apps.defaults.cv import AioCv
 from avplayer.apps.defaults.io import IoApp
+from avplayer.apps.defaults.pool import AioPool
 from avplayer.apps.defaults.tk import AioTk
 
 __all__ = [
     "AioApp",
+    "AioBatch",
     "AioCv",
+    "AioPool",
     "IoApp",
     "AioTk",
 ]
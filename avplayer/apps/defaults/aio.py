@@ -9,6 +9,7 @@ from overrides import override
 
 from avplayer.apps.base.async_av_app import AsyncAvApp
 from avplayer.apps.interface.av_interface import AsyncAvInterface
+from avplayer.av.av_frame_meta import FrameMeta, accepts_frame_meta
 from avplayer.avconfig import AvConfig
 from avplayer.logging.logging import logger
 
@@ -17,6 +18,7 @@ class AioApp(AsyncAvApp, AsyncAvInterface):
     def __init__(self, config: AvConfig, coro=None):
         super().__init__(config, self)
         self._is_coroutine = iscoroutinefunction(coro)
+        self._coro_meta = coro is not None and accepts_frame_meta(coro)
         self._coro = coro
 
     @override
@@ -28,11 +30,17 @@ class AioApp(AsyncAvApp, AsyncAvInterface):
         logger.info("on_close()")
 
     @override
-    async def on_image(self, image: NDArray[uint8]) -> Optional[NDArray[uint8]]:
+    async def on_image(
+        self, image: NDArray[uint8], meta: Optional[FrameMeta] = None
+    ) -> Optional[NDArray[uint8]]:
         if self._coro is not None:
+            if self._coro_meta:
+                result = self._coro(image, meta=meta)
+            else:
+                result = self._coro(image)
             if self._is_coroutine:
-                return await self._coro(image)
+                return await result
             else:
-                return self._coro(image)
+                return result
         else:
             return image
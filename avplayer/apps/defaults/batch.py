@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from inspect import iscoroutinefunction
+from typing import Mapping, Optional, Sequence, Union
+
+from numpy import uint8
+from numpy.typing import NDArray
+from overrides import override
+
+from avplayer.apps.base.av_io_batch_pool import AvIoBatchPool
+from avplayer.apps.interface.av_interface import AsyncAvBatchInterface
+from avplayer.avconfig import AvConfig
+from avplayer.logging.logging import logger
+from avplayer.variables import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_WAIT
+
+
+class AioBatch(AvIoBatchPool, AsyncAvBatchInterface):
+    def __init__(
+        self,
+        configs: Mapping[str, AvConfig],
+        coro=None,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        max_wait=DEFAULT_MAX_BATCH_WAIT,
+        max_workers: Optional[int] = None,
+        use_uvloop=False,
+    ):
+        super().__init__(
+            configs, self, max_batch_size, max_wait, max_workers, use_uvloop
+        )
+        self._is_coroutine = iscoroutinefunction(coro)
+        self._coro = coro
+
+    @override
+    async def on_open(self) -> None:
+        logger.info("on_open()")
+
+    @override
+    async def on_close(self) -> None:
+        logger.info("on_close()")
+
+    @override
+    async def on_batch(
+        self, source_ids: Sequence[str], images: NDArray[uint8]
+    ) -> Optional[Union[NDArray[uint8], Sequence[Optional[NDArray[uint8]]]]]:
+        if self._coro is not None:
+            if self._is_coroutine:
+                return await self._coro(source_ids, images)
+            else:
+                return self._coro(source_ids, images)
+        else:
+            return images
@@ -10,12 +10,16 @@ from avplayer.apps.base.async_cv_app import AsyncCvApp
 from avplayer.apps.interface.av_interface import AsyncCvInterface
 from avplayer.avconfig import AvConfig
 from avplayer.logging.logging import logger
+from avplayer.mp.process_callback_pool import ProcessCallbackPool
 
 
 class AioCv(AsyncCvApp, AsyncCvInterface):
     def __init__(self, config: AvConfig, coro=None):
         super().__init__(config, self)
         self._coro = coro
+        if coro is not None and config.callback_processes > 0:
+            processes = config.callback_processes
+            self._process_callback = ProcessCallbackPool(coro, processes)
 
     @override
     async def on_open(self) -> None:
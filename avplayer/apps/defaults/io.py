@@ -10,12 +10,16 @@ from avplayer.apps.base.av_app import AvApp
 from avplayer.apps.interface.av_interface import AvInterface
 from avplayer.avconfig import AvConfig
 from avplayer.logging.logging import logger
+from avplayer.mp.process_callback_pool import ProcessCallbackPool
 
 
 class IoApp(AvApp, AvInterface):
     def __init__(self, config: AvConfig, coro=None):
         super().__init__(config, self)
         self._coro = coro
+        if coro is not None and config.callback_processes > 0:
+            processes = config.callback_processes
+            self._process_callback = ProcessCallbackPool(coro, processes)
 
     @override
     def on_open(self) -> None:
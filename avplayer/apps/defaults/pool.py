@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from inspect import iscoroutinefunction
+from typing import Mapping, Optional
+
+from numpy import uint8
+from numpy.typing import NDArray
+from overrides import override
+
+from avplayer.apps.base.av_io_pool import AvIoPool
+from avplayer.apps.interface.av_interface import AsyncAvPoolInterface
+from avplayer.av.av_frame_meta import FrameMeta, accepts_frame_meta
+from avplayer.avconfig import AvConfig
+from avplayer.logging.logging import logger
+
+
+class AioPool(AvIoPool, AsyncAvPoolInterface):
+    def __init__(
+        self,
+        configs: Mapping[str, AvConfig],
+        coro=None,
+        max_workers: Optional[int] = None,
+        use_uvloop=False,
+    ):
+        super().__init__(configs, self, max_workers, use_uvloop)
+        self._is_coroutine = iscoroutinefunction(coro)
+        self._coro_meta = coro is not None and accepts_frame_meta(coro)
+        self._coro = coro
+
+    @override
+    async def on_open(self) -> None:
+        logger.info("on_open()")
+
+    @override
+    async def on_close(self) -> None:
+        logger.info("on_close()")
+
+    @override
+    async def on_image(
+        self,
+        source_id: str,
+        image: NDArray[uint8],
+        meta: Optional[FrameMeta] = None,
+    ) -> Optional[NDArray[uint8]]:
+        if self._coro is not None:
+            if self._coro_meta:
+                result = self._coro(source_id, image, meta=meta)
+            else:
+                result = self._coro(source_id, image)
+            if self._is_coroutine:
+                return await result
+            else:
+                return result
+        else:
+            return image
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Sequence, Union
 
 from numpy import uint8
 from numpy.typing import NDArray
@@ -57,3 +57,35 @@ class AsyncCvInterface(AsyncAvInterface):
     @abstractmethod
     def on_frame(self, image: NDArray[uint8]) -> Optional[NDArray[uint8]]:
         raise NotImplementedError
+
+
+class AsyncAvPoolInterface(ABC):
+    @abstractmethod
+    async def on_open(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def on_close(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def on_image(
+        self, source_id: str, image: NDArray[uint8]
+    ) -> Optional[NDArray[uint8]]:
+        raise NotImplementedError
+
+
+class AsyncAvBatchInterface(ABC):
+    @abstractmethod
+    async def on_open(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def on_close(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def on_batch(
+        self, source_ids: Sequence[str], images: NDArray[uint8]
+    ) -> Optional[Union[NDArray[uint8], Sequence[Optional[NDArray[uint8]]]]]:
+        raise NotImplementedError
@@ -1,23 +1,46 @@
 # -*- coding: utf-8 -*-
 
-from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
+from argparse import Action, ArgumentParser, Namespace, RawDescriptionHelpFormatter
 from functools import lru_cache
 from typing import Final, List, Optional
 
+from avplayer.ffmpeg.ffmpeg import DEFAULT_PIXEL_FORMAT, IMAGE_PIXEL_FORMATS
 from avplayer.logging.logging import SEVERITIES, SEVERITY_NAME_INFO
 from avplayer.variables import (
     APP_TYPES,
+    DECODE_MODES,
+    DEFAULT_ANALYSIS_FPS,
     DEFAULT_APP,
     DEFAULT_AV_OPEN_TIMEOUT,
     DEFAULT_AV_READ_TIMEOUT,
+    DEFAULT_CALLBACK_PROCESSES,
     DEFAULT_CV_EXIT_KEYS,
+    DEFAULT_DECODE_MODE,
+    DEFAULT_DROP_POLICY,
     DEFAULT_DROP_THRESHOLD,
+    DEFAULT_ENCODE_OVERFLOW,
+    DEFAULT_ENCODE_QUEUE_SIZE,
+    DEFAULT_ENCODER_PROFILE,
+    DEFAULT_FLOW_CREDITS,
+    DEFAULT_FRAME_POOL_SIZE,
+    DEFAULT_HANDOFF_MODE,
     DEFAULT_IO_BUFFER_SIZE,
+    DEFAULT_LATENCY_BUDGET,
     DEFAULT_LOGGING_STEP,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_METRICS_HOST,
+    DEFAULT_METRICS_PORT,
+    DEFAULT_RECONNECT_BACKOFF_MAX,
+    DEFAULT_RECONNECT_BACKOFF_MIN,
+    DEFAULT_RECONNECT_MAX_ATTEMPTS,
     DEFAULT_WIN_FPS,
     DEFAULT_WIN_GEOMETRY,
     DEFAULT_WIN_QUEUE_SIZE,
     DEFAULT_WIN_TITLE,
+    DROP_POLICIES,
+    ENCODE_OVERFLOWS,
+    ENCODER_PROFILE_NAMES,
+    HANDOFF_MODES,
 )
 
 PROG: Final[str] = "avplayer"
@@ -36,6 +59,9 @@ Examples:
     docker run --rm -it -e MTX_PROTOCOLS=tcp -p 8554:8554 bluenviron/mediamtx
     {PROG} -c -d -vv -o rtsp://localhost:8554/live rtsp://localhost:9999/live.sdp
     ffplay rtsp://localhost:8554/live
+
+  Benchmark the hot paths of this host:
+    {PROG} bench -o bench.json
 """
 
 
@@ -47,6 +73,22 @@ def version() -> str:
     return __version__
 
 
+class EncoderSelfCheckAction(Action):
+    """
+    Like the 'version' action, prints the encode fps of each profile and exits.
+    """
+
+    def __init__(self, option_strings, dest, help=None):  # noqa
+        super().__init__(option_strings, dest, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from avplayer.av.av_encoder_profile import self_check_encoder_profiles
+
+        for line in self_check_encoder_profiles():
+            print(line)
+        parser.exit()
+
+
 def default_argument_parser() -> ArgumentParser:
     parser = ArgumentParser(
         prog=PROG,
@@ -139,6 +181,112 @@ def default_argument_parser() -> ArgumentParser:
         metavar="{w}x{h}",
         help="Size of image to encode",
     )
+    parser.add_argument(
+        "--pixel-format",
+        choices=IMAGE_PIXEL_FORMATS,
+        default=DEFAULT_PIXEL_FORMAT,
+        help=f"Callback image pixel format (default: '{DEFAULT_PIXEL_FORMAT}')",
+    )
+    parser.add_argument(
+        "--decode-mode",
+        choices=DECODE_MODES,
+        default=DEFAULT_DECODE_MODE,
+        help=f"Frames to skip in the decoder (default: '{DEFAULT_DECODE_MODE}')",
+    )
+    parser.add_argument(
+        "--analysis-fps",
+        type=float,
+        default=DEFAULT_ANALYSIS_FPS,
+        metavar="fps",
+        help="Target frame rate of images to pass to callback. 0 passes all frames",
+    )
+    parser.add_argument(
+        "--callback-processes",
+        type=int,
+        default=DEFAULT_CALLBACK_PROCESSES,
+        metavar="num",
+        help="Run the callback in worker processes. 0 runs it in-process",
+    )
+    parser.add_argument(
+        "--encode-queue-size",
+        type=int,
+        default=DEFAULT_ENCODE_QUEUE_SIZE,
+        metavar="num",
+        help="Encode and write output in a dedicated thread. 0 encodes in-line",
+    )
+    parser.add_argument(
+        "--encode-overflow",
+        choices=ENCODE_OVERFLOWS,
+        default=DEFAULT_ENCODE_OVERFLOW,
+        help=f"Action on a full encode queue (default: '{DEFAULT_ENCODE_OVERFLOW}')",
+    )
+
+    parser.add_argument(
+        "--reconnect",
+        action="store_true",
+        default=False,
+        help="Reopen a failed input while keeping the output alive",
+    )
+    parser.add_argument(
+        "--reconnect-max-attempts",
+        type=int,
+        default=DEFAULT_RECONNECT_MAX_ATTEMPTS,
+        metavar="num",
+        help="Consecutive reconnect attempts before giving up. 0 retries forever",
+    )
+    parser.add_argument(
+        "--reconnect-backoff-min",
+        type=float,
+        default=DEFAULT_RECONNECT_BACKOFF_MIN,
+        metavar="sec",
+        help=f"Initial reconnect delay (default: {DEFAULT_RECONNECT_BACKOFF_MIN}s)",
+    )
+    parser.add_argument(
+        "--reconnect-backoff-max",
+        type=float,
+        default=DEFAULT_RECONNECT_BACKOFF_MAX,
+        metavar="sec",
+        help=f"Maximum reconnect delay (default: {DEFAULT_RECONNECT_BACKOFF_MAX}s)",
+    )
+
+    parser.add_argument(
+        "--index-cache",
+        action="store_true",
+        default=False,
+        help="Build and reuse a keyframe index cache for local file inputs",
+    )
+    parser.add_argument(
+        "--index-cache-dir",
+        default=None,
+        metavar="dir",
+        help="Directory of the index cache. By default, it is next to the input",
+    )
+
+    parser.add_argument(
+        "--latency-trace",
+        action="store_true",
+        default=False,
+        help="Trace each frame from demux to mux and log latency percentiles",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default=DEFAULT_METRICS_HOST,
+        metavar="host",
+        help=f"Metrics endpoint address (default: '{DEFAULT_METRICS_HOST}')",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=DEFAULT_METRICS_PORT,
+        metavar="port",
+        help="Serve Prometheus metrics on this port. If 0, it is disabled",
+    )
+    parser.add_argument(
+        "--trace-file",
+        default=None,
+        metavar="file",
+        help="Record the pipeline stages of each thread to a Chrome trace JSON file",
+    )
 
     parser.add_argument(
         "--timeout-open",
@@ -161,7 +309,34 @@ def default_argument_parser() -> ArgumentParser:
         metavar="bytes",
         help=f"AV IO buffer size (default: {DEFAULT_IO_BUFFER_SIZE} bytes)",
     )
+    parser.add_argument(
+        "--frame-pool-size",
+        type=int,
+        default=DEFAULT_FRAME_POOL_SIZE,
+        metavar="size",
+        help=(
+            "Number of reusable image buffers of the 4:2:0 pixel formats. "
+            "0 allocates an image for every frame"
+        ),
+    )
 
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        default=False,
+        help="Relay the input packets to the output without decoding and encoding",
+    )
+    parser.add_argument(
+        "--encoder-profile",
+        choices=ENCODER_PROFILE_NAMES,
+        default=DEFAULT_ENCODER_PROFILE,
+        help=f"Output encoder settings (default: '{DEFAULT_ENCODER_PROFILE}')",
+    )
+    parser.add_argument(
+        "--encoder-self-check",
+        action=EncoderSelfCheckAction,
+        help="Measure the encode fps of each encoder profile and exit",
+    )
     parser.add_argument(
         "--drop-slow-frame",
         action="store_true",
@@ -175,6 +350,56 @@ def default_argument_parser() -> ArgumentParser:
         metavar="size",
         help="Threshold for the number of buffering to drop waiting frames",
     )
+    parser.add_argument(
+        "--drop-policy",
+        choices=DROP_POLICIES,
+        default=DEFAULT_DROP_POLICY,
+        help=(
+            "Which frames are dropped when the callbacks are slow. "
+            "'--drop-slow-frame' selects 'drop-newest' if this is 'none' "
+            f"(default: '{DEFAULT_DROP_POLICY}')"
+        ),
+    )
+    parser.add_argument(
+        "--latency-budget",
+        type=float,
+        default=DEFAULT_LATENCY_BUDGET,
+        metavar="sec",
+        help=(
+            "Latency that the 'adaptive' drop policy keeps new frames within "
+            f"(default: {DEFAULT_LATENCY_BUDGET:.1f}s)"
+        ),
+    )
+    parser.add_argument(
+        "--handoff-mode",
+        choices=HANDOFF_MODES,
+        default=DEFAULT_HANDOFF_MODE,
+        help=(
+            "How decoded frames are passed to the event loop: "
+            "a task per frame, batches for a single consumer task, "
+            f"or only the latest frame (default: '{DEFAULT_HANDOFF_MODE}')"
+        ),
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        metavar="size",
+        help=(
+            "Number of image callbacks that can run concurrently. "
+            "Frames are still sent to the output in order"
+        ),
+    )
+    parser.add_argument(
+        "--flow-credits",
+        type=int,
+        default=DEFAULT_FLOW_CREDITS,
+        metavar="size",
+        help=(
+            "Number of unconsumed frames at which decoding pauses instead of "
+            "dropping frames, for file inputs (default: 0, never pause)"
+        ),
+    )
 
     parser.add_argument(
         "--win-geometry",
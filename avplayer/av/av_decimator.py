@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from fractions import Fraction
+from typing import Final, Optional
+
+DECIMATOR_TOLERANCE_RATIO: Final[float] = 0.01
+"""Tolerance for rounding errors of pts, as a ratio of the target interval.
+"""
+
+
+class PtsDecimator:
+    """
+    Selects frames from the presentation timestamp so that the selected frames
+    are evenly spaced at the target frame rate.
+
+    Frames without a timestamp are always selected.
+    If the timestamp jumps back or skips more than one interval
+    (e.g. a discontinuity), the schedule restarts from that frame.
+    """
+
+    def __init__(self, fps: float):
+        if fps <= 0:
+            raise ValueError("The target fps must be greater than 0")
+
+        self._fps = fps
+        self._interval = 1.0 / fps
+        self._tolerance = self._interval * DECIMATOR_TOLERANCE_RATIO
+        self._latest: Optional[float] = None
+        self._next: Optional[float] = None
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def reset(self) -> None:
+        self._latest = None
+        self._next = None
+
+    def accept(self, pts: Optional[int], time_base: Optional[Fraction]) -> bool:
+        if pts is None or time_base is None:
+            return True
+
+        seconds = float(pts * time_base)
+        latest = self._latest
+        self._latest = seconds
+
+        if self._next is None or latest is None or seconds < latest:
+            self._next = seconds + self._interval
+            return True
+
+        if seconds + self._tolerance < self._next:
+            return False
+
+        if seconds - self._next >= self._interval:
+            self._next = seconds + self._interval
+        else:
+            self._next += self._interval
+        return True
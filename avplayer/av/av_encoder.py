@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+from queue import Empty, Full, Queue
+from threading import Thread
+from time import perf_counter_ns
+from typing import Any, Callable, Optional, Tuple
+
+from avplayer.debug.avg_stat import stat_name
+from avplayer.debug.hist_stat import HistStat
+from avplayer.logging.logging import logger
+from avplayer.variables import (
+    ENCODE_OVERFLOW_BLOCK,
+    ENCODE_OVERFLOW_DROP_NEWEST,
+    ENCODE_OVERFLOW_DROP_OLDEST,
+    ENCODE_OVERFLOWS,
+)
+from avplayer.variables import VERBOSE_LEVEL_1 as VL1
+
+EncodeFunc = Callable[[Any], None]
+ErrorFunc = Callable[[BaseException], None]
+
+
+class EncoderThread:
+    """
+    Encodes and writes frames on a dedicated thread.
+
+    The producer only enqueues frames that it already owns (e.g. a `VideoFrame`
+    created from the callback image), so slow encoding or a stalled output never
+    blocks decoding. When the queue is full, `overflow` decides whether the
+    producer waits, the new frame is dropped, or the oldest waiting frame is dropped.
+    """
+
+    def __init__(
+        self,
+        encode: EncodeFunc,
+        queue_size: int,
+        overflow=ENCODE_OVERFLOW_BLOCK,
+        on_error: Optional[ErrorFunc] = None,
+        name: Optional[str] = None,
+        logging_step=100,
+        verbose=0,
+    ):
+        if queue_size <= 0:
+            raise ValueError("The encode queue size must be greater than 0")
+        if overflow not in ENCODE_OVERFLOWS:
+            raise ValueError(f"Unknown encode overflow policy: {overflow}")
+
+        self._encode = encode
+        self._on_error = on_error
+        self._overflow = overflow
+        self._queue: Queue[Optional[Tuple[Any, int]]] = Queue(queue_size)
+        self._thread: Optional[Thread] = None
+        self._exception: Optional[BaseException] = None
+        self._dropped_frames = 0
+        self._stop_wait = 0.1
+
+        step = logging_step
+        n = name
+        self._queue_stat = HistStat(
+            stat_name("EncodeQueue", n), logger, step, verbose, VL1
+        )
+
+    @property
+    def overflow(self) -> str:
+        return self._overflow
+
+    @property
+    def dropped_frames(self) -> int:
+        return self._dropped_frames
+
+    @property
+    def queue_stat(self) -> HistStat:
+        return self._queue_stat
+
+    @property
+    def pending_frames(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def exception(self) -> Optional[BaseException]:
+        return self._exception
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        assert self._thread is None
+        self._exception = None
+        self._dropped_frames = 0
+        self._thread = Thread(target=self._main, name="AvIoEncoder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Encodes all waiting frames and joins the thread.
+        """
+
+        if self._thread is None:
+            return
+
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=self._stop_wait)
+                break
+            except Full:
+                continue
+
+        self._thread.join()
+        self._thread = None
+
+        # Frames left behind by a failed thread are discarded.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except Empty:
+                break
+
+    def put(self, frame: Any) -> bool:
+        """
+        Returns `False` if a frame was dropped by the overflow policy.
+        """
+
+        if self._exception is not None:
+            raise RuntimeError("The encoder thread has failed") from self._exception
+
+        item = frame, perf_counter_ns()
+
+        if self._overflow == ENCODE_OVERFLOW_DROP_NEWEST:
+            try:
+                self._queue.put_nowait(item)
+                return True
+            except Full:
+                self._dropped_frames += 1
+                return False
+
+        if self._overflow == ENCODE_OVERFLOW_DROP_OLDEST:
+            dropped = False
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return not dropped
+                except Full:
+                    try:
+                        self._queue.get_nowait()
+                        self._dropped_frames += 1
+                        dropped = True
+                    except Empty:
+                        pass
+
+        while True:
+            try:
+                self._queue.put(item, timeout=self._stop_wait)
+                return True
+            except Full:
+                if self._exception is not None:
+                    raise RuntimeError(
+                        "The encoder thread has failed"
+                    ) from self._exception
+                if not self.is_alive():
+                    raise RuntimeError("The encoder thread is not running")
+
+    def _main(self) -> None:
+        logger.debug("The encoder thread has started")
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            frame, begin = item
+            end = perf_counter_ns()
+            self._queue_stat.record(end - begin, end)
+
+            try:
+                self._encode(frame)
+            except BaseException as e:
+                logger.error(f"Encoder thread error: {e}")
+                self._exception = e
+                if self._on_error is not None:
+                    self._on_error(e)
+                break
+        logger.debug("The encoder thread has stopped")
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# mypy: disable-error-code="attr-defined"
+
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, Final, List, Optional
+
+from avplayer.ffmpeg.ffmpeg import (
+    CRF_DEFAULT,
+    CRF_SANE_RANGE_MAX,
+    CRF_VISUALLY_LOSSLESS,
+    DEFAULT_ENCODER_PIXEL_FORMAT,
+    PRESET_SLOW,
+    PRESET_ULTRAFAST,
+    PRESET_VERYFAST,
+    PROFILE_BASELINE,
+    PROFILE_HIGH,
+    TUNE_ZEROLATENCY,
+)
+from avplayer.variables import (
+    ENCODER_PROFILE_ARCHIVE,
+    ENCODER_PROFILE_DEFAULT,
+    ENCODER_PROFILE_LOWLATENCY,
+    ENCODER_PROFILE_THROUGHPUT,
+)
+
+SELF_CHECK_WIDTH: Final[int] = 1280
+SELF_CHECK_HEIGHT: Final[int] = 720
+SELF_CHECK_FRAMES: Final[int] = 120
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    name: str
+    """A unique, human-readable name.
+    """
+
+    codec: str = "libx264"
+    """Name of the encoder.
+    """
+
+    preset: Optional[str] = None
+    """Encoding speed to compression ratio preset.
+    """
+
+    tune: Optional[str] = None
+    """Tune the settings for a particular type of source or situation.
+    """
+
+    profile: Optional[str] = None
+    """Limit the output to a specific H.264 profile.
+    """
+
+    gop: Optional[int] = None
+    """Maximum number of frames between keyframes. Defaults to the encoder's.
+    """
+
+    crf: Optional[int] = None
+    """Constant rate factor. Ignored if `bitrate` is specified.
+    """
+
+    bitrate: Optional[int] = None
+    """Target bitrate in bits per second.
+    """
+
+    threads: Optional[int] = None
+    """Number of encoder threads. 0 selects it automatically.
+    """
+
+    sliced_threads: Optional[bool] = None
+    """Split each frame into slices that are encoded in parallel.
+    Unlike frame threads, it does not add a frame of latency per thread.
+    """
+
+    def options(self) -> Dict[str, str]:
+        """
+        Codec-private options to pass to the stream.
+        """
+
+        result = dict()
+        if self.preset:
+            result["preset"] = self.preset
+        if self.tune:
+            result["tune"] = self.tune
+        if self.profile:
+            result["profile"] = self.profile
+        if self.crf is not None and self.bitrate is None:
+            result["crf"] = str(self.crf)
+        return result
+
+    def as_logging_line(self) -> str:
+        return (
+            f"{self.name}: codec={self.codec},preset={self.preset},tune={self.tune},"
+            f"profile={self.profile},gop={self.gop},crf={self.crf},"
+            f"bitrate={self.bitrate},threads={self.threads},"
+            f"sliced_threads={self.sliced_threads}"
+        )
+
+
+ENCODER_PROFILES: Final[Dict[str, EncoderProfile]] = {
+    ENCODER_PROFILE_DEFAULT: EncoderProfile(
+        name=ENCODER_PROFILE_DEFAULT,
+        preset=PRESET_ULTRAFAST,
+        crf=CRF_SANE_RANGE_MAX,
+    ),
+    ENCODER_PROFILE_LOWLATENCY: EncoderProfile(
+        name=ENCODER_PROFILE_LOWLATENCY,
+        preset=PRESET_ULTRAFAST,
+        tune=TUNE_ZEROLATENCY,
+        profile=PROFILE_BASELINE,
+        gop=30,
+        crf=CRF_SANE_RANGE_MAX,
+        threads=0,
+        sliced_threads=True,
+    ),
+    ENCODER_PROFILE_THROUGHPUT: EncoderProfile(
+        name=ENCODER_PROFILE_THROUGHPUT,
+        preset=PRESET_VERYFAST,
+        gop=250,
+        crf=CRF_DEFAULT,
+        threads=0,
+        sliced_threads=False,
+    ),
+    ENCODER_PROFILE_ARCHIVE: EncoderProfile(
+        name=ENCODER_PROFILE_ARCHIVE,
+        preset=PRESET_SLOW,
+        profile=PROFILE_HIGH,
+        gop=250,
+        crf=CRF_VISUALLY_LOSSLESS,
+        threads=0,
+        sliced_threads=False,
+    ),
+}
+
+
+def get_encoder_profile(name: str) -> EncoderProfile:
+    try:
+        return ENCODER_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown encoder profile: {name}")
+
+
+def inject_encoder_profile(codec_context, profile: EncoderProfile) -> None:
+    from av.codec.context import CodecContext
+
+    assert isinstance(codec_context, CodecContext)
+
+    codec_context.options = profile.options()
+    if profile.gop is not None:
+        codec_context.gop_size = profile.gop
+    if profile.bitrate is not None:
+        codec_context.bit_rate = profile.bitrate
+    if profile.threads is not None:
+        codec_context.thread_count = profile.threads
+    if profile.sliced_threads is not None:
+        # libx264 enables sliced threads when the thread type is 'SLICE'.
+        codec_context.thread_type = "SLICE" if profile.sliced_threads else "FRAME"
+
+
+def measure_encode_fps(
+    profile: EncoderProfile,
+    width=SELF_CHECK_WIDTH,
+    height=SELF_CHECK_HEIGHT,
+    frames=SELF_CHECK_FRAMES,
+    pixel_format=DEFAULT_ENCODER_PIXEL_FORMAT,
+) -> float:
+    """
+    Encodes synthetic frames without muxing them and returns the frames per second.
+    """
+
+    from fractions import Fraction
+
+    from numpy import arange, uint8
+
+    from av import CodecContext, VideoFrame
+
+    assert frames >= 1
+
+    codec_context = CodecContext.create(profile.codec, "w")
+    codec_context.width = width
+    codec_context.height = height
+    codec_context.pix_fmt = pixel_format
+    codec_context.time_base = Fraction(1, 30)
+    inject_encoder_profile(codec_context, profile)
+
+    # A moving gradient, so that the encoder has some motion to estimate.
+    gradient = (arange(width * height * 3 // 2) % 251).astype(uint8)
+    images = [gradient.reshape(height * 3 // 2, width)]
+    images.append(images[0][::-1].copy())
+
+    begin = perf_counter()
+    for i in range(frames):
+        frame = VideoFrame.from_ndarray(images[i % len(images)], format=pixel_format)
+        frame.pts = i
+        codec_context.encode(frame)
+    codec_context.encode(None)
+    return frames / (perf_counter() - begin)
+
+
+def self_check_encoder_profiles(
+    width=SELF_CHECK_WIDTH,
+    height=SELF_CHECK_HEIGHT,
+    frames=SELF_CHECK_FRAMES,
+) -> List[str]:
+    lines = [f"Encoder self-check ({width}x{height}, {frames} frames):"]
+    for name, profile in ENCODER_PROFILES.items():
+        try:
+            fps = measure_encode_fps(profile, width, height, frames)
+        except BaseException as e:
+            lines.append(f"  {name:<12} error: {e}")
+        else:
+            lines.append(f"  {name:<12} {fps:9.2f} fps")
+    return lines
@@ -1,5 +1,21 @@
 # -*- coding: utf-8 -*-
 
+from typing import Dict, Final
+
+from avplayer.variables import (
+    DECODE_MODE_ALL,
+    DECODE_MODE_BIDIR_SKIP,
+    DECODE_MODE_KEYFRAMES,
+    DECODE_MODE_NONREF_SKIP,
+)
+
+DECODE_MODE_SKIP_FRAMES: Final[Dict[str, str]] = {
+    DECODE_MODE_ALL: "DEFAULT",
+    DECODE_MODE_BIDIR_SKIP: "BIDIR",
+    DECODE_MODE_NONREF_SKIP: "NONREF",
+    DECODE_MODE_KEYFRAMES: "NONKEY",
+}
+
 
 def inject_go_faster_stream(stream) -> None:
     from av.stream import Stream
@@ -108,6 +124,34 @@ def inject_speedup_tricks_stream(stream) -> None:
     setattr(stream.codec_context, "flags2", "FAST")
 
 
+def inject_skip_frame_stream(stream, decode_mode: str) -> None:
+    from av.stream import Stream
+
+    assert isinstance(stream, Stream)
+    assert hasattr(stream.codec_context, "skip_frame")
+
+    if decode_mode not in DECODE_MODE_SKIP_FRAMES:
+        raise ValueError(f"Unknown decode mode: {decode_mode}")
+
+    # av/codec/context.pyx
+    # Possible values:
+    # NONE = lib.AVDISCARD_NONE
+    #    Discard nothing
+    # DEFAULT = lib.AVDISCARD_DEFAULT
+    #    Discard useless packets like 0 size packets in AVI
+    # NONREF = lib.AVDISCARD_NONREF
+    #    Discard all non reference
+    # BIDIR = lib.AVDISCARD_BIDIR
+    #    Discard all bidirectional frames
+    # NONINTRA = lib.AVDISCARD_NONINTRA
+    #    Discard all non intra frames
+    # NONKEY = lib.AVDISCARD_NONKEY
+    #    Discard all frames except keyframes
+    # ALL = lib.AVDISCARD_ALL
+    #    Discard all
+    setattr(stream.codec_context, "skip_frame", DECODE_MODE_SKIP_FRAMES[decode_mode])
+
+
 def set_stream_flags(
     stream,
     go_faster=False,
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+from fractions import Fraction
+from inspect import Parameter, signature
+from typing import Final, Optional
+
+FRAME_META_PARAMETER: Final[str] = "meta"
+"""Callbacks that declare a parameter with this name receive the `FrameMeta`.
+"""
+
+
+class FrameMeta:
+    """
+    The timestamps and origin of a decoded frame, delivered with its image.
+    """
+
+    __slots__ = (
+        "sequence",
+        "pts",
+        "time_base",
+        "keyframe",
+        "decoded_at",
+        "source_id",
+    )
+
+    def __init__(
+        self,
+        sequence: int,
+        pts: Optional[int],
+        time_base: Optional[Fraction],
+        keyframe: bool,
+        decoded_at: float,
+        source_id: Optional[str] = None,
+    ):
+        self.sequence = sequence
+        """The number of frames delivered before this frame."""
+
+        self.pts = pts
+        self.time_base = time_base
+        self.keyframe = keyframe
+
+        self.decoded_at = decoded_at
+        """The wall-clock time (`time.time()`) at which the packet was decoded."""
+
+        self.source_id = source_id
+
+    @property
+    def seconds(self) -> Optional[float]:
+        """
+        The presentation time in seconds, or `None` if the frame has no pts.
+        """
+
+        if self.pts is None or self.time_base is None:
+            return None
+        return float(self.pts * self.time_base)
+
+    def __repr__(self) -> str:
+        return (
+            f"FrameMeta(sequence={self.sequence},pts={self.pts},"
+            f"time_base={self.time_base},keyframe={self.keyframe},"
+            f"decoded_at={self.decoded_at:.6f},source_id={self.source_id!r})"
+        )
+
+
+def accepts_frame_meta(func) -> bool:
+    """
+    Whether `func` opts in to the `FrameMeta` with a `meta` parameter.
+    """
+
+    try:
+        parameters = signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+    parameter = parameters.get(FRAME_META_PARAMETER)
+    if parameter is None:
+        return False
+    return parameter.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY)
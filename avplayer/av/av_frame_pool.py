@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from typing import Deque, Final, Optional, Sequence, Tuple
+
+from numpy import empty, frombuffer, uint8
+from numpy.typing import NDArray
+
+from avplayer.ffmpeg.ffmpeg import (
+    PIXEL_FORMAT_BGR24,
+    PIXEL_FORMAT_GRAY,
+    PIXEL_FORMAT_NV12,
+    PIXEL_FORMAT_RGB24,
+    PIXEL_FORMAT_YUV420P,
+)
+
+POOLED_PIXEL_FORMATS: Final[Sequence[str]] = PIXEL_FORMAT_YUV420P, PIXEL_FORMAT_NV12
+"""Pixel formats whose planes `VideoFrame.to_ndarray()` concatenates into a new array.
+The images of the other formats are views of the frame memory without a copy,
+so a pooled buffer would only add one.
+"""
+
+
+def plane_to_ndarray(plane, width: int, height: int, channels: int) -> NDArray[uint8]:
+    """
+    Returns a view of the plane memory without copying.
+    The view is only valid while the frame that owns the plane is alive.
+    """
+
+    line_size = plane.line_size
+    data = frombuffer(plane, dtype=uint8, count=line_size * height)
+    rows = data.reshape(height, line_size)[:, : width * channels]
+    if channels == 1:
+        return rows
+    return rows.reshape(height, width, channels)
+
+
+def image_shape(pixel_format: str, width: int, height: int) -> Tuple[int, ...]:
+    if pixel_format in (PIXEL_FORMAT_BGR24, PIXEL_FORMAT_RGB24):
+        return height, width, 3
+    elif pixel_format == PIXEL_FORMAT_GRAY:
+        return height, width
+    elif pixel_format in (PIXEL_FORMAT_YUV420P, PIXEL_FORMAT_NV12):
+        return height * 3 // 2, width
+    else:
+        raise ValueError(f"Unsupported pixel format: {pixel_format}")
+
+
+def copy_frame_to_ndarray(frame, buffer: NDArray[uint8], pixel_format: str) -> None:
+    """
+    Copies the planes of the frame into the buffer,
+    using the same layout as `VideoFrame.to_ndarray()`.
+    """
+
+    width = frame.width
+    height = frame.height
+    planes = frame.planes
+
+    if pixel_format in (PIXEL_FORMAT_BGR24, PIXEL_FORMAT_RGB24):
+        buffer[:] = plane_to_ndarray(planes[0], width, height, 3)
+    elif pixel_format == PIXEL_FORMAT_GRAY:
+        buffer[:] = plane_to_ndarray(planes[0], width, height, 1)
+    elif pixel_format == PIXEL_FORMAT_YUV420P:
+        cw, ch = width // 2, height // 2
+        y_size = width * height
+        c_size = cw * ch
+        flat = buffer.reshape(-1)
+        flat[:y_size].reshape(height, width)[:] = plane_to_ndarray(
+            planes[0], width, height, 1
+        )
+        flat[y_size : y_size + c_size].reshape(ch, cw)[:] = plane_to_ndarray(
+            planes[1], cw, ch, 1
+        )
+        flat[y_size + c_size :].reshape(ch, cw)[:] = plane_to_ndarray(
+            planes[2], cw, ch, 1
+        )
+    elif pixel_format == PIXEL_FORMAT_NV12:
+        buffer[:height] = plane_to_ndarray(planes[0], width, height, 1)
+        buffer[height:] = plane_to_ndarray(planes[1], width, height // 2, 1)
+    else:
+        raise ValueError(f"Unsupported pixel format: {pixel_format}")
+
+
+class FrameBufferPool:
+    """
+    A ring of preallocated, reusable image buffers.
+    The whole ring is allocated when the first buffer of a shape is acquired.
+
+    Buffers are acquired on the decoding thread and released by the consumer,
+    possibly on another thread. `deque.append` and `deque.popleft` are atomic,
+    so no additional locking is required.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("The pool size must be greater than 0")
+
+        self._size = size
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._free: Deque[NDArray[uint8]] = deque()
+        self._allocations = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def allocations(self) -> int:
+        return self._allocations
+
+    @property
+    def free_buffers(self) -> int:
+        return len(self._free)
+
+    def acquire(self, shape: Tuple[int, ...]) -> NDArray[uint8]:
+        if self._shape != shape:
+            self._shape = shape
+            self._free.clear()
+            for _ in range(self._size):
+                self._free.append(empty(shape, dtype=uint8))
+            self._allocations += self._size
+
+        try:
+            return self._free.popleft()
+        except IndexError:
+            # All buffers are in flight. The new buffer joins the ring on release.
+            self._allocations += 1
+            return empty(shape, dtype=uint8)
+
+    def release(self, buffer: NDArray[uint8]) -> None:
+        if buffer.shape != self._shape:
+            return
+        if len(self._free) >= self._size:
+            return
+        self._free.append(buffer)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+import os
+from fractions import Fraction
+from hashlib import sha1
+from struct import Struct
+from struct import error as StructError
+from typing import Final, Optional
+
+from numpy import dtype, frombuffer, zeros
+
+from avplayer.av.av_keyframe_index import KeyframeIndex
+from avplayer.logging.logging import logger
+
+INDEX_CACHE_SUFFIX: Final[str] = ".avidx"
+INDEX_CACHE_MAGIC: Final[bytes] = b"AVPIDX\x00\x00"
+INDEX_CACHE_VERSION: Final[int] = 2
+
+INDEX_CACHE_HEADER: Final[Struct] = Struct("<8sIQqqqIIqqdQI")
+"""magic, version, file size, file mtime (ns), time base (num, den), width, height,
+start pts, end pts, container duration (seconds, negative if unknown),
+number of packets and number of keyframes.
+"""
+
+INDEX_CACHE_ENTRY = dtype([("pts", "<i8"), ("pos", "<i8"), ("size", "<u4")])
+"""A keyframe entry of 20 bytes, that follows the header.
+"""
+
+
+def index_cache_path(source: str, cache_dir: Optional[str] = None) -> str:
+    """
+    The sidecar file next to `source`,
+    or a file named after the absolute path of `source` in `cache_dir`.
+    """
+
+    if not cache_dir:
+        return source + INDEX_CACHE_SUFFIX
+    digest = sha1(os.path.abspath(source).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, digest + INDEX_CACHE_SUFFIX)
+
+
+def dumps_keyframe_index(index: KeyframeIndex, size: int, mtime_ns: int) -> bytes:
+    entries = zeros(len(index), dtype=INDEX_CACHE_ENTRY)
+    entries["pts"] = index.keyframes
+    entries["pos"] = index.positions
+    entries["size"] = index.sizes
+
+    container_duration = index.container_duration
+    if container_duration is None:
+        container_duration = -1.0
+
+    header = INDEX_CACHE_HEADER.pack(
+        INDEX_CACHE_MAGIC,
+        INDEX_CACHE_VERSION,
+        size,
+        mtime_ns,
+        index.time_base.numerator,
+        index.time_base.denominator,
+        index.width,
+        index.height,
+        index.start_pts,
+        index.end_pts,
+        container_duration,
+        index.packets,
+        len(index),
+    )
+    return header + entries.tobytes()
+
+
+def loads_keyframe_index(
+    data: bytes,
+    size: Optional[int] = None,
+    mtime_ns: Optional[int] = None,
+) -> Optional[KeyframeIndex]:
+    """
+    Returns `None` if the data is not a valid index,
+    or if it was built for a file of a different size or mtime.
+    """
+
+    try:
+        header = INDEX_CACHE_HEADER.unpack_from(data)
+    except StructError:
+        return None
+
+    magic, version, file_size, file_mtime_ns = header[:4]
+    num, den, width, height, start_pts, end_pts = header[4:10]
+    container_duration, packets, count = header[10:]
+
+    if magic != INDEX_CACHE_MAGIC or version != INDEX_CACHE_VERSION:
+        return None
+    if size is not None and size != file_size:
+        return None
+    if mtime_ns is not None and mtime_ns != file_mtime_ns:
+        return None
+
+    offset = INDEX_CACHE_HEADER.size
+    if len(data) != offset + count * INDEX_CACHE_ENTRY.itemsize:
+        return None
+
+    entries = frombuffer(data, dtype=INDEX_CACHE_ENTRY, count=count, offset=offset)
+    return KeyframeIndex(
+        time_base=Fraction(num, den),
+        keyframes=entries["pts"].tolist(),
+        start_pts=start_pts,
+        end_pts=end_pts,
+        packets=packets,
+        positions=entries["pos"].tolist(),
+        sizes=entries["size"].tolist(),
+        width=width,
+        height=height,
+        container_duration=container_duration if container_duration >= 0 else None,
+    )
+
+
+def load_cached_index(
+    source: str,
+    cache_dir: Optional[str] = None,
+) -> Optional[KeyframeIndex]:
+    """
+    Returns the cached index of `source`, if it matches the current size and mtime.
+    """
+
+    try:
+        stat = os.stat(source)
+        with open(index_cache_path(source, cache_dir), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    index = loads_keyframe_index(data, stat.st_size, stat.st_mtime_ns)
+    if index is None:
+        logger.debug(f"Stale keyframe index cache: '{source}'")
+    return index
+
+
+def store_cached_index(
+    source: str,
+    index: KeyframeIndex,
+    cache_dir: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Returns the path of the cache file, or `None` if it could not be written.
+    """
+
+    path = index_cache_path(source, cache_dir)
+    temp = f"{path}.{os.getpid()}.tmp"
+    try:
+        stat = os.stat(source)
+        data = dumps_keyframe_index(index, stat.st_size, stat.st_mtime_ns)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(temp, "wb") as f:
+            f.write(data)
+        # Readers never see a partially written file.
+        os.replace(temp, path)
+    except OSError as e:
+        logger.warning(f"Failed to write the keyframe index cache: {e}")
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        return None
+    return path
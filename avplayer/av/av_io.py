@@ -2,27 +2,71 @@
 # mypy: disable-error-code="attr-defined, union-attr"
 
 from errno import EAGAIN
+from fractions import Fraction
+from os import path
 from threading import Event
-from time import sleep
-from typing import Final, Optional, Sequence, Tuple
+from time import perf_counter_ns, sleep, time
+from typing import Dict, Final, Iterator, Optional, Sequence, Tuple
 
 from numpy import uint8
 from numpy.typing import NDArray
 
+from avplayer.av.av_decimator import PtsDecimator
+from avplayer.av.av_encoder import EncoderThread
+from avplayer.av.av_encoder_profile import get_encoder_profile, inject_encoder_profile
+from avplayer.av.av_flags import DECODE_MODE_SKIP_FRAMES, inject_skip_frame_stream
+from avplayer.av.av_frame_meta import FrameMeta
+from avplayer.av.av_frame_pool import (
+    POOLED_PIXEL_FORMATS,
+    FrameBufferPool,
+    copy_frame_to_ndarray,
+    image_shape,
+)
+from avplayer.av.av_index_cache import load_cached_index, store_cached_index
+from avplayer.av.av_keyframe_index import KeyframeIndex, build_keyframe_index
 from avplayer.av.av_open import open_input_container, open_output_container
 from avplayer.av.av_options import CommonAvOptions
-from avplayer.debug.avg_stat import AvgStat
+from avplayer.av.av_reconnect import ExponentialBackoff
+from avplayer.debug.avg_stat import stat_name
+from avplayer.debug.frame_trace import (
+    TRACE_STAGE_CALLBACK,
+    TRACE_STAGE_CONVERT,
+    TRACE_STAGE_DECODE,
+    TRACE_STAGE_ENCODE,
+    TRACE_STAGE_ENQUEUE,
+    TRACE_STAGE_READ,
+    TRACE_STAGE_WRITE,
+    FrameTracer,
+)
+from avplayer.debug.hist_stat import HistStat
+from avplayer.debug.metrics import Labels, MetricsWriter
+from avplayer.debug.trace_events import (
+    TraceEventWriter,
+    acquire_trace_writer,
+    release_trace_writer,
+)
 from avplayer.ffmpeg.ffmpeg import (
     AUTOMATIC_DETECT_FILE_FORMAT,
-    CRF_SANE_RANGE_MAX,
-    PRESET_ULTRAFAST,
+    DEFAULT_ENCODER_PIXEL_FORMAT,
+    DEFAULT_PIXEL_FORMAT,
+    ENCODER_PIXEL_FORMATS,
+    IMAGE_PIXEL_FORMATS,
     TUNE_FASTDECODE,
 )
 from avplayer.logging.logging import logger
 from avplayer.variables import (
+    DECODE_MODE_ALL,
+    DEFAULT_ANALYSIS_FPS,
     DEFAULT_AV_OPEN_TIMEOUT,
     DEFAULT_AV_READ_TIMEOUT,
+    DEFAULT_DECODE_MODE,
+    DEFAULT_ENCODE_OVERFLOW,
+    DEFAULT_ENCODE_QUEUE_SIZE,
+    DEFAULT_ENCODER_PROFILE,
     DEFAULT_IO_BUFFER_SIZE,
+    DEFAULT_RECONNECT_BACKOFF_MAX,
+    DEFAULT_RECONNECT_BACKOFF_MIN,
+    DEFAULT_RECONNECT_MAX_ATTEMPTS,
 )
 from avplayer.variables import VERBOSE_LEVEL_0 as VL0
 from avplayer.variables import VERBOSE_LEVEL_1 as VL1
@@ -52,6 +96,23 @@ class AvIo:
         destination_size: Optional[Tuple[int, int]] = None,
         logging_step=100,
         verbose=0,
+        name: Optional[str] = None,
+        frame_pool_size=0,
+        pixel_format=DEFAULT_PIXEL_FORMAT,
+        decode_mode=DEFAULT_DECODE_MODE,
+        analysis_fps=DEFAULT_ANALYSIS_FPS,
+        encode_queue_size=DEFAULT_ENCODE_QUEUE_SIZE,
+        encode_overflow=DEFAULT_ENCODE_OVERFLOW,
+        stream_copy=False,
+        encoder_profile=DEFAULT_ENCODER_PROFILE,
+        reconnect=False,
+        reconnect_max_attempts=DEFAULT_RECONNECT_MAX_ATTEMPTS,
+        reconnect_backoff_min=DEFAULT_RECONNECT_BACKOFF_MIN,
+        reconnect_backoff_max=DEFAULT_RECONNECT_BACKOFF_MAX,
+        index_cache=False,
+        index_cache_dir: Optional[str] = None,
+        latency_trace=False,
+        trace_file: Optional[str] = None,
     ):
         from av import AVError, FFmpegError, VideoFrame  # noqa
         from av.container import InputContainer, OutputContainer  # noqa
@@ -75,10 +136,13 @@ class AvIo:
         self._output_container: Optional[OutputContainer] = None
         self._output_stream: Optional[Stream] = None
         self._latest_exception: Optional[BaseException] = None
+        self._packets: Optional[Iterator] = None
+        self._frames: Optional[Iterator] = None
 
         self._output_container = None
         self._output_stream = None
 
+        self._name = name
         self._source = source
         self._output = output if output else str()
         self._done = done if done else Event()
@@ -89,11 +153,50 @@ class AvIo:
             "fflags": "nobuffer",
             "turn": TUNE_FASTDECODE,
         }
-        self._output_stream_pix_format = "yuv420p"
-        self._output_stream_options = {
-            "preset": PRESET_ULTRAFAST,
-            "crf": str(CRF_SANE_RANGE_MAX),
-        }
+        if pixel_format not in IMAGE_PIXEL_FORMATS:
+            raise ValueError(f"Unsupported image pixel format: {pixel_format}")
+
+        if decode_mode not in DECODE_MODE_SKIP_FRAMES:
+            raise ValueError(f"Unknown decode mode: {decode_mode}")
+        self._decode_mode = decode_mode
+
+        if stream_copy and not self._output:
+            raise ValueError("Stream copy requires an output")
+        self._stream_copy = stream_copy
+        self._copy_offset: Optional[int] = None
+        self._copy_last_dts: Optional[int] = None
+        self._copy_time_base: Optional[Fraction] = None
+
+        # An input that fails is reopened, while the output is kept alive.
+        self._reconnect = reconnect
+        self._reconnect_max_attempts = reconnect_max_attempts
+        self._backoff = ExponentialBackoff(reconnect_backoff_min, reconnect_backoff_max)
+        self._is_local_file = path.exists(source)
+        self._input_error: Optional[BaseException] = None
+        self._keyframe_index: Optional[KeyframeIndex] = None
+        # A cold index cache is built by the first `step()`, on the decode thread.
+        self._index_pending = False
+        self._index_cache = index_cache
+        self._index_cache_dir = index_cache_dir
+        self._seek_pts: Optional[int] = None
+        self._reconnect_count = 0
+        self._last_recover_seconds = 0.0
+        # Attempts of the reconnect in progress, or `None` if the input is open.
+        self._reconnect_attempt: Optional[int] = None
+        self._reconnect_begin = 0
+
+        self._decimator: Optional[PtsDecimator] = None
+        self._decimate_packets = False
+        if analysis_fps > 0:
+            self._decimator = PtsDecimator(analysis_fps)
+
+        # If possible, the encoder accepts the callback image without conversion.
+        self._pixel_format = pixel_format
+        if pixel_format in ENCODER_PIXEL_FORMATS:
+            self._output_stream_pix_format = pixel_format
+        else:
+            self._output_stream_pix_format = DEFAULT_ENCODER_PIXEL_FORMAT
+        self._encoder_profile = get_encoder_profile(encoder_profile)
         self._latest_exception = None
 
         self._buffer_size = buffer_size
@@ -103,32 +206,237 @@ class AvIo:
         self._eagain_wait = 0.001
         self._flush_down_threshold = 10
         self._flush_down_count = 0
+        self._delivered_frames = 0
+        self._discarded_frames = 0
+        self._frame_meta: Optional[FrameMeta] = None
         self._verbose = verbose
 
+        self._frame_pool: Optional[FrameBufferPool] = None
+        if frame_pool_size > 0 and pixel_format in POOLED_PIXEL_FORMATS:
+            self._frame_pool = FrameBufferPool(frame_pool_size)
+        self._auto_release = True
+
+        self._encoder: Optional[EncoderThread] = None
+        if encode_queue_size > 0:
+            self._encoder = EncoderThread(
+                encode=self._encode_queued_frame,
+                queue_size=encode_queue_size,
+                overflow=encode_overflow,
+                on_error=self._on_encoder_error,
+                name=name,
+                logging_step=logging_step,
+                verbose=verbose,
+            )
+
         logger.info(f"Input file: '{self._source}'")
         logger.info(f"Input container options: {self._input_options}")
 
         if self._output:
             logger.info(f"Output file: '{self._output}'")
             logger.info(f"Output file format: {self._file_format}")
+            logger.info(f"Stream copy: {self._stream_copy}")
             logger.info(f"Output stream pixel format: {self._output_stream_pix_format}")
-            logger.info(f"Output stream options: {self._output_stream_options}")
+            logger.info(f"Encoder profile: {self._encoder_profile.as_logging_line()}")
+            logger.info(f"Encode queue size: {encode_queue_size}")
+            logger.info(f"Encode overflow: {encode_overflow}")
 
         logger.info(f"Buffer size: {self._buffer_size} bytes")
+        pool_size = self._frame_pool.size if self._frame_pool is not None else 0
+        logger.info(f"Frame pool size: {pool_size}")
+        logger.info(f"Image pixel format: {self._pixel_format}")
+        logger.info(f"Decode mode: {self._decode_mode}")
+        logger.info(f"Analysis fps: {analysis_fps}")
+        logger.info(f"Reconnect: {self._reconnect}")
+        logger.info(f"Index cache: {self._index_cache} ({self._index_cache_dir})")
+        logger.info(f"Latency trace: {latency_trace}")
+        logger.info(f"Trace file: {trace_file}")
         logger.info(f"Open timeout: {self._timeout[0]:.3f}s")
         logger.info(f"Read timeout: {self._timeout[1]:.3f}s")
 
-        self._iter_stat = AvgStat("Iter", logger, logging_step, verbose, VL0)
-        self._coro_stat = AvgStat("Coro", logger, logging_step, verbose, VL1)
-        self._read_stat = AvgStat("Read", logger, logging_step, verbose, VL2)
-        self._decode_stat = AvgStat("Decode", logger, logging_step, verbose, VL2)
-        self._encode_stat = AvgStat("Encode", logger, logging_step, verbose, VL2)
-        self._write_stat = AvgStat("Write", logger, logging_step, verbose, VL2)
+        step = logging_step
+        n = name
+        self._iter_stat = HistStat(stat_name("Iter", n), logger, step, verbose, VL0)
+        self._coro_stat = HistStat(stat_name("Coro", n), logger, step, verbose, VL1)
+        self._convert_stat = HistStat(
+            stat_name("Convert", n), logger, step, verbose, VL2
+        )
+        self._read_stat = HistStat(stat_name("Read", n), logger, step, verbose, VL2)
+        self._decode_stat = HistStat(stat_name("Decode", n), logger, step, verbose, VL2)
+        self._encode_stat = HistStat(stat_name("Encode", n), logger, step, verbose, VL2)
+        self._write_stat = HistStat(stat_name("Write", n), logger, step, verbose, VL2)
+        self._recover_stat = HistStat(stat_name("Recover", n), logger, 1, verbose, VL1)
+
+        self._trace_file = trace_file
+        self._events: Optional[TraceEventWriter] = None
+
+        self._tracer: Optional[FrameTracer] = None
+        if latency_trace:
+            self._tracer = FrameTracer(stat_name("Latency", n), logger, step)
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._name
 
     @property
     def verbose(self) -> int:
         return self._verbose
 
+    @property
+    def delivered_frames(self) -> int:
+        return self._delivered_frames
+
+    @property
+    def discarded_frames(self) -> int:
+        return self._discarded_frames
+
+    def discard_frame(self) -> None:
+        self._discarded_frames += 1
+
+    @property
+    def frame_meta(self) -> Optional[FrameMeta]:
+        """
+        The metadata of the latest frame delivered by `recv()`.
+        """
+        return self._frame_meta
+
+    @property
+    def pixel_format(self) -> str:
+        return self._pixel_format
+
+    @property
+    def decode_mode(self) -> str:
+        return self._decode_mode
+
+    @property
+    def stream_copy(self) -> bool:
+        return self._stream_copy
+
+    @property
+    def reconnect_count(self) -> int:
+        return self._reconnect_count
+
+    @property
+    def last_recover_seconds(self) -> float:
+        """
+        Seconds from the input failure to the successful reopen of the last reconnect.
+        """
+        return self._last_recover_seconds
+
+    @property
+    def frame_pool(self) -> Optional[FrameBufferPool]:
+        return self._frame_pool
+
+    @property
+    def auto_release(self) -> bool:
+        """
+        If `True`, the image is returned to the frame pool at the end of `iter()`.
+        Consumers that process the image after `iter()` returns must disable it
+        and call `release_image()` themselves.
+        They also pass the pts of the frame to `send()` to finish its latency trace.
+        """
+        return self._auto_release
+
+    @auto_release.setter
+    def auto_release(self, value: bool) -> None:
+        self._auto_release = value
+
+    @property
+    def encoder(self) -> Optional[EncoderThread]:
+        return self._encoder
+
+    @property
+    def tracer(self) -> Optional[FrameTracer]:
+        return self._tracer
+
+    @property
+    def trace_events(self) -> Optional[TraceEventWriter]:
+        """
+        The writer of the `trace_file`, while the I/O is open.
+        """
+        return self._events
+
+    @property
+    def stats(self) -> Dict[str, HistStat]:
+        result = {
+            "iter": self._iter_stat,
+            "coro": self._coro_stat,
+            "convert": self._convert_stat,
+            "read": self._read_stat,
+            "decode": self._decode_stat,
+            "encode": self._encode_stat,
+            "write": self._write_stat,
+            "recover": self._recover_stat,
+        }
+        if self._encoder is not None:
+            result["encode_queue"] = self._encoder.queue_stat
+        return result
+
+    def collect_metrics(self, writer: MetricsWriter, labels: Labels) -> None:
+        writer.stats(labels, self.stats)
+        writer.gauge(
+            "fps",
+            "Moving average of the iterations per second",
+            labels,
+            self._iter_stat.rate,
+        )
+        writer.counter(
+            "delivered_frames_total",
+            "Frames delivered to the callback",
+            labels,
+            self._delivered_frames,
+        )
+        writer.counter(
+            "discarded_frames_total",
+            "Frames discarded before the callback",
+            labels,
+            self._discarded_frames,
+        )
+        writer.counter(
+            "reconnects_total",
+            "Successful reconnects of the input",
+            labels,
+            self._reconnect_count,
+        )
+        writer.gauge(
+            "last_recover_seconds",
+            "Duration of the last reconnect",
+            labels,
+            self._last_recover_seconds,
+        )
+
+        if self._encoder is not None:
+            writer.gauge(
+                "encoder_queue_depth",
+                "Frames waiting for the encoder thread",
+                labels,
+                self._encoder.pending_frames,
+            )
+            writer.counter(
+                "encoder_dropped_frames_total",
+                "Frames dropped by the encode overflow policy",
+                labels,
+                self._encoder.dropped_frames,
+            )
+
+        if self._tracer is not None:
+            total, queueing = self._tracer.snapshot()
+            writer.summary(
+                "frame_latency_seconds",
+                "Latency of each frame from demux to mux",
+                labels,
+                total,
+            )
+            writer.summary(
+                "frame_queueing_seconds",
+                "Time each frame spent waiting between stages",
+                labels,
+                queueing,
+            )
+
+    def release_image(self, image: NDArray[uint8]) -> None:
+        if self._frame_pool is not None:
+            self._frame_pool.release(image)
+
     @property
     def skip_flush(self) -> bool:
         if self._latest_exception is None:
@@ -171,18 +479,14 @@ class AvIo:
         )
         return open_output_container(self._output, options)
 
-    def open(self) -> None:
-        from av.container import InputContainer, OutputContainer
-        from av.stream import Stream
-
-        input_container: Optional[InputContainer] = None
-        input_stream: Optional[Stream] = None
-
-        output_container: Optional[OutputContainer] = None
-        output_stream: Optional[Stream] = None
+    def _open_input(self):
+        """
+        Returns the input container and its video stream, ready for decoding.
+        """
 
+        input_container = self._open_input_container()
         try:
-            input_container = self._open_input_container()
+            input_stream = None
             for stream in input_container.streams:
                 if stream.type == "video":
                     input_stream = stream
@@ -192,13 +496,47 @@ class AvIo:
 
             input_stream.thread_type = "AUTO"
             input_stream.codec_context.low_delay = True
+            if self._decode_mode != DECODE_MODE_ALL and not self._stream_copy:
+                inject_skip_frame_stream(input_stream, self._decode_mode)
+        except BaseException:
+            input_container.close()
+            raise
+        return input_container, input_stream
+
+    def _reset_input_state(self) -> None:
+        assert self._input_stream is not None
+        self._packets = None
+        self._frames = None if self._stream_copy else self.recv()
+        self._copy_offset = None
+        self._input_error = None
+        self._seek_pts = None
+        if self._decimator is not None:
+            self._decimator.reset()
+            self._decimate_packets = self._input_stream.codec_context.codec.intra_only
+        self._flush_down_count = 0
+
+    def open(self) -> None:
+        from av.container import InputContainer, OutputContainer
+        from av.stream import Stream
+
+        input_container: Optional[InputContainer] = None
+        input_stream: Optional[Stream] = None
+
+        output_container: Optional[OutputContainer] = None
+        output_stream: Optional[Stream] = None
+
+        try:
+            input_container, input_stream = self._open_input()
 
-            if self._output:
+            if self._output and self._stream_copy:
+                output_container = self._open_output_container()
+                output_stream = output_container.add_stream(template=input_stream)
+            elif self._output:
                 output_container = self._open_output_container()
                 output_stream_pix_format = self._output_stream_pix_format
-                output_stream_options = self._output_stream_options
+                encoder_profile = self._encoder_profile
 
-                output_stream = output_container.add_stream("libx264")
+                output_stream = output_container.add_stream(encoder_profile.codec)
 
                 if self._output_size is not None:
                     output_stream.width = self._output_size[0]
@@ -211,7 +549,7 @@ class AvIo:
                     output_stream.height = input_stream.height
 
                 output_stream.pix_fmt = output_stream_pix_format
-                output_stream.options = output_stream_options
+                inject_encoder_profile(output_stream.codec_context, encoder_profile)
 
         except BaseException as e:
             if input_container:
@@ -227,62 +565,134 @@ class AvIo:
             self._output_container = output_container
             self._input_stream = input_stream
             self._output_stream = output_stream
+            self._reset_input_state()
+            self._copy_last_dts = None
+            self._copy_time_base = None
+            self._reconnect_count = 0
+            self._last_recover_seconds = 0.0
+            self._delivered_frames = 0
+            self._discarded_frames = 0
             self._done.clear()
+            if self._encoder is not None and output_container is not None:
+                self._encoder.start()
+            if self._index_cache and self._is_local_file:
+                self._load_cached_keyframe_index()
+            if self._trace_file and self._events is None:
+                self._events = acquire_trace_writer(self._trace_file)
             logger.info("Successfully opened the I/O container")
 
-    def close(self) -> None:
-        self._done.is_set()
+    def _close_input(self) -> None:
+        if self._frames is not None:
+            self._frames.close()
 
         if self._input_container is not None:
             self._input_container.close()
 
+        self._input_container = None
+        self._input_stream = None
+        self._packets = None
+        self._frames = None
+
+    def close(self) -> None:
+        self._done.is_set()
+        self._close_input()
+
+        if self._encoder is not None:
+            self._encoder.stop()
+
         if self._output_container is not None:
             assert self._output_stream is not None
 
             try:
-                if not self.skip_flush:
+                if not self.skip_flush and not self._stream_copy:
                     self._output_container.mux(self._output_stream.encode(None))
             except BaseException as e:  # noqa
                 logger.warning(f"Flush error: {e}")
 
             self._output_container.close()
 
-        self._input_container = None
         self._output_container = None
-        self._input_stream = None
         self._output_stream = None
-        logger.info("The I/O container was successfully closed")
+
+        if self._events is not None:
+            release_trace_writer(self._events)
+            self._events = None
+
+        logger.info(
+            "The I/O container was successfully closed "
+            f"(delivered={self._delivered_frames},discarded={self._discarded_frames})"
+        )
+
+    def _next_packet(self):
+        """
+        Returns the next packet of the long-lived demux iterator,
+        or `None` if the iterator is exhausted.
+        """
+
+        if self._packets is None:
+            self._packets = self._input_container.demux(self._input_stream)
+        try:
+            return next(self._packets)
+        except StopIteration:
+            self._packets = None
+            return None
+
+    def _flush_down(self) -> None:
+        self._flush_down_count += 1
+        logger.warning(
+            "Skip the flushing packet, shutdown count: "
+            f"{self._flush_down_count}/{self._flush_down_threshold}"
+        )
+        if self._flush_down_count >= self._flush_down_threshold:
+            self._input_error = EOFError("The flush count has reached its maximum")
+            raise self._input_error
 
     def recv(self):
+        """
+        A frame generator that lasts for the whole session.
+
+        The demux iterator is kept alive across calls, and every frame that
+        `packet.decode()` returns is delivered, including the frames that
+        frame-threaded decoders release only when the decoder is drained.
+        """
+
         while self.is_play_or_raise():
             try:
-                while self.is_play_or_raise():
-                    with self._read_stat:
-                        packet = next(self._input_container.demux(self._input_stream))
-
-                    # We need to skip the "flushing" packets that `demux` generates.
-                    if packet.dts is None:
-                        self._flush_down_count += 1
-                        logger.warning(
-                            "Skip the flushing packet, shutdown count: "
-                            f"{self._flush_down_count}/{self._flush_down_threshold}"
-                        )
-                        if self._flush_down_count >= self._flush_down_threshold:
-                            raise EOFError("The flush count has reached its maximum")
-                        continue
-                    else:
+                read_begin = perf_counter_ns()
+                packet = self._next_packet()
+                decode_begin = perf_counter_ns()
+                self._read_stat.record(decode_begin - read_begin, decode_begin)
+
+                if packet is None:
+                    self._flush_down()
+                    continue
+
+                # For intra-only codecs, frames are decimated before decoding.
+                if packet.dts is not None and self._decimate_packets:
+                    assert self._decimator is not None
+                    if not self._decimator.accept(packet.pts, packet.time_base):
                         self._flush_down_count = 0
+                        self._discarded_frames += 1
+                        continue
 
-                    with self._decode_stat:
-                        frames = packet.decode()
+                frames = packet.decode()
+                decode_end = perf_counter_ns()
+                decoded_at = time()
+                self._decode_stat.record(decode_end - decode_begin, decode_end)
+                if self._events is not None:
+                    self._events.complete(TRACE_STAGE_READ, read_begin, decode_begin)
+                    self._events.complete(TRACE_STAGE_DECODE, decode_begin, decode_end)
 
-                    assert isinstance(frames, list)
-                    for frame in frames:
-                        if frame is None:
-                            logger.warning("Empty frame has been detected")
-                            continue
-                        yield frame
+                # The "flushing" packet that `demux` generates drains the decoder.
+                if packet.dts is None:
+                    self._input_stream.codec_context.flush_buffers()
+                    if not frames:
+                        self._flush_down()
+                else:
+                    self._flush_down_count = 0
             except self.AVError as e:
+                # A failed demux iterator cannot be resumed.
+                self._packets = None
                 if isinstance(e, self.FFmpegError) and e.errno == EAGAIN:
                     logger.warning(
                         "Resource temporarily unavailable. "
@@ -291,43 +701,337 @@ class AvIo:
                     sleep(self._eagain_wait)
                     continue
                 else:
+                    self._input_error = e
                     raise
-            else:
-                assert False, "Inaccessible section"
+
+            assert isinstance(frames, list)
+            for frame in frames:
+                if frame is None:
+                    logger.warning("Empty frame has been detected")
+                    self._discarded_frames += 1
+                    continue
+                # After a seek, the frames before the target are only decoded.
+                if self._seek_pts is not None:
+                    if frame.pts is not None and frame.pts < self._seek_pts:
+                        continue
+                    self._seek_pts = None
+                if self._decimator is not None and not self._decimate_packets:
+                    if not self._decimator.accept(frame.pts, frame.time_base):
+                        self._discarded_frames += 1
+                        continue
+                self._frame_meta = FrameMeta(
+                    sequence=self._delivered_frames,
+                    pts=frame.pts,
+                    time_base=frame.time_base,
+                    keyframe=frame.key_frame,
+                    decoded_at=decoded_at,
+                    source_id=self._name,
+                )
+                self._delivered_frames += 1
+                if self._tracer is not None and frame.pts is not None:
+                    # Frames are attributed to the packet whose decoding released them.
+                    span = self._tracer.begin(frame.pts, read_begin)
+                    span.durations[TRACE_STAGE_READ] = decode_begin - read_begin
+                    span.durations[TRACE_STAGE_DECODE] = decode_end - decode_begin
+                yield frame
         assert False, "Inaccessible section"
 
-    def send(self, image: Optional[NDArray[uint8]]) -> None:
-        if image is None:
+    @property
+    def keyframe_index(self) -> KeyframeIndex:
+        """
+        The keyframe index of the input, built on first use.
+        """
+
+        if self._keyframe_index is None:
+            self._keyframe_index = self.build_keyframe_index()
+        return self._keyframe_index
+
+    @keyframe_index.setter
+    def keyframe_index(self, index: KeyframeIndex) -> None:
+        """
+        Uses an index that has already been built, e.g. by another process.
+        """
+        self._keyframe_index = index
+
+    def _load_cached_keyframe_index(self) -> None:
+        """
+        Only reads an existing cache file, as `open()` may run on an event loop.
+        """
+
+        if self._keyframe_index is not None:
+            return
+        index = load_cached_index(self._source, self._index_cache_dir)
+        if index is not None:
+            logger.info(f"Loaded the keyframe index cache ({len(index)} keyframes)")
+            self._keyframe_index = index
+        else:
+            self._index_pending = True
+
+    def _load_keyframe_index(self) -> None:
+        self._index_pending = False
+        if self._keyframe_index is not None:
             return
+        try:
+            self._keyframe_index = self.build_keyframe_index()
+        except BaseException as e:
+            logger.warning(f"Failed to build the keyframe index: {e}")
+
+    def build_keyframe_index(self) -> KeyframeIndex:
+        if not self._is_local_file:
+            raise ValueError("The keyframe index is only available for file inputs")
+
+        if self._index_cache:
+            index = load_cached_index(self._source, self._index_cache_dir)
+            if index is not None:
+                logger.info(f"Loaded the keyframe index cache ({len(index)} keyframes)")
+                return index
+
+        index = self._scan_keyframe_index()
+
+        if self._index_cache:
+            cache_path = store_cached_index(self._source, index, self._index_cache_dir)
+            if cache_path is not None:
+                logger.info(f"Stored the keyframe index cache: '{cache_path}'")
+        return index
+
+    def _scan_keyframe_index(self) -> KeyframeIndex:
+        # A separate container, so that the playback position is not disturbed.
+        # Without 'nobuffer', so that the leading packets are not dropped.
+        options = CommonAvOptions(buffer_size=self._buffer_size, timeout=self._timeout)
+        container = open_input_container(self._source, options)
+        try:
+            return build_keyframe_index(container, container.streams.video[0])
+        finally:
+            container.close()
+
+    def seek(self, seconds: float) -> None:
+        """
+        Moves the playback position, so that the next frame is the first frame
+        at or after `seconds` from the start of the stream.
+        Decoding starts at the nearest preceding keyframe.
+        """
+
+        assert self._input_container is not None
+        assert self._input_stream is not None
+
+        index = self.keyframe_index
+        target = index.to_pts(max(seconds, 0.0))
+        keyframe = index.find(target)
+        if keyframe is None:
+            keyframe = index.start_pts
+
+        self._input_container.seek(
+            keyframe,
+            backward=True,
+            any_frame=False,
+            stream=self._input_stream,
+        )
+        self._input_stream.codec_context.flush_buffers()
 
-        if not self._output:
+        if self._frames is not None:
+            self._frames.close()
+        self._reset_input_state()
+        self._seek_pts = target
+
+    def next_frame(self):
+        """
+        Returns the next decoded `VideoFrame`, for consumers that need its timestamps.
+
+        :raises EOFError:
+            If the input has ended.
+        """
+
+        assert self._frames is not None
+        return next(self._frames)
+
+    def read_frame_at(self, seconds: float) -> NDArray[uint8]:
+        """
+        Returns the image of the first frame at or after `seconds`.
+        Playback continues from the frame after it.
+
+        :raises EOFError:
+            If there is no frame after `seconds`.
+        """
+
+        if self._stream_copy:
+            raise ValueError("Frames are not decoded in stream copy mode")
+
+        self.seek(seconds)
+        return self.frame_to_ndarray(self.next_frame())
+
+    def send(self, image: Optional[NDArray[uint8]], pts: Optional[int] = None) -> None:
+        """
+        Encodes the image, if there is an output.
+
+        :param pts:
+            The pts of the input frame that the image was made from,
+            to finish the latency trace of the frame.
+        """
+
+        if image is None or not self._output:
+            if self._tracer is not None:
+                self._tracer.finish(pts)
             return
 
         assert self._output_container is not None
         assert self._output_stream is not None
 
-        with self._encode_stat:
-            next_frame = self.VideoFrame.from_ndarray(image, format="bgr24")
-            output_packets = self._output_stream.encode(next_frame)
+        # The frame owns a copy of the image, so pooled buffers can be released.
+        next_frame = self.VideoFrame.from_ndarray(image, format=self._pixel_format)
+
+        if self._encoder is not None:
+            self._encoder.put((next_frame, pts))
+        else:
+            self._encode_frame(next_frame, pts)
+
+    def _encode_queued_frame(self, item: Tuple[object, Optional[int]]) -> None:
+        self._encode_frame(*item)
+
+    def _encode_frame(self, frame, pts: Optional[int] = None) -> None:
+        assert self._output_container is not None
+        assert self._output_stream is not None
+
+        encode_begin = perf_counter_ns()
+        output_packets = self._output_stream.encode(frame)
+        write_begin = perf_counter_ns()
+        self._encode_stat.record(write_begin - encode_begin, write_begin)
 
         for output_packet in output_packets:
             with self._write_stat:
                 self._output_container.mux(output_packet)
+        write_end = perf_counter_ns()
+
+        if self._events is not None:
+            args = {"pts": pts}
+            events = self._events
+            events.complete(TRACE_STAGE_ENCODE, encode_begin, write_begin, args)
+            if output_packets:
+                events.complete(TRACE_STAGE_WRITE, write_begin, write_end, args)
+
+        if self._tracer is not None:
+            self._tracer.stage(pts, TRACE_STAGE_ENCODE, encode_begin, write_begin)
+            self._tracer.stage(pts, TRACE_STAGE_WRITE, write_begin, write_end)
+            self._tracer.finish(pts, write_end)
+
+    def _on_encoder_error(self, e: BaseException) -> None:
+        if self._latest_exception is None:
+            self._latest_exception = e
 
     def frame_to_ndarray(self, frame) -> NDArray[uint8]:
         assert isinstance(frame, self.VideoFrame)
         if self._source_size is not None:
             width, height = self._source_size
-            return frame.reformat(width, height, "bgr24").to_ndarray()  # type: ignore[return-value]  # noqa: E501
+            frame = frame.reformat(width, height, self._pixel_format)
+        else:
+            frame = frame.reformat(format=self._pixel_format)
+
+        if self._frame_pool is None:
+            # A view of the converted frame, or the planes joined into a new array.
+            return frame.to_ndarray()  # type: ignore[return-value]
+
+        # Joins the planes into a reused buffer instead.
+
+        shape = image_shape(self._pixel_format, frame.width, frame.height)
+        buffer = self._frame_pool.acquire(shape)
+        copy_frame_to_ndarray(frame, buffer, self._pixel_format)
+        return buffer
+
+    def _rebase_packet(self, packet) -> None:
+        """
+        Shifts the timestamps so that the output starts at zero,
+        and keeps the dts increasing when the source timestamps jump backwards.
+        """
+
+        dts = packet.dts
+        if self._copy_offset is None:
+            if self._copy_last_dts is None:
+                self._copy_offset = dts
+            else:
+                # After a reconnect, the output continues after the last packet.
+                last_dts = self._copy_last_dts
+                assert self._copy_time_base is not None
+                if self._copy_time_base != packet.time_base:
+                    last_dts = int(last_dts * self._copy_time_base / packet.time_base)
+                self._copy_offset = dts - last_dts - max(packet.duration or 0, 1)
         else:
-            return frame.to_ndarray(format="bgr24")  # type: ignore[return-value]
+            assert self._copy_last_dts is not None
+            if dts - self._copy_offset <= self._copy_last_dts:
+                self._copy_offset = dts - self._copy_last_dts - 1
+
+        packet.dts = dts - self._copy_offset
+        if packet.pts is not None:
+            packet.pts -= self._copy_offset
+        self._copy_last_dts = packet.dts
+        self._copy_time_base = packet.time_base
+
+    def relay(self) -> None:
+        """
+        Remux a single packet into the output without decoding it.
+        """
+
+        assert self._output_container is not None
+        assert self._output_stream is not None
+
+        try:
+            with self._read_stat:
+                packet = self._next_packet()
+        except self.AVError as e:
+            self._input_error = e
+            raise
+
+        # The "flushing" packet that `demux` generates has no timestamps.
+        if packet is None or packet.dts is None:
+            self._flush_down()
+            return
+
+        self._flush_down_count = 0
+
+        # The output must start with a keyframe to be decodable.
+        if self._copy_offset is None and not packet.is_keyframe:
+            self._discarded_frames += 1
+            return
+
+        self._rebase_packet(packet)
+        packet.stream = self._output_stream
+
+        with self._write_stat:
+            self._output_container.mux(packet)
+        self._delivered_frames += 1
 
     def iter(self, coro) -> None:
-        frame = next(self.recv())
-        with self._coro_stat:
-            image = self.frame_to_ndarray(frame)
-            result = coro(image) if coro else image
-        self.send(result)
+        if self._stream_copy:
+            self.relay()
+            return
+
+        assert self._frames is not None
+        frame = next(self._frames)
+        convert_begin = perf_counter_ns()
+        image = self.frame_to_ndarray(frame)
+        convert_end = perf_counter_ns()
+        result = coro(image) if coro else image
+        callback_end = perf_counter_ns()
+        self._convert_stat.record(convert_end - convert_begin, convert_end)
+        self._coro_stat.record(callback_end - convert_begin, callback_end)
+
+        # Otherwise, the consumer finishes the trace when it sends the image.
+        pts = frame.pts if self._auto_release else None
+        if self._tracer is not None:
+            tracer = self._tracer
+            tracer.stage(frame.pts, TRACE_STAGE_CONVERT, convert_begin, convert_end)
+            tracer.stage(pts, TRACE_STAGE_CALLBACK, convert_end, callback_end)
+        if self._events is not None:
+            args = {"pts": frame.pts}
+            events = self._events
+            events.complete(TRACE_STAGE_CONVERT, convert_begin, convert_end, args)
+            # An asynchronous consumer only enqueues the image here.
+            name = TRACE_STAGE_CALLBACK if self._auto_release else TRACE_STAGE_ENQUEUE
+            events.complete(name, convert_end, callback_end, args)
+
+        try:
+            self.send(result, pts)
+        finally:
+            if self._auto_release:
+                self.release_image(image)
 
     def is_play_or_raise(self) -> bool:
         if self._latest_exception is not None:
@@ -336,10 +1040,26 @@ class AvIo:
             raise InterruptedError
         return True
 
-    def run(self, coro) -> None:
+    def step(self, coro) -> Optional[float]:
+        """
+        Run a single iteration of the streaming loop.
+
+        A failed input is reopened over several steps, and the backoff between
+        the attempts is left to the caller, so that no thread sleeps in it.
+
+        :return:
+            Seconds to wait before the next step, or `None` if the session is over.
+        """
+
+        if self._index_pending:
+            # Scans the whole file, before the first frame is decoded.
+            self._load_keyframe_index()
+
+        if self._reconnect_attempt is not None:
+            return self._reconnect_step()
+
         try:
-            logger.info("Start avio streaming ...")
-            while self.is_play_or_raise():
+            if self.is_play_or_raise():
                 with self._iter_stat:
                     self.iter(coro)
         except self.AVError as e:
@@ -362,3 +1082,87 @@ class AvIo:
             logger.warning(f"Interrupt signal detected: {e}")
         except EOFError as e:
             logger.warning(f"End of file: {e}")
+        else:
+            return 0.0
+
+        if not self._can_reconnect():
+            return None
+        return self._begin_reconnect()
+
+    def _can_reconnect(self) -> bool:
+        if not self._reconnect or self._input_error is None:
+            return False
+        if self._done.is_set():
+            return False
+        # Errors of the output or the callback are not recovered by reconnecting.
+        if self._latest_exception not in (None, self._input_error):
+            return False
+        # The end of a local file is not a failure.
+        if self._is_local_file and isinstance(self._input_error, EOFError):
+            return False
+        return True
+
+    def _begin_reconnect(self) -> float:
+        """
+        Closes the failed input. The output container and the encoder are kept alive.
+
+        :return:
+            Seconds to wait before the first attempt.
+        """
+
+        logger.warning(f"Reconnect the input: {self._input_error}")
+        self._reconnect_begin = perf_counter_ns()
+        self._reconnect_attempt = 0
+        self._close_input()
+        return self._backoff.delay(0)
+
+    def _reconnect_step(self) -> Optional[float]:
+        """
+        Makes an attempt to reopen the input.
+
+        :return:
+            Seconds to wait before the next attempt, `0.0` if the input has been
+            reopened, or `None` if the reconnect was given up.
+        """
+
+        assert self._reconnect_attempt is not None
+        if self._done.is_set():
+            logger.warning("Reconnect was interrupted")
+            self._reconnect_attempt = None
+            return None
+
+        attempt = self._reconnect_attempt + 1
+        self._reconnect_attempt = attempt
+        try:
+            self._input_container, self._input_stream = self._open_input()
+        except BaseException as e:
+            logger.warning(f"Reconnect attempt {attempt} failed: {e}")
+            max_attempts = self._reconnect_max_attempts
+            if max_attempts and attempt >= max_attempts:
+                logger.error(f"Reconnect failed after {attempt} attempts")
+                self._reconnect_attempt = None
+                return None
+            return self._backoff.delay(attempt)
+
+        self._reset_input_state()
+        self._latest_exception = None
+        self._reconnect_attempt = None
+        self._reconnect_count += 1
+        end = perf_counter_ns()
+        self._recover_stat.record(end - self._reconnect_begin, end)
+        self._last_recover_seconds = (end - self._reconnect_begin) / 1e9
+        logger.info(
+            f"Reconnected the input (count={self._reconnect_count},"
+            f"attempts={attempt},recover={self._last_recover_seconds:.3f}s)"
+        )
+        return 0.0
+
+    def run(self, coro) -> None:
+        logger.info("Start avio streaming ...")
+        while True:
+            delay = self.step(coro)
+            if delay is None:
+                break
+            if delay > 0:
+                # Wakes up as soon as the session is done.
+                self._done.wait(delay)
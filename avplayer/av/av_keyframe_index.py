@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_right
+from fractions import Fraction
+from typing import Final, List, Optional, Sequence
+
+AV_TIME_BASE: Final[int] = 1000000
+"""The time base of the container duration of FFmpeg, in microseconds.
+"""
+
+
+class KeyframeIndex:
+    """
+    Presentation timestamps, byte positions and packet sizes
+    of the keyframes of a video stream.
+
+    Seeking to the last keyframe at or before a target time and decoding forward
+    from it decodes at most one GOP.
+    """
+
+    def __init__(
+        self,
+        time_base: Fraction,
+        keyframes: Sequence[int],
+        start_pts=0,
+        end_pts=0,
+        packets=0,
+        positions: Optional[Sequence[int]] = None,
+        sizes: Optional[Sequence[int]] = None,
+        width=0,
+        height=0,
+        container_duration: Optional[float] = None,
+    ):
+        if positions is None:
+            positions = [-1] * len(keyframes)
+        if sizes is None:
+            sizes = [0] * len(keyframes)
+        if not (len(keyframes) == len(positions) == len(sizes)):
+            raise ValueError("The keyframe entries must have the same length")
+
+        entries = sorted(zip(keyframes, positions, sizes))
+        self._time_base = time_base
+        self._keyframes = [e[0] for e in entries]
+        self._positions = [e[1] for e in entries]
+        self._sizes = [e[2] for e in entries]
+        self._start_pts = start_pts
+        self._end_pts = end_pts
+        self._packets = packets
+        self._width = width
+        self._height = height
+        self._container_duration = container_duration
+
+    @property
+    def time_base(self) -> Fraction:
+        return self._time_base
+
+    @property
+    def keyframes(self) -> List[int]:
+        return self._keyframes
+
+    @property
+    def positions(self) -> List[int]:
+        """
+        Byte positions of the keyframe packets in the file. -1 if unknown.
+        """
+        return self._positions
+
+    @property
+    def sizes(self) -> List[int]:
+        return self._sizes
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def start_pts(self) -> int:
+        return self._start_pts
+
+    @property
+    def end_pts(self) -> int:
+        return self._end_pts
+
+    @property
+    def packets(self) -> int:
+        return self._packets
+
+    @property
+    def duration(self) -> float:
+        return float((self._end_pts - self._start_pts) * self._time_base)
+
+    @property
+    def container_duration(self) -> Optional[float]:
+        """
+        Duration of the container in seconds, as reported by FFmpeg,
+        or `None` if it is unknown.
+        """
+        return self._container_duration
+
+    def __len__(self) -> int:
+        return len(self._keyframes)
+
+    def to_pts(self, seconds: float) -> int:
+        return self._start_pts + int(round(seconds / self._time_base))
+
+    def to_seconds(self, pts: int) -> float:
+        return float((pts - self._start_pts) * self._time_base)
+
+    def find(self, pts: int) -> Optional[int]:
+        """
+        Returns the pts of the last keyframe at or before `pts`,
+        or `None` if there is no such keyframe.
+        """
+
+        i = bisect_right(self._keyframes, pts)
+        return self._keyframes[i - 1] if i > 0 else None
+
+
+def build_keyframe_index(container, stream) -> KeyframeIndex:
+    """
+    Scans the packets of `stream` without decoding them.
+    The container is left at the end of the file.
+    """
+
+    keyframes = list()
+    positions = list()
+    sizes = list()
+    start_pts: Optional[int] = None
+    end_pts: Optional[int] = None
+    packets = 0
+
+    for packet in container.demux(stream):
+        if packet.dts is None:
+            continue
+
+        pts = packet.pts if packet.pts is not None else packet.dts
+        packets += 1
+        if packet.is_keyframe:
+            keyframes.append(pts)
+            positions.append(packet.pos if packet.pos is not None else -1)
+            sizes.append(packet.size)
+        if start_pts is None or pts < start_pts:
+            start_pts = pts
+        end = pts + (packet.duration or 0)
+        if end_pts is None or end > end_pts:
+            end_pts = end
+
+    container_duration: Optional[float] = None
+    if container.duration is not None:
+        container_duration = container.duration / AV_TIME_BASE
+
+    return KeyframeIndex(
+        time_base=stream.time_base,
+        keyframes=keyframes,
+        start_pts=start_pts if start_pts is not None else 0,
+        end_pts=end_pts if end_pts is not None else 0,
+        packets=packets,
+        positions=positions,
+        sizes=sizes,
+        width=stream.codec_context.width,
+        height=stream.codec_context.height,
+        container_duration=container_duration,
+    )
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 # mypy: disable-error-code="call-overload, operator"
 
+from os import path
 from typing import NamedTuple, Optional, Tuple, Union
 
+from avplayer.av.av_index_cache import load_cached_index
+
 
 class AvProbe(NamedTuple):
     width: int
@@ -13,7 +16,18 @@ class AvProbe(NamedTuple):
 def get_av_probe(
     file: str,
     timeout: Optional[Union[float, Tuple[float, float]]] = None,
+    index_cache_dir: Optional[str] = None,
 ) -> AvProbe:
+    # A valid keyframe index cache of a local file answers without opening it.
+    if path.exists(file):
+        index = load_cached_index(file, index_cache_dir)
+        if index is not None and index.container_duration is not None:
+            return AvProbe(
+                width=index.width,
+                height=index.height,
+                duration=index.container_duration,
+            )
+
     from av import open as av_open  # noqa
     from av._core import time_base  # noqa
     from av.container import InputContainer
@@ -22,8 +36,12 @@ def get_av_probe(
     input_container = av_open(file=file, mode="r", timeout=timeout)
     assert isinstance(input_container, InputContainer)
 
-    duration = input_container.duration / time_base
-    width = input_container.width  # type: ignore[attr-defined]
-    height = input_container.height  # type: ignore[attr-defined]
+    try:
+        duration = input_container.duration / time_base
+        video_stream = input_container.streams.video[0]
+        width = video_stream.codec_context.width
+        height = video_stream.codec_context.height
+    finally:
+        input_container.close()
 
     return AvProbe(width=width, height=height, duration=duration)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+from random import random
+from typing import Callable, Optional
+
+from avplayer.variables import (
+    DEFAULT_RECONNECT_BACKOFF_MAX,
+    DEFAULT_RECONNECT_BACKOFF_MIN,
+)
+
+
+class ExponentialBackoff:
+    """
+    Delays between reconnect attempts.
+
+    The upper bound doubles with each attempt up to `maximum`, and the delay is
+    randomly reduced by up to `jitter` of it, so that many sources that failed
+    at the same time do not reconnect at the same time.
+    """
+
+    def __init__(
+        self,
+        minimum=DEFAULT_RECONNECT_BACKOFF_MIN,
+        maximum=DEFAULT_RECONNECT_BACKOFF_MAX,
+        factor=2.0,
+        jitter=0.5,
+        rand: Optional[Callable[[], float]] = None,
+    ):
+        if minimum < 0:
+            raise ValueError("The minimum delay must not be negative")
+        if maximum < minimum:
+            raise ValueError("The maximum delay must not be less than the minimum")
+        if not (0.0 <= jitter <= 1.0):
+            raise ValueError("The jitter must be in the range [0, 1]")
+
+        self._minimum = minimum
+        self._maximum = maximum
+        self._factor = factor
+        self._jitter = jitter
+        self._rand = rand if rand is not None else random
+
+    @property
+    def minimum(self) -> float:
+        return self._minimum
+
+    @property
+    def maximum(self) -> float:
+        return self._maximum
+
+    def upper_bound(self, attempt: int) -> float:
+        return min(self._maximum, self._minimum * (self._factor**attempt))
+
+    def delay(self, attempt: int) -> float:
+        upper = self.upper_bound(attempt)
+        return upper * (1.0 - self._jitter * self._rand())
@@ -6,17 +6,35 @@ from enum import Enum, auto, unique
 from re import split as re_split
 from typing import List, Optional, Sequence, Tuple
 
+from avplayer.ffmpeg.ffmpeg import DEFAULT_PIXEL_FORMAT
 from avplayer.logging.logging import logger
 from avplayer.variables import (
     AIO_APP,
     AIOTK_APP,
     CV_APP,
+    DEFAULT_ANALYSIS_FPS,
     DEFAULT_AV_OPEN_TIMEOUT,
     DEFAULT_AV_READ_TIMEOUT,
+    DEFAULT_CALLBACK_PROCESSES,
     DEFAULT_CV_EXIT_KEYS,
+    DEFAULT_DECODE_MODE,
+    DEFAULT_DROP_POLICY,
     DEFAULT_DROP_THRESHOLD,
+    DEFAULT_ENCODE_OVERFLOW,
+    DEFAULT_ENCODE_QUEUE_SIZE,
+    DEFAULT_ENCODER_PROFILE,
+    DEFAULT_FLOW_CREDITS,
+    DEFAULT_FRAME_POOL_SIZE,
+    DEFAULT_HANDOFF_MODE,
     DEFAULT_IO_BUFFER_SIZE,
+    DEFAULT_LATENCY_BUDGET,
     DEFAULT_LOGGING_STEP,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_METRICS_HOST,
+    DEFAULT_METRICS_PORT,
+    DEFAULT_RECONNECT_BACKOFF_MAX,
+    DEFAULT_RECONNECT_BACKOFF_MIN,
+    DEFAULT_RECONNECT_MAX_ATTEMPTS,
     DEFAULT_WIN_FPS,
     DEFAULT_WIN_GEOMETRY,
     DEFAULT_WIN_QUEUE_SIZE,
@@ -46,6 +64,30 @@ class AvConfig:
         buffer_size=DEFAULT_IO_BUFFER_SIZE,
         drop_slow_frame=False,
         drop_threshold=DEFAULT_DROP_THRESHOLD,
+        drop_policy=DEFAULT_DROP_POLICY,
+        latency_budget=DEFAULT_LATENCY_BUDGET,
+        handoff_mode=DEFAULT_HANDOFF_MODE,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        flow_credits=DEFAULT_FLOW_CREDITS,
+        frame_pool_size=DEFAULT_FRAME_POOL_SIZE,
+        pixel_format=DEFAULT_PIXEL_FORMAT,
+        decode_mode=DEFAULT_DECODE_MODE,
+        analysis_fps=DEFAULT_ANALYSIS_FPS,
+        callback_processes=DEFAULT_CALLBACK_PROCESSES,
+        encode_queue_size=DEFAULT_ENCODE_QUEUE_SIZE,
+        encode_overflow=DEFAULT_ENCODE_OVERFLOW,
+        stream_copy=False,
+        encoder_profile=DEFAULT_ENCODER_PROFILE,
+        reconnect=False,
+        reconnect_max_attempts=DEFAULT_RECONNECT_MAX_ATTEMPTS,
+        reconnect_backoff_min=DEFAULT_RECONNECT_BACKOFF_MIN,
+        reconnect_backoff_max=DEFAULT_RECONNECT_BACKOFF_MAX,
+        index_cache=False,
+        index_cache_dir: Optional[str] = None,
+        latency_trace=False,
+        metrics_host=DEFAULT_METRICS_HOST,
+        metrics_port=DEFAULT_METRICS_PORT,
+        trace_file: Optional[str] = None,
         ffmpeg_path="ffmpeg",
         printer=print,
         logging_step=DEFAULT_LOGGING_STEP,
@@ -73,6 +115,30 @@ class AvConfig:
         self.buffer_size = buffer_size
         self.drop_slow_frame = drop_slow_frame
         self.drop_threshold = drop_threshold
+        self.drop_policy = drop_policy
+        self.latency_budget = latency_budget
+        self.handoff_mode = handoff_mode
+        self.max_in_flight = max_in_flight
+        self.flow_credits = flow_credits
+        self.frame_pool_size = frame_pool_size
+        self.pixel_format = pixel_format
+        self.decode_mode = decode_mode
+        self.analysis_fps = analysis_fps
+        self.callback_processes = callback_processes
+        self.encode_queue_size = encode_queue_size
+        self.encode_overflow = encode_overflow
+        self.stream_copy = stream_copy
+        self.encoder_profile = encoder_profile
+        self.reconnect = reconnect
+        self.reconnect_max_attempts = reconnect_max_attempts
+        self.reconnect_backoff_min = reconnect_backoff_min
+        self.reconnect_backoff_max = reconnect_backoff_max
+        self.index_cache = index_cache
+        self.index_cache_dir = index_cache_dir
+        self.latency_trace = latency_trace
+        self.metrics_host = metrics_host
+        self.metrics_port = metrics_port
+        self.trace_file = trace_file
         self.ffmpeg_path = ffmpeg_path
         self.logging_step = logging_step
         self.use_uvloop = use_uvloop
@@ -129,7 +195,31 @@ class AvConfig:
         assert isinstance(args.timeout_read, float)
         assert isinstance(args.buffer_size, int)
         assert isinstance(args.drop_slow_frame, bool)
+        assert isinstance(args.drop_policy, str)
+        assert isinstance(args.latency_budget, float)
+        assert isinstance(args.handoff_mode, str)
+        assert isinstance(args.max_in_flight, int)
+        assert isinstance(args.flow_credits, int)
         assert isinstance(args.drop_threshold, int)
+        assert isinstance(args.frame_pool_size, int)
+        assert isinstance(args.pixel_format, str)
+        assert isinstance(args.decode_mode, str)
+        assert isinstance(args.analysis_fps, float)
+        assert isinstance(args.callback_processes, int)
+        assert isinstance(args.encode_queue_size, int)
+        assert isinstance(args.encode_overflow, str)
+        assert isinstance(args.copy, bool)
+        assert isinstance(args.encoder_profile, str)
+        assert isinstance(args.reconnect, bool)
+        assert isinstance(args.reconnect_max_attempts, int)
+        assert isinstance(args.reconnect_backoff_min, float)
+        assert isinstance(args.reconnect_backoff_max, float)
+        assert isinstance(args.index_cache, bool)
+        assert isinstance(args.index_cache_dir, (type(None), str))
+        assert isinstance(args.latency_trace, bool)
+        assert isinstance(args.metrics_host, str)
+        assert isinstance(args.metrics_port, int)
+        assert isinstance(args.trace_file, (type(None), str))
         assert isinstance(args.win_geometry, str)
         assert isinstance(args.win_title, str)
         assert isinstance(args.win_fps, int)
@@ -153,6 +243,31 @@ class AvConfig:
         timeout_read = args.timeout_read
         buffer_size = args.buffer_size
         drop_slow_frame = args.drop_slow_frame
+        drop_threshold = args.drop_threshold
+        drop_policy = args.drop_policy
+        latency_budget = args.latency_budget
+        handoff_mode = args.handoff_mode
+        max_in_flight = args.max_in_flight
+        flow_credits = args.flow_credits
+        frame_pool_size = args.frame_pool_size
+        pixel_format = args.pixel_format
+        decode_mode = args.decode_mode
+        analysis_fps = args.analysis_fps
+        callback_processes = args.callback_processes
+        encode_queue_size = args.encode_queue_size
+        encode_overflow = args.encode_overflow
+        stream_copy = args.copy
+        encoder_profile = args.encoder_profile
+        reconnect = args.reconnect
+        reconnect_max_attempts = args.reconnect_max_attempts
+        reconnect_backoff_min = args.reconnect_backoff_min
+        reconnect_backoff_max = args.reconnect_backoff_max
+        index_cache = args.index_cache
+        index_cache_dir = args.index_cache_dir
+        latency_trace = args.latency_trace
+        metrics_host = args.metrics_host
+        metrics_port = args.metrics_port
+        trace_file = args.trace_file
         win_geometry = args.win_geometry
         win_title = args.win_title
         win_fps = args.win_fps
@@ -174,6 +289,31 @@ class AvConfig:
             timeout_read=timeout_read,
             buffer_size=buffer_size,
             drop_slow_frame=drop_slow_frame,
+            drop_threshold=drop_threshold,
+            drop_policy=drop_policy,
+            latency_budget=latency_budget,
+            handoff_mode=handoff_mode,
+            max_in_flight=max_in_flight,
+            flow_credits=flow_credits,
+            frame_pool_size=frame_pool_size,
+            pixel_format=pixel_format,
+            decode_mode=decode_mode,
+            analysis_fps=analysis_fps,
+            callback_processes=callback_processes,
+            encode_queue_size=encode_queue_size,
+            encode_overflow=encode_overflow,
+            stream_copy=stream_copy,
+            encoder_profile=encoder_profile,
+            reconnect=reconnect,
+            reconnect_max_attempts=reconnect_max_attempts,
+            reconnect_backoff_min=reconnect_backoff_min,
+            reconnect_backoff_max=reconnect_backoff_max,
+            index_cache=index_cache,
+            index_cache_dir=index_cache_dir,
+            latency_trace=latency_trace,
+            metrics_host=metrics_host,
+            metrics_port=metrics_port,
+            trace_file=trace_file,
             ffmpeg_path=ffmpeg_path,
             printer=printer,
             logging_step=logging_step,
@@ -225,6 +365,31 @@ class AvConfig:
             f"AV IO open timeout: {self.timeout_open:.3f}s",
             f"AV IO read timeout: {self.timeout_read:.3f}s",
             f"Buffer size: {self.buffer_size} bytes",
+            f"Drop slow frame: {self.drop_slow_frame}",
+            f"Drop threshold: {self.drop_threshold}",
+            f"Drop policy: '{self.drop_policy}'",
+            f"Latency budget: {self.latency_budget:.3f}s",
+            f"Handoff mode: '{self.handoff_mode}'",
+            f"Max in-flight callbacks: {self.max_in_flight}",
+            f"Flow credits: {self.flow_credits}",
+            f"Frame pool size: {self.frame_pool_size}",
+            f"Pixel format: '{self.pixel_format}'",
+            f"Decode mode: '{self.decode_mode}'",
+            f"Analysis fps: {self.analysis_fps:.2f}",
+            f"Callback processes: {self.callback_processes}",
+            f"Encode queue size: {self.encode_queue_size}",
+            f"Encode overflow: '{self.encode_overflow}'",
+            f"Stream copy: {self.stream_copy}",
+            f"Encoder profile: '{self.encoder_profile}'",
+            f"Reconnect: {self.reconnect}",
+            f"Reconnect max attempts: {self.reconnect_max_attempts}",
+            f"Reconnect backoff: {self.reconnect_backoff_min:.3f}s"
+            f" ~ {self.reconnect_backoff_max:.3f}s",
+            f"Index cache: {self.index_cache}",
+            f"Index cache dir: {self.index_cache_dir}",
+            f"Latency trace: {self.latency_trace}",
+            f"Metrics endpoint: {self.metrics_host}:{self.metrics_port}",
+            f"Trace file: '{self.trace_file}'",
             f"FFmpeg path: '{self.ffmpeg_path}'",
             f"Logging step: {self.logging_step}",
             f"Use uvloop: {self.use_uvloop}",
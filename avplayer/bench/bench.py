@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from platform import node, platform, python_version
+from tempfile import TemporaryDirectory
+from time import perf_counter, process_time
+from typing import Any, Dict, Final, List, Mapping, Optional, Sequence, Tuple
+
+from avplayer.bench.synthetic import (
+    BENCH_RESOLUTIONS,
+    DEFAULT_BENCH_FPS,
+    DEFAULT_BENCH_FRAMES,
+    write_synthetic_clip,
+)
+from avplayer.debug.hist_stat import HistStat
+from avplayer.logging.logging import logger
+from avplayer.variables import DEFAULT_ENCODER_PROFILE
+
+BENCH_REPORT_VERSION: Final[int] = 1
+DEFAULT_BENCH_TOLERANCE: Final[float] = 0.1
+"""A stage regresses when its fps drops by more than this ratio from the baseline.
+"""
+
+BENCH_STAGE_DEMUX: Final[str] = "demux"
+BENCH_STAGE_DECODE: Final[str] = "decode"
+BENCH_STAGE_CONVERT: Final[str] = "convert"
+BENCH_STAGE_HANDOFF: Final[str] = "handoff"
+BENCH_STAGE_ENCODE: Final[str] = "encode"
+BENCH_STAGE_MUX: Final[str] = "mux"
+
+AVIO_BENCH_STAGES: Final[Mapping[str, str]] = {
+    BENCH_STAGE_DEMUX: "read",
+    BENCH_STAGE_DECODE: "decode",
+    BENCH_STAGE_CONVERT: "convert",
+    BENCH_STAGE_ENCODE: "encode",
+    BENCH_STAGE_MUX: "write",
+}
+"""Benchmark stages measured by the `AvIo.stats` of the same names.
+"""
+
+APP_BENCH_STAGES: Final[Mapping[str, str]] = {
+    BENCH_STAGE_HANDOFF: "handoff",
+}
+"""Benchmark stages measured by the `AsyncAvApp.stats` of the same names.
+"""
+
+
+@dataclass
+class BenchCase:
+    resolution: str
+    width: int
+    height: int
+    frames: int = 0
+    seconds: float = 0.0
+    fps: float = 0.0
+    cpu_percent: float = 0.0
+    peak_rss_mb: Optional[float] = None
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    The peak resident set size of the process, or `None` if it is not available.
+    """
+
+    try:
+        from resource import RUSAGE_SELF, getrusage
+    except ImportError:
+        return None
+
+    max_rss = getrusage(RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, and macOS reports bytes.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return max_rss * scale / (1024 * 1024)
+
+
+def summarize_stat(stat: HistStat) -> Dict[str, float]:
+    histogram = stat.snapshot()
+    mean = histogram.mean
+    return {
+        "count": histogram.count,
+        "fps": 1.0 / mean if mean > 0 else 0.0,
+        "avg_ms": mean * 1e3,
+        "p50_ms": histogram.percentile(50) * 1e3,
+        "p99_ms": histogram.percentile(99) * 1e3,
+        "max_ms": histogram.max * 1e3,
+    }
+
+
+def _measure_avio(
+    case: BenchCase,
+    source: str,
+    output: str,
+    encoder_profile: str,
+) -> None:
+    from avplayer.av.av_io import AvIo
+
+    # The stats are read at the end, so they never need to be logged.
+    avio = AvIo(
+        source,
+        output,
+        file_format="mp4",
+        logging_step=sys.maxsize,
+        encoder_profile=encoder_profile,
+    )
+
+    wall_begin = perf_counter()
+    cpu_begin = process_time()
+    avio.open()
+    try:
+        avio.run(None)
+    finally:
+        avio.close()
+    cpu = process_time() - cpu_begin
+    wall = perf_counter() - wall_begin
+
+    case.frames = avio.delivered_frames
+    case.seconds = wall
+    case.fps = case.frames / wall if wall > 0 else 0.0
+    case.cpu_percent = cpu / wall * 100 if wall > 0 else 0.0
+
+    stats = avio.stats
+    for stage, key in AVIO_BENCH_STAGES.items():
+        case.stages[stage] = summarize_stat(stats[key])
+
+
+def _measure_async_app(case: BenchCase, source: str) -> None:
+    from avplayer.apps.defaults.aio import AioApp
+    from avplayer.avconfig import AvConfig
+
+    # Without an output, only the handoff to the event loop is added to decoding.
+    config = AvConfig(source, logging_step=sys.maxsize)
+    app = AioApp(config)
+    app.start()
+
+    stats = app.stats
+    for stage, key in APP_BENCH_STAGES.items():
+        case.stages[stage] = summarize_stat(stats[key])
+
+
+def run_bench_case(
+    resolution: str,
+    work_dir: str,
+    frames=DEFAULT_BENCH_FRAMES,
+    fps=DEFAULT_BENCH_FPS,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+) -> BenchCase:
+    width, height = BENCH_RESOLUTIONS[resolution]
+    source = os.path.join(work_dir, f"bench-{resolution}.mp4")
+    output = os.path.join(work_dir, f"bench-{resolution}-output.mp4")
+
+    logger.info(f"Generate a synthetic {width}x{height} clip of {frames} frames")
+    write_synthetic_clip(source, width, height, frames, fps)
+
+    case = BenchCase(resolution, width, height)
+    _measure_avio(case, source, output, encoder_profile)
+    _measure_async_app(case, source)
+    case.peak_rss_mb = peak_rss_mb()
+    return case
+
+
+def run_bench(
+    resolutions: Sequence[str],
+    frames=DEFAULT_BENCH_FRAMES,
+    fps=DEFAULT_BENCH_FPS,
+    encoder_profile=DEFAULT_ENCODER_PROFILE,
+    work_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Measures each hot path on synthetic clips and returns a JSON-serializable report.
+
+    The peak RSS is of the whole process, so it never decreases between cases.
+    """
+
+    from av import __version__ as av_version
+    from avplayer import __version__ as avplayer_version
+
+    cases: List[BenchCase] = list()
+    with TemporaryDirectory() as temp_dir:
+        directory = work_dir if work_dir else temp_dir
+        for resolution in resolutions:
+            cases.append(
+                run_bench_case(resolution, directory, frames, fps, encoder_profile)
+            )
+
+    return {
+        "version": BENCH_REPORT_VERSION,
+        "avplayer": avplayer_version,
+        "pyav": av_version,
+        "python": python_version(),
+        "platform": platform(),
+        "host": node(),
+        "cpu_count": os.cpu_count(),
+        "encoder_profile": encoder_profile,
+        "frames": frames,
+        "cases": [asdict(case) for case in cases],
+    }
+
+
+def _fps_of_cases(report: Mapping[str, Any]) -> Dict[Tuple[str, str], float]:
+    result = dict()
+    for case in report.get("cases", list()):
+        resolution = case["resolution"]
+        result[(resolution, "pipeline")] = case["fps"]
+        for stage, summary in case["stages"].items():
+            result[(resolution, stage)] = summary["fps"]
+    return result
+
+
+def compare_reports(
+    baseline: Mapping[str, Any],
+    current: Mapping[str, Any],
+    tolerance=DEFAULT_BENCH_TOLERANCE,
+) -> Tuple[List[str], bool]:
+    """
+    Compares the fps of each stage with the baseline report.
+
+    :return:
+        The report lines, and whether any stage regressed beyond the `tolerance`.
+    """
+
+    baseline_fps = _fps_of_cases(baseline)
+    current_fps = _fps_of_cases(current)
+
+    lines = [
+        f"Compare avplayer {current.get('avplayer')}"
+        f" with baseline {baseline.get('avplayer')}:"
+    ]
+    regressed = False
+    for key, fps in current_fps.items():
+        resolution, stage = key
+        name = f"{resolution} {stage}"
+        before = baseline_fps.get(key)
+        if not before:
+            lines.append(f"  {name:<16} {fps:10.2f} fps (no baseline)")
+            continue
+
+        change = fps / before - 1.0
+        mark = str()
+        if change < -tolerance:
+            mark = " REGRESSION"
+            regressed = True
+        lines.append(
+            f"  {name:<16} {before:10.2f} -> {fps:10.2f} fps ({change:+.1%}){mark}"
+        )
+    return lines, regressed
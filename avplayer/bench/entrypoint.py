@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import json
+from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
+from typing import Callable, Final, List, Optional
+
+from avplayer.bench.bench import DEFAULT_BENCH_TOLERANCE, compare_reports, run_bench
+from avplayer.bench.synthetic import (
+    BENCH_RESOLUTION_NAMES,
+    DEFAULT_BENCH_FPS,
+    DEFAULT_BENCH_FRAMES,
+)
+from avplayer.logging.logging import (
+    SEVERITIES,
+    SEVERITY_NAME_ERROR,
+    set_root_level,
+    set_simple_logging_config,
+)
+from avplayer.variables import DEFAULT_ENCODER_PROFILE, ENCODER_PROFILE_NAMES
+
+BENCH_COMMAND: Final[str] = "bench"
+PROG: Final[str] = f"avplayer {BENCH_COMMAND}"
+DESCRIPTION: Final[str] = "Measure the hot paths of avplayer on synthetic clips"
+EPILOG = f"""
+Examples:
+
+  Save the results of this host:
+    {PROG} -o baseline.json
+
+  Compare an upgrade with the saved results:
+    {PROG} --baseline baseline.json
+"""
+
+
+def default_argument_parser() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog=PROG,
+        description=DESCRIPTION,
+        epilog=EPILOG,
+        formatter_class=RawDescriptionHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        choices=BENCH_RESOLUTION_NAMES,
+        default=list(BENCH_RESOLUTION_NAMES),
+        help="Resolutions of the synthetic clips (default: all)",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=DEFAULT_BENCH_FRAMES,
+        metavar="count",
+        help=f"Frames of each synthetic clip (default: {DEFAULT_BENCH_FRAMES})",
+    )
+    parser.add_argument(
+        "--fps",
+        type=int,
+        default=DEFAULT_BENCH_FPS,
+        metavar="fps",
+        help=f"Frame rate of each synthetic clip (default: {DEFAULT_BENCH_FPS})",
+    )
+    parser.add_argument(
+        "--encoder-profile",
+        choices=ENCODER_PROFILE_NAMES,
+        default=DEFAULT_ENCODER_PROFILE,
+        help=f"Encoder profile of the output (default: '{DEFAULT_ENCODER_PROFILE}')",
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=None,
+        metavar="dir",
+        help="Keep the synthetic clips in this directory instead of a temporary one",
+    )
+
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        metavar="file",
+        help=(
+            "Compare the results with a previously saved JSON report, "
+            "and print the comparison instead of the report"
+        ),
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_BENCH_TOLERANCE,
+        metavar="ratio",
+        help=(
+            "Fps drop ratio from the baseline that is reported as a regression "
+            f"(default: {DEFAULT_BENCH_TOLERANCE})"
+        ),
+    )
+
+    parser.add_argument(
+        "--severity",
+        choices=SEVERITIES,
+        default=SEVERITY_NAME_ERROR,
+        help=f"Logging severity (default: '{SEVERITY_NAME_ERROR}')",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=None,
+        metavar="file",
+        help="Write the JSON report to a file instead of the standard output",
+    )
+
+    return parser
+
+
+def get_bench_arguments(
+    cmdline: Optional[List[str]] = None,
+    namespace: Optional[Namespace] = None,
+) -> Namespace:
+    parser = default_argument_parser()
+    return parser.parse_args(cmdline, namespace)
+
+
+def main(
+    cmdline: Optional[List[str]] = None,
+    printer: Callable[..., None] = print,
+) -> int:
+    args = get_bench_arguments(cmdline)
+
+    assert isinstance(args.resolutions, list)
+    assert isinstance(args.frames, int)
+    assert isinstance(args.fps, int)
+    assert isinstance(args.encoder_profile, str)
+    assert isinstance(args.tolerance, float)
+    assert isinstance(args.severity, str)
+
+    set_simple_logging_config()
+    set_root_level(args.severity)
+
+    report = run_bench(
+        args.resolutions,
+        args.frames,
+        args.fps,
+        args.encoder_profile,
+        args.work_dir,
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    elif not args.baseline:
+        printer(json.dumps(report, indent=2))
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    lines, regressed = compare_reports(baseline, report, args.tolerance)
+    for line in lines:
+        printer(line)
+    return 1 if regressed else 0
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# mypy: disable-error-code="attr-defined"
+
+from typing import Dict, Final, Tuple
+
+BENCH_RESOLUTIONS: Final[Dict[str, Tuple[int, int]]] = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+BENCH_RESOLUTION_NAMES: Final[Tuple[str, ...]] = tuple(BENCH_RESOLUTIONS.keys())
+
+DEFAULT_BENCH_FRAMES: Final[int] = 60
+DEFAULT_BENCH_FPS: Final[int] = 25
+DEFAULT_BENCH_GOP: Final[int] = 25
+
+SYNTHETIC_CLIP_CODEC: Final[str] = "libx264"
+SYNTHETIC_CLIP_OPTIONS: Final[Dict[str, str]] = {"preset": "veryfast", "bf": "2"}
+"""B-frames are kept, so that the decoder reorders frames like a typical source.
+"""
+
+
+def write_synthetic_clip(
+    path: str,
+    width: int,
+    height: int,
+    frames=DEFAULT_BENCH_FRAMES,
+    fps=DEFAULT_BENCH_FPS,
+    gop=DEFAULT_BENCH_GOP,
+) -> None:
+    """
+    Encodes a scrolling gradient into an H.264 clip,
+    so that the benchmark does not depend on any media files of the host.
+    """
+
+    from numpy import arange, uint8
+
+    from av import VideoFrame
+    from av import open as av_open
+
+    assert frames >= 1
+
+    # A diagonal gradient that scrolls by a few pixels per frame.
+    row = (arange(width + height * 2) % 251).astype(uint8)
+    options = dict(SYNTHETIC_CLIP_OPTIONS, g=str(gop))
+
+    container = av_open(path, mode="w")
+    try:
+        stream = container.add_stream(SYNTHETIC_CLIP_CODEC, rate=fps)
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = "yuv420p"
+        stream.options = options
+        for i in range(frames):
+            offset = (i * 4) % height
+            y = row[offset : offset + height]
+            plane = y[:, None] + row[None, :width]
+            frame = VideoFrame.from_ndarray(plane, format="gray")
+            container.mux(stream.encode(frame))
+        container.mux(stream.encode(None))
+    finally:
+        container.close()
@@ -8,7 +8,16 @@ from typing import Final, Optional
 STEP_AVG_STRFMT: Final[str] = "[{name}] Step #{step} average duration: {avg:.3f}s"
 
 
+def stat_name(name: str, prefix: Optional[str] = None) -> str:
+    return f"{prefix}/{name}" if prefix else name
+
+
 class AvgStat:
+    """
+    A running mean that is reset on every emit.
+    The pipeline uses `HistStat`, which also reports the distribution.
+    """
+
     def __init__(
         self,
         name: str,
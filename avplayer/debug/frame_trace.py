@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+from logging import INFO, Logger
+from threading import Lock
+from time import perf_counter_ns
+from typing import Dict, Final, List, Optional, Sequence, Tuple
+
+from avplayer.debug.latency_histogram import LatencyHistogram
+
+TRACE_STAGE_READ: Final[str] = "read"
+TRACE_STAGE_DECODE: Final[str] = "decode"
+TRACE_STAGE_CONVERT: Final[str] = "convert"
+TRACE_STAGE_ENQUEUE: Final[str] = "enqueue"
+TRACE_STAGE_CALLBACK: Final[str] = "callback"
+TRACE_STAGE_ENCODE: Final[str] = "encode"
+TRACE_STAGE_WRITE: Final[str] = "write"
+TRACE_STAGES: Final[Sequence[str]] = (
+    TRACE_STAGE_READ,
+    TRACE_STAGE_DECODE,
+    TRACE_STAGE_CONVERT,
+    TRACE_STAGE_ENQUEUE,
+    TRACE_STAGE_CALLBACK,
+    TRACE_STAGE_ENCODE,
+    TRACE_STAGE_WRITE,
+)
+
+BUSY_STAGES: Final[Sequence[str]] = (
+    TRACE_STAGE_READ,
+    TRACE_STAGE_DECODE,
+    TRACE_STAGE_CONVERT,
+    TRACE_STAGE_CALLBACK,
+    TRACE_STAGE_ENCODE,
+    TRACE_STAGE_WRITE,
+)
+"""Stages in which the frame is being processed. The rest of the time is queueing.
+"""
+
+DEFAULT_MAX_SPANS: Final[int] = 1024
+"""Spans of frames that are never finished (e.g. dropped by the encoder queue)
+are evicted beyond this number.
+"""
+
+
+class FrameSpan:
+    """
+    The stage durations of a single frame, from reading its packet to writing it.
+    """
+
+    __slots__ = ("pts", "begin", "end", "durations")
+
+    def __init__(self, pts: int, begin: int):
+        self.pts = pts
+        self.begin = begin
+        self.end = begin
+        self.durations: Dict[str, int] = dict()
+
+    @property
+    def total(self) -> int:
+        return self.end - self.begin
+
+    @property
+    def busy(self) -> int:
+        return sum(self.durations.get(stage, 0) for stage in BUSY_STAGES)
+
+    @property
+    def queueing(self) -> int:
+        return max(self.total - self.busy, 0)
+
+
+class FrameTracer:
+    """
+    Collects per-frame spans keyed by pts, and records the total pipeline latency,
+    the queueing delay and each stage duration in latency histograms.
+
+    Stages of a frame may be recorded by different threads
+    (the decode thread, the event loop and the encoder thread).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        logger: Logger,
+        logging_step: int,
+        max_spans=DEFAULT_MAX_SPANS,
+        level=INFO,
+    ):
+        self._name = name
+        self._logger = logger
+        self._logging_step = logging_step
+        self._max_spans = max_spans
+        self._level = level
+
+        self._lock = Lock()
+        self._spans: Dict[int, FrameSpan] = dict()
+        self._evicted = 0
+
+        self._total = LatencyHistogram()
+        self._queueing = LatencyHistogram()
+        self._stages = {stage: LatencyHistogram() for stage in TRACE_STAGES}
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def total(self) -> LatencyHistogram:
+        return self._total
+
+    @property
+    def queueing(self) -> LatencyHistogram:
+        return self._queueing
+
+    @property
+    def stages(self) -> Dict[str, LatencyHistogram]:
+        return self._stages
+
+    @property
+    def pending_spans(self) -> int:
+        return len(self._spans)
+
+    @property
+    def evicted_spans(self) -> int:
+        return self._evicted
+
+    def snapshot(self) -> Tuple[LatencyHistogram, LatencyHistogram]:
+        """
+        Consistent copies of the total latency and the queueing delay histograms.
+        """
+        with self._lock:
+            return self._total.copy(), self._queueing.copy()
+
+    def begin(self, pts: int, begin: int) -> FrameSpan:
+        span = FrameSpan(pts, begin)
+        with self._lock:
+            self._spans[pts] = span
+            while len(self._spans) > self._max_spans:
+                # Dictionaries keep the insertion order, so this is the oldest span.
+                del self._spans[next(iter(self._spans))]
+                self._evicted += 1
+        return span
+
+    def stage(self, pts: Optional[int], stage: str, begin: int, end: int) -> None:
+        if pts is None:
+            return
+        span = self._spans.get(pts)
+        if span is not None:
+            span.durations[stage] = end - begin
+
+    def discard(self, pts: Optional[int]) -> None:
+        if pts is None:
+            return
+        with self._lock:
+            self._spans.pop(pts, None)
+
+    def finish(self, pts: Optional[int], end: Optional[int] = None) -> None:
+        if pts is None:
+            return
+
+        with self._lock:
+            span = self._spans.pop(pts, None)
+            if span is None:
+                return
+
+            span.end = end if end is not None else perf_counter_ns()
+            self._total.record(span.total)
+            self._queueing.record(span.queueing)
+            for stage, duration in span.durations.items():
+                self._stages[stage].record(duration)
+
+            if self._total.count % self._logging_step == 0:
+                self.do_logging()
+
+    def get_report(self) -> List[str]:
+        lines = [
+            f"[{self._name}] Frame #{self._total.count} latency: "
+            f"{self._total.get_report()}",
+            f"[{self._name}] Frame #{self._total.count} queueing: "
+            f"{self._queueing.get_report()}",
+        ]
+        for stage, histogram in self._stages.items():
+            if histogram.count:
+                lines.append(f"[{self._name}] Stage {stage}: {histogram.get_report()}")
+        return lines
+
+    def do_logging(self) -> None:
+        for line in self.get_report():
+            self._logger.log(self._level, line)
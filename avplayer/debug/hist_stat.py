@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+from logging import DEBUG, Logger
+from threading import Lock
+from time import perf_counter_ns
+from typing import Final, Optional
+
+from avplayer.debug.latency_histogram import LatencyHistogram
+
+DEFAULT_EWMA_ALPHA: Final[float] = 0.1
+"""The weight of the latest sample in the exponentially weighted moving averages.
+"""
+
+
+class HistStat:
+    """
+    Durations measured with `perf_counter_ns()` and kept in a log-bucket histogram.
+
+    Unlike `AvgStat`, the statistics are never reset, and reading them
+    (e.g. from the event loop) is safe while another thread records samples.
+    `do_enter()` and `do_exit()` keep the begin time in the instance,
+    so a thread that shares the stat with others should call `record()` instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        logger: Logger,
+        logging_step: int,
+        verbose=0,
+        verbose_threshold=0,
+        level=DEBUG,
+        enable=True,
+        alpha=DEFAULT_EWMA_ALPHA,
+    ):
+        self._name = name
+        self._logger = logger
+        self._logging_step = logging_step
+        self._verbose = verbose
+        self._verbose_threshold = verbose_threshold
+        self._level = level
+        self._enable = enable
+        self._alpha = alpha
+
+        self._lock = Lock()
+        self._histogram = LatencyHistogram()
+        self._min = 0
+        self._ewma = 0.0
+        self._interval_ewma = 0.0
+        self._last_record = 0
+        self._begin = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def verbose(self) -> int:
+        return self._verbose
+
+    @verbose.setter
+    def verbose(self, value: int):
+        self._verbose = value
+
+    @property
+    def enabled(self) -> bool:
+        return self._enable
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enable = value
+
+    @property
+    def step(self) -> int:
+        return self._histogram.count
+
+    @property
+    def avg(self) -> float:
+        return self._histogram.mean
+
+    @property
+    def min(self) -> float:
+        return self._min / 1e9
+
+    @property
+    def max(self) -> float:
+        return self._histogram.max
+
+    @property
+    def ewma(self) -> float:
+        return self._ewma / 1e9
+
+    @property
+    def rate(self) -> float:
+        """
+        Samples per second, from the moving average of the intervals between samples.
+        """
+        interval = self._interval_ewma
+        return 1e9 / interval if interval > 0 else 0.0
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            return self._histogram.percentile(q)
+
+    def snapshot(self) -> LatencyHistogram:
+        """
+        A consistent copy of the histogram, for readers on other threads.
+        """
+        with self._lock:
+            return self._histogram.copy()
+
+    @property
+    def is_emit(self) -> bool:
+        if self._verbose < self._verbose_threshold:
+            return False
+        return self._histogram.count % self._logging_step == 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histogram.clear()
+            self._min = 0
+            self._ewma = 0.0
+            self._interval_ewma = 0.0
+            self._last_record = 0
+
+    def record(self, duration: int, now: Optional[int] = None) -> None:
+        """
+        Adds a duration in nanoseconds.
+        """
+
+        if not self._enable:
+            return
+
+        if now is None:
+            now = perf_counter_ns()
+        with self._lock:
+            histogram = self._histogram
+            histogram.record(duration)
+            if histogram.count == 1:
+                self._min = duration
+                self._ewma = float(duration)
+            else:
+                if duration < self._min:
+                    self._min = duration
+                self._ewma += self._alpha * (duration - self._ewma)
+
+                interval = now - self._last_record
+                if self._interval_ewma > 0:
+                    self._interval_ewma += self._alpha * (
+                        interval - self._interval_ewma
+                    )
+                else:
+                    self._interval_ewma = float(interval)
+            self._last_record = now
+            emit = histogram.count % self._logging_step == 0
+
+        if emit and self._verbose >= self._verbose_threshold:
+            self.do_logging()
+
+    def get_report(self) -> str:
+        with self._lock:
+            histogram = self._histogram
+            return (
+                f"[{self._name}] Step #{histogram.count} duration: "
+                f"avg={histogram.mean * 1e3:.3f}ms,"
+                f"ewma={self.ewma * 1e3:.3f}ms,"
+                f"min={self.min * 1e3:.3f}ms,"
+                f"{histogram.get_report()},"
+                f"rate={self.rate:.2f}/s"
+            )
+
+    def do_logging(self) -> None:
+        self._logger.log(self._level, self.get_report())
+
+    def do_enter(self, begin: Optional[int] = None) -> None:
+        """
+        :param begin:
+            The begin time from `perf_counter_ns()`, if measured elsewhere.
+        """
+        self._begin = begin if begin is not None else perf_counter_ns()
+
+    def do_exit(self, end: Optional[int] = None) -> None:
+        end = end if end is not None else perf_counter_ns()
+        self.record(end - self._begin, end)
+
+    def __enter__(self):
+        self._begin = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end = perf_counter_ns()
+        self.record(end - self._begin, end)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+from typing import Final, List
+
+SUB_BUCKET_BITS: Final[int] = 3
+"""Each power of two is split into 8 buckets, so the relative error is at most 12.5%.
+"""
+
+SUB_BUCKETS: Final[int] = 1 << SUB_BUCKET_BITS
+MAX_BUCKET_EXPONENT: Final[int] = 44
+"""Values of 2^44 ns (about 4.9 hours) and above fall into the last bucket.
+"""
+
+NUM_BUCKETS: Final[int] = (MAX_BUCKET_EXPONENT - SUB_BUCKET_BITS + 2) * SUB_BUCKETS
+_SUB_MASK: Final[int] = SUB_BUCKETS - 1
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return max(value, 0)
+    exponent = value.bit_length() - 1
+    shift = exponent - SUB_BUCKET_BITS
+    index = (shift + 1) * SUB_BUCKETS + ((value >> shift) & (SUB_BUCKETS - 1))
+    return min(index, NUM_BUCKETS - 1)
+
+
+def bucket_lower_bound(index: int) -> int:
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (SUB_BUCKETS + index % SUB_BUCKETS) << shift
+
+
+def bucket_upper_bound(index: int) -> int:
+    if index < SUB_BUCKETS:
+        return index + 1
+    shift = index // SUB_BUCKETS - 1
+    return bucket_lower_bound(index) + (1 << shift)
+
+
+class LatencyHistogram:
+    """
+    A fixed-size histogram of durations in nanoseconds with log-spaced buckets.
+
+    Recording is O(1) and the memory does not grow with the number of samples,
+    so it can be kept for the whole session.
+    """
+
+    def __init__(self):
+        self._buckets: List[int] = [0] * NUM_BUCKETS
+        self._count = 0
+        self._total = 0
+        self._max = 0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def max(self) -> float:
+        return self._max / 1e9
+
+    @property
+    def total(self) -> float:
+        return self._total / 1e9
+
+    @property
+    def mean(self) -> float:
+        return self._total / self._count / 1e9 if self._count else 0.0
+
+    def record(self, nanoseconds: int) -> None:
+        # `bucket_index()` inlined, as this is called for every frame.
+        if nanoseconds < SUB_BUCKETS:
+            index = max(nanoseconds, 0)
+        else:
+            shift = nanoseconds.bit_length() - 1 - SUB_BUCKET_BITS
+            index = (shift + 1) * SUB_BUCKETS + ((nanoseconds >> shift) & _SUB_MASK)
+            if index >= NUM_BUCKETS:
+                index = NUM_BUCKETS - 1
+        self._buckets[index] += 1
+        self._count += 1
+        self._total += nanoseconds
+        if nanoseconds > self._max:
+            self._max = nanoseconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the `q`-th percentile (0-100) in seconds, or 0 if there are no samples.
+        """
+
+        if not self._count:
+            return 0.0
+
+        rank = max(1, int(round(self._count * min(max(q, 0.0), 100.0) / 100.0)))
+        if rank >= self._count:
+            return self.max
+
+        cumulative = 0
+        for index, count in enumerate(self._buckets):
+            cumulative += count
+            if cumulative >= rank:
+                lower = bucket_lower_bound(index)
+                upper = bucket_upper_bound(index)
+                return min((lower + upper) / 2, self._max) / 1e9
+        return self.max
+
+    def copy(self) -> "LatencyHistogram":
+        result = LatencyHistogram()
+        result._buckets = list(self._buckets)
+        result._count = self._count
+        result._total = self._total
+        result._max = self._max
+        return result
+
+    def clear(self) -> None:
+        self._buckets = [0] * NUM_BUCKETS
+        self._count = 0
+        self._total = 0
+        self._max = 0
+
+    def get_report(self) -> str:
+        return (
+            f"p50={self.percentile(50) * 1e3:.3f}ms,"
+            f"p95={self.percentile(95) * 1e3:.3f}ms,"
+            f"p99={self.percentile(99) * 1e3:.3f}ms,"
+            f"max={self.max * 1e3:.3f}ms"
+        )
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Dict, Final, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+from avplayer.debug.hist_stat import HistStat
+from avplayer.debug.latency_histogram import LatencyHistogram
+from avplayer.logging.logging import logger
+
+METRICS_PATH: Final[str] = "/metrics"
+METRICS_CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PREFIX: Final[str] = "avplayer"
+METRICS_QUANTILES: Final[Sequence[float]] = (0.5, 0.95, 0.99)
+
+Labels = Mapping[str, str]
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return str()
+    pairs = ",".join(f'{k}="{escape_label_value(v)}"' for k, v in labels.items())
+    return "{" + pairs + "}"
+
+
+def format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricsWriter:
+    """
+    Collects samples and renders them in the Prometheus text exposition format.
+    Samples of the same metric from different sources are grouped together.
+    """
+
+    def __init__(self, prefix=METRICS_PREFIX):
+        self._prefix = prefix
+        self._families: Dict[str, Tuple[str, str, List[str]]] = dict()
+
+    def _family(self, name: str, kind: str, description: str) -> List[str]:
+        name = self._name(name)
+        family = self._families.get(name)
+        if family is None:
+            family = kind, description, list()
+            self._families[name] = family
+        return family[2]
+
+    def _name(self, name: str) -> str:
+        return f"{self._prefix}_{name}" if self._prefix else name
+
+    def counter(self, name: str, description: str, labels: Labels, value) -> None:
+        samples = self._family(name, "counter", description)
+        samples.append(
+            f"{self._name(name)}{format_labels(labels)} {format_value(value)}"
+        )
+
+    def gauge(self, name: str, description: str, labels: Labels, value) -> None:
+        samples = self._family(name, "gauge", description)
+        samples.append(
+            f"{self._name(name)}{format_labels(labels)} {format_value(value)}"
+        )
+
+    def summary(
+        self,
+        name: str,
+        description: str,
+        labels: Labels,
+        histogram: LatencyHistogram,
+    ) -> None:
+        samples = self._family(name, "summary", description)
+        full_name = self._name(name)
+        for q in METRICS_QUANTILES:
+            quantile_labels = dict(labels, quantile=str(q))
+            value = histogram.percentile(q * 100)
+            samples.append(
+                f"{full_name}{format_labels(quantile_labels)} {format_value(value)}"
+            )
+        label_text = format_labels(labels)
+        samples.append(f"{full_name}_sum{label_text} {format_value(histogram.total)}")
+        samples.append(f"{full_name}_count{label_text} {histogram.count}")
+
+    def stats(self, labels: Labels, stats: Mapping[str, HistStat]) -> None:
+        for stage, stat in stats.items():
+            stage_labels = dict(labels, stage=stage)
+            self.summary(
+                "stage_duration_seconds",
+                "Duration of each pipeline stage",
+                stage_labels,
+                stat.snapshot(),
+            )
+            self.gauge(
+                "stage_rate",
+                "Moving average of the stage executions per second",
+                stage_labels,
+                stat.rate,
+            )
+
+    def render(self) -> str:
+        lines = list()
+        for name, (kind, description, samples) in self._families.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        lines.append(str())
+        return "\n".join(lines)
+
+
+class MetricsSource(Protocol):
+    def collect_metrics(self, writer: MetricsWriter, labels: Labels) -> None: ...
+
+
+class MetricsExporter:
+    """
+    Serves the metrics of the registered sources over HTTP on a daemon thread.
+    Every scrape collects the current values, so there is no per-frame cost.
+    """
+
+    def __init__(self, host: str, port: int):
+        self._host = host
+        self._port = port
+        self._lock = Lock()
+        self._sources: Dict[str, MetricsSource] = dict()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """
+        The bound address. If the port was 0, it is the port chosen by the system.
+        """
+        if self._server is not None:
+            host, port = self._server.server_address[:2]
+            return str(host), int(port)
+        return self._host, self._port
+
+    def add_source(self, source_id: str, source: MetricsSource) -> None:
+        with self._lock:
+            self._sources[source_id] = source
+
+    def remove_source(self, source_id: str) -> None:
+        with self._lock:
+            self._sources.pop(source_id, None)
+
+    def collect(self) -> str:
+        writer = MetricsWriter()
+        with self._lock:
+            sources = list(self._sources.items())
+        for source_id, source in sources:
+            try:
+                source.collect_metrics(writer, {"source": source_id})
+            except BaseException as e:
+                logger.warning(f"[{source_id}] Failed to collect metrics: {e}")
+        return writer.render()
+
+    def start(self) -> None:
+        assert self._server is None
+        exporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa
+                if self.path.split("?")[0] != METRICS_PATH:
+                    self.send_error(404)
+                    return
+                body = exporter.collect().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # noqa
+                logger.debug(f"Metrics request: {format % args}")
+
+        self._server = ThreadingHTTPServer((self._host, self._port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = Thread(
+            target=self._server.serve_forever,
+            name="MetricsExporter",
+            daemon=True,
+        )
+        self._thread.start()
+
+        host, port = self.address
+        logger.info(f"Metrics endpoint: http://{host}:{port}{METRICS_PATH}")
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
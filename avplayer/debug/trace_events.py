@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from json import dumps
+from os import getpid
+from threading import Event, Lock, Thread, current_thread, get_ident
+from typing import IO, Any, Deque, Dict, Final, Optional, Tuple
+
+from avplayer.logging.logging import logger
+
+DEFAULT_TRACE_FLUSH_INTERVAL: Final[float] = 1.0
+"""Seconds between writes of the buffered events to the trace file.
+"""
+
+_TraceEvent = Tuple[str, int, int, int, Optional[Dict[str, Any]]]
+
+
+class TraceEventWriter:
+    """
+    Writes begin/end pairs of pipeline stages as 'complete' events of the
+    Chrome trace event format, which can be opened in Perfetto or chrome://tracing.
+
+    `complete()` only appends to a buffer and can be called from any thread.
+    The buffer is serialized and written by a background thread.
+    """
+
+    def __init__(self, path: str, flush_interval=DEFAULT_TRACE_FLUSH_INTERVAL):
+        self._path = path
+        self._flush_interval = flush_interval
+        self._pid = getpid()
+        self._events: Deque[_TraceEvent] = deque()
+        self._threads: Dict[int, str] = dict()
+        self._file: Optional[IO[str]] = None
+        self._thread: Optional[Thread] = None
+        self._closing = Event()
+        self._written = 0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def written_events(self) -> int:
+        return self._written
+
+    def open(self) -> None:
+        assert self._file is None
+        self._file = open(self._path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._write_event(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "args": {"name": "avplayer"},
+            }
+        )
+
+        self._closing.clear()
+        self._thread = Thread(target=self._main, name="TraceWriter", daemon=True)
+        self._thread.start()
+        logger.info(f"Trace file: '{self._path}'")
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+
+        self._closing.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self._flush()
+        self._file.write("\n]\n")
+        self._file.close()
+        self._file = None
+        logger.info(f"Closed the trace file ({self._written} events)")
+
+    def complete(
+        self,
+        name: str,
+        begin: int,
+        end: int,
+        args: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        :param begin:
+            The begin time from `perf_counter_ns()`.
+        :param end:
+            The end time from `perf_counter_ns()`.
+        """
+
+        tid = get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = current_thread().name
+        self._events.append((name, begin, end, tid, args))
+
+    def _write_event(self, event: Dict[str, Any]) -> None:
+        assert self._file is not None
+        if self._written:
+            self._file.write(",\n")
+        self._file.write(dumps(event, separators=(",", ":")))
+        self._written += 1
+
+    def _flush(self) -> None:
+        for tid, thread_name in list(self._threads.items()):
+            if thread_name:
+                self._write_event(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": self._pid,
+                        "tid": tid,
+                        "args": {"name": thread_name},
+                    }
+                )
+                # Each thread is named once.
+                self._threads[tid] = str()
+
+        events = self._events
+        while True:
+            try:
+                name, begin, end, tid, args = events.popleft()
+            except IndexError:
+                break
+
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": begin / 1000,
+                "dur": (end - begin) / 1000,
+                "pid": self._pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            self._write_event(event)
+
+        assert self._file is not None
+        self._file.flush()
+
+    def _main(self) -> None:
+        while not self._closing.wait(self._flush_interval):
+            try:
+                self._flush()
+            except BaseException as e:
+                logger.error(f"Trace writer error: {e}")
+                break
+
+
+_shared_lock = Lock()
+_shared_writers: Dict[str, Tuple[TraceEventWriter, int]] = dict()
+
+
+def acquire_trace_writer(path: str) -> TraceEventWriter:
+    """
+    Returns the writer of `path`, shared by all sources of the process.
+    """
+
+    with _shared_lock:
+        writer, count = _shared_writers.get(path, (None, 0))
+        if writer is None:
+            writer = TraceEventWriter(path)
+            writer.open()
+        _shared_writers[path] = writer, count + 1
+        return writer
+
+
+def release_trace_writer(writer: TraceEventWriter) -> None:
+    with _shared_lock:
+        shared = _shared_writers.get(writer.path)
+        if shared is None:
+            return
+        _, count = shared
+        if count > 1:
+            _shared_writers[writer.path] = writer, count - 1
+            return
+        del _shared_writers[writer.path]
+    writer.close()
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 
+from sys import argv
 from sys import exit as sys_exit
 from typing import Callable, List, Optional
 
 from avplayer.apps import av_main
 from avplayer.arguments import get_default_arguments
+from avplayer.bench.entrypoint import BENCH_COMMAND
+from avplayer.bench.entrypoint import main as bench_main
 from avplayer.logging.logging import (
     SEVERITY_NAME_DEBUG,
     logger,
@@ -19,6 +22,11 @@ def main(
     cmdline: Optional[List[str]] = None,
     printer: Callable[..., None] = print,
 ) -> int:
+    if cmdline is None:
+        cmdline = argv[1:]
+    if cmdline and cmdline[0] == BENCH_COMMAND:
+        return bench_main(cmdline[1:], printer)
+
     args = get_default_arguments(cmdline)
 
     colored_logging = args.colored_logging
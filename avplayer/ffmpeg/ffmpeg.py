@@ -3,7 +3,7 @@
 from io import StringIO
 from os import path
 from subprocess import check_output
-from typing import Final, List, NamedTuple
+from typing import Final, List, NamedTuple, Sequence
 from urllib.parse import urlparse
 
 from avplayer.ffmpeg.ffmpeg_formats import FFMPEG_FORMATS
@@ -57,8 +57,31 @@ PROFILE_HIGH444: Final[str] = "high444"
 # List presets and tunes
 # ffmpeg -hide_banner -f lavfi -i nullsrc -c:v libx264 -preset help -f mp4 -
 
+PIXEL_FORMAT_BGR24: Final[str] = "bgr24"
+PIXEL_FORMAT_RGB24: Final[str] = "rgb24"
+PIXEL_FORMAT_GRAY: Final[str] = "gray"
+PIXEL_FORMAT_YUV420P: Final[str] = "yuv420p"
+PIXEL_FORMAT_NV12: Final[str] = "nv12"
+
+IMAGE_PIXEL_FORMATS: Final[Sequence[str]] = (
+    PIXEL_FORMAT_BGR24,
+    PIXEL_FORMAT_RGB24,
+    PIXEL_FORMAT_GRAY,
+    PIXEL_FORMAT_YUV420P,
+    PIXEL_FORMAT_NV12,
+)
+"""Pixel formats that can be delivered to the callback as `NDArray[uint8]`.
+'bgr24' and 'rgb24' have the (h, w, 3) shape, 'gray' has the (h, w) shape,
+and the 4:2:0 formats have the (h * 3 / 2, w) shape in plane order.
+"""
+
+ENCODER_PIXEL_FORMATS: Final[Sequence[str]] = PIXEL_FORMAT_YUV420P, PIXEL_FORMAT_NV12
+"""Pixel formats that libx264 accepts without conversion.
+"""
+
 AUTOMATIC_DETECT_FILE_FORMAT: Final[str] = "autodect"
-DEFAULT_PIXEL_FORMAT: Final[str] = "bgr24"
+DEFAULT_PIXEL_FORMAT: Final[str] = PIXEL_FORMAT_BGR24
+DEFAULT_ENCODER_PIXEL_FORMAT: Final[str] = PIXEL_FORMAT_YUV420P
 DEFAULT_FILE_FORMAT: Final[str] = AUTOMATIC_DETECT_FILE_FORMAT
 
 FFMPEG_PIX_FMTS_HEADER_LINES: Final[int] = 8
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import Future as AsyncioFuture
+from asyncio import get_running_loop, wrap_future
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Deque, Dict, Final, Iterator, Optional, Tuple
+
+from numpy import ndarray, shares_memory, uint8
+from numpy.typing import NDArray
+
+from avplayer.logging.logging import logger
+
+RESULT_NONE: Final[int] = 0
+RESULT_SLOT: Final[int] = 1
+RESULT_ARRAY: Final[int] = 2
+
+DEFAULT_SLOTS_PER_PROCESS: Final[int] = 2
+
+_InFlight = Tuple[Optional[int], Tuple[int, ...], str, Future, Optional[int]]
+"""Slot index, image shape, image dtype, the future of the worker result,
+and the pts of the frame that the image was made from.
+"""
+
+_Popped = Tuple[Optional[NDArray[uint8]], Optional[int]]
+
+_worker_callback: Optional[Callable[[NDArray[uint8]], Optional[NDArray[uint8]]]]
+_worker_callback = None
+_worker_memories: Dict[str, SharedMemory] = dict()
+
+
+def _init_worker(callback) -> None:
+    global _worker_callback
+    _worker_callback = callback
+
+
+def _attach_worker_memory(name: str) -> SharedMemory:
+    memory = _worker_memories.get(name)
+    if memory is None:
+        memory = SharedMemory(name=name)
+        _worker_memories[name] = memory
+    return memory
+
+
+def _run_worker_callback(
+    name: Optional[str],
+    offset: int,
+    shape: Tuple[int, ...],
+    dtype: str,
+    image: Optional[NDArray[uint8]],
+) -> Tuple[int, Any]:
+    assert _worker_callback is not None
+
+    if name is not None:
+        memory = _attach_worker_memory(name)
+        image = ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+    assert image is not None
+
+    result = _worker_callback(image)
+    if result is None:
+        return RESULT_NONE, None
+
+    if name is not None and result.shape == shape and result.dtype == dtype:
+        if not shares_memory(result, image):
+            image[:] = result
+        return RESULT_SLOT, None
+
+    return RESULT_ARRAY, result
+
+
+class ProcessCallbackPool:
+    """
+    Runs a synchronous image callback in a pool of worker processes.
+
+    Images are transferred through a ring of slots in a single shared memory block
+    instead of being pickled. Results are returned in submission order.
+
+    The callback must be picklable (e.g. a module level function),
+    because the workers are started with the 'spawn' method,
+    which is safe to use from a process that already runs decoding threads.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[NDArray[uint8]], Optional[NDArray[uint8]]],
+        processes: int,
+        slots: Optional[int] = None,
+    ):
+        if processes < 1:
+            raise ValueError("The number of processes must be greater than 0")
+
+        self._callback = callback
+        self._processes = processes
+        self._slots = slots if slots else processes * DEFAULT_SLOTS_PER_PROCESS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._memory: Optional[SharedMemory] = None
+        self._slot_size = 0
+        self._free_slots: Deque[int] = deque()
+        self._in_flight: Deque[_InFlight] = deque()
+        self._held_slot: Optional[int] = None
+        self._tail: Optional[AsyncioFuture] = None
+
+    @property
+    def processes(self) -> int:
+        return self._processes
+
+    @property
+    def slots(self) -> int:
+        return self._slots
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._in_flight) >= self._slots
+
+    def open(self) -> None:
+        if self._executor is not None:
+            return
+
+        logger.info(f"Start callback processes: {self._processes}")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._processes,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._callback,),
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+        self._in_flight.clear()
+        self._free_slots.clear()
+        self._held_slot = None
+        self._tail = None
+
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+        logger.info("Callback processes have terminated")
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _prepare_memory(self, image: NDArray[uint8]) -> None:
+        if self._memory is not None:
+            return
+
+        self._slot_size = image.nbytes
+        self._memory = SharedMemory(create=True, size=self._slot_size * self._slots)
+        self._free_slots.extend(range(self._slots))
+        logger.debug(
+            f"Shared memory '{self._memory.name}' has been created: "
+            f"{self._slots} slots of {self._slot_size} bytes"
+        )
+
+    def _slot_array(self, slot: int, shape: Tuple[int, ...], dtype: str) -> NDArray:
+        assert self._memory is not None
+        offset = slot * self._slot_size
+        return ndarray(shape, dtype=dtype, buffer=self._memory.buf, offset=offset)
+
+    def _submit(self, image: NDArray[uint8], pts: Optional[int] = None) -> _InFlight:
+        assert self._executor is not None
+        self._prepare_memory(image)
+        assert self._memory is not None
+
+        shape = image.shape
+        dtype = image.dtype.str
+
+        if image.nbytes <= self._slot_size and self._free_slots:
+            slot: Optional[int] = self._free_slots.popleft()
+            assert slot is not None
+            self._slot_array(slot, shape, dtype)[:] = image
+            name: Optional[str] = self._memory.name
+            offset = slot * self._slot_size
+            payload: Optional[NDArray[uint8]] = None
+        else:
+            # Images that do not fit in a slot are pickled.
+            # The copy is required because pickling happens on another thread.
+            slot = None
+            name = None
+            offset = 0
+            payload = image.copy()
+
+        future = self._executor.submit(
+            _run_worker_callback, name, offset, shape, dtype, payload
+        )
+        return slot, shape, dtype, future, pts
+
+    def _collect(
+        self,
+        slot: Optional[int],
+        shape: Tuple[int, ...],
+        dtype: str,
+        future: Future,
+    ) -> Optional[NDArray[uint8]]:
+        kind, payload = future.result()
+        if kind == RESULT_SLOT:
+            assert slot is not None
+            return self._slot_array(slot, shape, dtype)
+        elif kind == RESULT_ARRAY:
+            return payload
+        else:
+            return None
+
+    def _release_held_slot(self) -> None:
+        if self._held_slot is not None:
+            self._free_slots.append(self._held_slot)
+            self._held_slot = None
+
+    def pop(self) -> Optional[NDArray[uint8]]:
+        """
+        Waits for the oldest image and returns its result.
+        A result that was written back to the shared memory is a view of the slot.
+        It remains valid until the next `push()`, `pop()` or `close()` call,
+        so callers that keep the result must copy it.
+        """
+
+        return self.pop_with_pts()[0]
+
+    def pop_with_pts(self) -> _Popped:
+        """
+        Like `pop()`, but also returns the pts that the image was submitted with.
+        """
+
+        self._release_held_slot()
+        slot, shape, dtype, future, pts = self._in_flight.popleft()
+        try:
+            result = self._collect(slot, shape, dtype, future)
+        except BaseException:
+            if slot is not None:
+                self._free_slots.append(slot)
+            raise
+        if slot is not None:
+            self._held_slot = slot
+        return result, pts
+
+    def submit(self, image: NDArray[uint8], pts: Optional[int] = None) -> None:
+        """
+        Submits the image without waiting for any result.
+        Callers must `pop()` once the ring `is_full`.
+        """
+
+        self._release_held_slot()
+        self._in_flight.append(self._submit(image, pts))
+
+    def push(self, image: NDArray[uint8]) -> Optional[NDArray[uint8]]:
+        """
+        Submits the image, and once the ring is full,
+        returns the result of the oldest image.
+        It can be passed to `AvIo.run()` instead of a synchronous callback.
+        """
+
+        self.submit(image)
+        if self.is_full:
+            return self.pop()
+        return None
+
+    __call__ = push
+
+    def drain(self) -> Iterator[Optional[NDArray[uint8]]]:
+        for result, _ in self.drain_with_pts():
+            yield result
+
+    def drain_with_pts(self) -> Iterator[_Popped]:
+        while self._in_flight:
+            yield self.pop_with_pts()
+        self._release_held_slot()
+
+    async def apply(self, image: NDArray[uint8]) -> Optional[NDArray[uint8]]:
+        """
+        Asynchronous version for callers on the event loop.
+        Concurrent calls return in the order they were made.
+        The result is copied out of the shared memory.
+        """
+
+        previous = self._tail
+        current = get_running_loop().create_future()
+        self._tail = current
+
+        try:
+            slot, shape, dtype, future, _ = self._submit(image)
+            try:
+                await wrap_future(future)
+                result = self._collect(slot, shape, dtype, future)
+                if result is not None and slot is not None:
+                    result = result.copy()
+            finally:
+                if slot is not None:
+                    self._free_slots.append(slot)
+
+            if previous is not None:
+                await previous
+            return result
+        finally:
+            current.set_result(None)
+            if self._tail is current:
+                self._tail = None
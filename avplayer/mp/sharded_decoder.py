@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from os import cpu_count
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from numpy import ndarray
+
+from avplayer.av.av_io import AvIo
+from avplayer.av.av_keyframe_index import KeyframeIndex
+from avplayer.ffmpeg.ffmpeg import DEFAULT_PIXEL_FORMAT
+from avplayer.logging.logging import logger
+
+ShardCallback = Callable[[ndarray], Any]
+ShardResult = Tuple[int, Any]
+"""The pts of the frame and the result of the callback.
+"""
+
+
+class Shard(NamedTuple):
+    number: int
+    start_pts: int
+    """The pts of the keyframe that starts the shard.
+    """
+
+    end_pts: Optional[int]
+    """The pts of the keyframe that starts the next shard. `None` for the last shard.
+    """
+
+
+def plan_shards(index: KeyframeIndex, shards: int) -> List[Shard]:
+    """
+    Splits the stream into at most `shards` keyframe-aligned ranges of similar duration.
+    """
+
+    if shards < 1:
+        raise ValueError("The number of shards must be greater than 0")
+    if not index.keyframes:
+        raise ValueError("The stream has no keyframes")
+
+    keyframes = index.keyframes
+    span = index.end_pts - index.start_pts
+    starts = [keyframes[0]]
+    for i in range(1, shards):
+        target = index.start_pts + span * i // shards
+        keyframe = index.find(target)
+        if keyframe is not None and keyframe > starts[-1]:
+            starts.append(keyframe)
+
+    ends: List[Optional[int]] = list(starts[1:])
+    ends.append(None)
+    return [Shard(i, s, e) for i, (s, e) in enumerate(zip(starts, ends))]
+
+
+def decode_shard(
+    source: str,
+    shard: Shard,
+    index: KeyframeIndex,
+    callback: Optional[ShardCallback] = None,
+    output: Optional[str] = None,
+    output_format: Optional[str] = None,
+    pixel_format=DEFAULT_PIXEL_FORMAT,
+) -> List[ShardResult]:
+    """
+    Decodes the frames of a single shard with its own `AvIo`.
+
+    Frames of an open GOP that are presented before the next shard's keyframe
+    are decoded from the following packets, so each frame belongs to exactly
+    one shard. If `output` is specified, results are encoded to it
+    and `None` is returned in their place.
+    """
+
+    # If `output_format` is `None`, FFmpeg guesses it from the output name.
+    avio = AvIo(
+        source,
+        output,
+        file_format=output_format,
+        pixel_format=pixel_format,
+        name=f"Shard{shard.number}",
+    )
+    avio.keyframe_index = index
+    results: List[ShardResult] = list()
+
+    avio.open()
+    try:
+        avio.seek(index.to_seconds(shard.start_pts))
+        while True:
+            try:
+                frame = avio.next_frame()
+            except EOFError:
+                break
+            # A frame without a pts stays in the shard that decoded it.
+            end_pts = shard.end_pts
+            if end_pts is not None and frame.pts is not None and frame.pts >= end_pts:
+                break
+
+            image = avio.frame_to_ndarray(frame)
+            result = callback(image) if callback is not None else None
+            if output:
+                avio.send(result if callback is not None else image)
+                result = None
+            results.append((frame.pts, result))
+    finally:
+        avio.close()
+
+    return results
+
+
+class ShardedDecoder:
+    """
+    Decodes a single local file in parallel worker processes.
+
+    The file is split into keyframe-aligned ranges, and each worker seeks to its
+    range with its own `AvIo`. The callback runs in the workers, so it must be
+    picklable, and its results are returned to the caller in pts order.
+    Results should be compact (e.g. detections), because a shard keeps its
+    results until the preceding shards have been delivered.
+    Alternatively, with `output_template` (e.g. "out_{shard}.mp4"),
+    each shard encodes its images to its own output.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        callback: Optional[ShardCallback] = None,
+        shards: Optional[int] = None,
+        processes: Optional[int] = None,
+        output_template: Optional[str] = None,
+        output_format: Optional[str] = None,
+        pixel_format=DEFAULT_PIXEL_FORMAT,
+    ):
+        self._source = source
+        self._callback = callback
+        self._processes = processes if processes else (cpu_count() or 1)
+        self._num_shards = shards if shards else self._processes
+        self._output_template = output_template
+        self._output_format = output_format
+        self._pixel_format = pixel_format
+        self._index: Optional[KeyframeIndex] = None
+        self._shards: List[Shard] = list()
+
+    @property
+    def processes(self) -> int:
+        return self._processes
+
+    @property
+    def shards(self) -> List[Shard]:
+        return self._shards
+
+    def plan(self) -> List[Shard]:
+        avio = AvIo(self._source)
+        self._index = avio.build_keyframe_index()
+        self._shards = plan_shards(self._index, self._num_shards)
+        logger.info(f"Decode {len(self._shards)} shards in {self._processes} processes")
+        return self._shards
+
+    def shard_output(self, shard: Shard) -> Optional[str]:
+        if not self._output_template:
+            return None
+        return self._output_template.format(shard=shard.number)
+
+    def results(self) -> Iterator[Tuple[float, Any]]:
+        """
+        Yields the time in seconds and the callback result of every frame in pts order.
+        """
+
+        if not self._shards:
+            self.plan()
+        assert self._index is not None
+
+        executor = ProcessPoolExecutor(
+            max_workers=self._processes,
+            mp_context=get_context("spawn"),
+        )
+        try:
+            futures: List[Future] = [
+                executor.submit(
+                    decode_shard,
+                    self._source,
+                    shard,
+                    self._index,
+                    self._callback,
+                    self.shard_output(shard),
+                    self._output_format,
+                    self._pixel_format,
+                )
+                for shard in self._shards
+            ]
+            # Shards are contiguous ranges, so shard order is pts order.
+            for future in futures:
+                for pts, result in future.result():
+                    yield self._index.to_seconds(pts), result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, on_result: Optional[Callable[[float, Any], None]] = None) -> int:
+        """
+        Returns the number of decoded frames.
+        """
+
+        count = 0
+        for seconds, result in self.results():
+            if on_result is not None:
+                on_result(seconds, result)
+            count += 1
+        return count
@@ -47,6 +47,76 @@ If the consumption rate is slower than the production rate, frames are dropped.
 The smaller this value, the closer it is to live video.
 """
 
+DEFAULT_LATENCY_BUDGET: Final[float] = 0.5
+"""Latency from the handoff to the output, in seconds,
+that the 'adaptive' drop policy keeps new frames within.
+"""
+
+DEFAULT_FRAME_POOL_SIZE: Final[int] = 0
+"""Number of reusable image buffers passed to the callback.
+If 0, a new image is allocated for every frame.
+Callers that keep images beyond the callback must copy them when pooling is enabled.
+"""
+
+DEFAULT_ANALYSIS_FPS: Final[float] = 0.0
+"""Target frame rate of the images passed to the callback.
+Frames are selected from pts before decoding (intra-only codecs)
+or before the pixel format conversion. If 0, all frames are passed.
+"""
+
+DEFAULT_CALLBACK_PROCESSES: Final[int] = 0
+"""Number of worker processes that run a synchronous callback.
+Images are transferred through shared memory. If 0, the callback runs in-process.
+"""
+
+DEFAULT_MAX_IN_FLIGHT: Final[int] = 0
+"""Number of `on_image` callbacks that can run concurrently in the event loop.
+If 0, there is no limit in the 'task' handoff mode, and callbacks run one at a time
+in the other modes.
+"""
+
+DEFAULT_FLOW_CREDITS: Final[int] = 0
+"""Number of frames the decode thread can hand over to the event loop
+before it blocks until the callbacks consume them.
+If 0, the decode thread never blocks, and slow callbacks are left to the drop policy.
+"""
+
+DEFAULT_ENCODE_QUEUE_SIZE: Final[int] = 0
+"""Number of frames waiting for the encoder thread.
+If 0, frames are encoded and written in the caller thread.
+"""
+
+DEFAULT_RECONNECT_MAX_ATTEMPTS: Final[int] = 0
+"""Number of consecutive attempts to reopen a failed input.
+If 0, reconnects until the 'done' flag is enabled.
+"""
+
+DEFAULT_RECONNECT_BACKOFF_MIN: Final[float] = 0.1
+"""Upper bound of the delay before the first reconnect attempt, in seconds.
+It doubles with every failed attempt.
+"""
+
+DEFAULT_RECONNECT_BACKOFF_MAX: Final[float] = 10.0
+"""Maximum delay between reconnect attempts, in seconds.
+"""
+
+DEFAULT_METRICS_HOST: Final[str] = "127.0.0.1"
+DEFAULT_METRICS_PORT: Final[int] = 0
+"""Port of the Prometheus metrics endpoint. If 0, the endpoint is disabled.
+"""
+
+DEFAULT_METRICS_SOURCE_ID: Final[str] = "default"
+"""The 'source' label of the metrics of a single input.
+"""
+
+DEFAULT_MAX_BATCH_SIZE: Final[int] = 16
+"""Maximum number of images stacked into a single `on_batch` call.
+"""
+
+DEFAULT_MAX_BATCH_WAIT: Final[float] = 0.010
+"""Maximum seconds that the first image of a batch waits for other images.
+"""
+
 DEFAULT_AV_OPEN_TIMEOUT: Final[float] = 32.0
 DEFAULT_AV_READ_TIMEOUT: Final[float] = 16.0
 
@@ -73,6 +143,64 @@ DEFAULT_WIN_QUEUE_SIZE: Final[int] = 128
 
 DEFAULT_CV_EXIT_KEYS: Final[Sequence[str]] = "Q", "q"
 
+DECODE_MODE_ALL: Final[str] = "all"
+DECODE_MODE_BIDIR_SKIP: Final[str] = "bidir-skip"
+DECODE_MODE_NONREF_SKIP: Final[str] = "nonref-skip"
+DECODE_MODE_KEYFRAMES: Final[str] = "keyframes"
+DEFAULT_DECODE_MODE: Final[str] = DECODE_MODE_ALL
+DECODE_MODES: Final[Sequence[str]] = (
+    DECODE_MODE_ALL,
+    DECODE_MODE_BIDIR_SKIP,
+    DECODE_MODE_NONREF_SKIP,
+    DECODE_MODE_KEYFRAMES,
+)
+
+ENCODE_OVERFLOW_BLOCK: Final[str] = "block"
+ENCODE_OVERFLOW_DROP_NEWEST: Final[str] = "drop-newest"
+ENCODE_OVERFLOW_DROP_OLDEST: Final[str] = "drop-oldest"
+DEFAULT_ENCODE_OVERFLOW: Final[str] = ENCODE_OVERFLOW_BLOCK
+ENCODE_OVERFLOWS: Final[Sequence[str]] = (
+    ENCODE_OVERFLOW_BLOCK,
+    ENCODE_OVERFLOW_DROP_NEWEST,
+    ENCODE_OVERFLOW_DROP_OLDEST,
+)
+
+DROP_POLICY_NONE: Final[str] = "none"
+DROP_POLICY_NEWEST: Final[str] = "drop-newest"
+DROP_POLICY_OLDEST: Final[str] = "drop-oldest"
+DROP_POLICY_KEYFRAME: Final[str] = "keyframe"
+DROP_POLICY_ADAPTIVE: Final[str] = "adaptive"
+DEFAULT_DROP_POLICY: Final[str] = DROP_POLICY_NONE
+DROP_POLICIES: Final[Sequence[str]] = (
+    DROP_POLICY_NONE,
+    DROP_POLICY_NEWEST,
+    DROP_POLICY_OLDEST,
+    DROP_POLICY_KEYFRAME,
+    DROP_POLICY_ADAPTIVE,
+)
+
+HANDOFF_MODE_TASK: Final[str] = "task"
+HANDOFF_MODE_BATCH: Final[str] = "batch"
+HANDOFF_MODE_LATEST: Final[str] = "latest"
+DEFAULT_HANDOFF_MODE: Final[str] = HANDOFF_MODE_TASK
+HANDOFF_MODES: Final[Sequence[str]] = (
+    HANDOFF_MODE_TASK,
+    HANDOFF_MODE_BATCH,
+    HANDOFF_MODE_LATEST,
+)
+
+ENCODER_PROFILE_DEFAULT: Final[str] = "default"
+ENCODER_PROFILE_LOWLATENCY: Final[str] = "lowlatency"
+ENCODER_PROFILE_THROUGHPUT: Final[str] = "throughput"
+ENCODER_PROFILE_ARCHIVE: Final[str] = "archive"
+DEFAULT_ENCODER_PROFILE: Final[str] = ENCODER_PROFILE_DEFAULT
+ENCODER_PROFILE_NAMES: Final[Sequence[str]] = (
+    ENCODER_PROFILE_DEFAULT,
+    ENCODER_PROFILE_LOWLATENCY,
+    ENCODER_PROFILE_THROUGHPUT,
+    ENCODER_PROFILE_ARCHIVE,
+)
+
 IO_APP: Final[str] = "io"
 AIO_APP: Final[str] = "aio"
 AIOTK_APP: Final[str] = "aiotk"
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import os
+from asyncio import sleep
+from logging import getLogger
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.aio.drop_policy import (
+    AdaptivePolicy,
+    DropNewestPolicy,
+    DropOldestPolicy,
+    KeyframePolicy,
+    create_drop_policy,
+)
+from avplayer.apps.defaults.aio import AioApp
+from avplayer.av.av_frame_meta import FrameMeta
+from avplayer.avconfig import AvConfig
+from avplayer.debug.hist_stat import HistStat
+from avplayer.variables import (
+    DROP_POLICY_NEWEST,
+    DROP_POLICY_NONE,
+    HANDOFF_MODE_BATCH,
+)
+from tester.av.test_av_io import write_test_clip
+
+
+def _meta(keyframe: bool) -> FrameMeta:
+    return FrameMeta(0, 0, None, keyframe, decoded_at=0.0)
+
+
+class DropPolicyTestCase(TestCase):
+    def test_threshold_policies(self):
+        newest = DropNewestPolicy(2)
+        self.assertTrue(newest.admit(1, None))
+        self.assertFalse(newest.admit(2, None))
+        self.assertFalse(newest.skip(10, None))
+
+        oldest = DropOldestPolicy(2)
+        self.assertTrue(oldest.admit(10, None))
+        self.assertFalse(oldest.skip(1, None))
+        self.assertTrue(oldest.skip(2, None))
+
+        keyframe = KeyframePolicy(2)
+        self.assertTrue(keyframe.admit(5, _meta(True)))
+        self.assertFalse(keyframe.admit(5, _meta(False)))
+
+        self.assertEqual(1, newest.dropped)
+        self.assertEqual(1, oldest.dropped)
+        self.assertEqual(1, keyframe.dropped)
+
+    def test_adaptive(self):
+        stat = HistStat("Callback", getLogger(__name__), 1000)
+        policy = AdaptivePolicy(stat, budget=0.1, concurrency=2)
+        self.assertTrue(policy.admit(10, None))
+
+        for _ in range(10):
+            stat.record(40_000_000)
+        self.assertTrue(policy.admit(0, None))
+        self.assertTrue(policy.admit(3, None))
+        self.assertFalse(policy.admit(4, None))
+        self.assertAlmostEqual(0.12, policy.estimate(4))
+        self.assertEqual(1, policy.dropped)
+
+        # Unlimited callbacks run at the same time as the pending ones.
+        unlimited = AdaptivePolicy(stat, budget=0.1, concurrency=None)
+        self.assertAlmostEqual(0.04, unlimited.estimate(100))
+        self.assertTrue(unlimited.admit(100, None))
+
+    def test_create(self):
+        self.assertEqual(DROP_POLICY_NONE, create_drop_policy(DROP_POLICY_NONE).name)
+        with self.assertRaises(ValueError):
+            create_drop_policy("unknown")
+
+    def test_aio_app(self):
+        async def _on_image(image):
+            await sleep(0.01)
+            return image
+
+        with TemporaryDirectory() as temp:
+            source = os.path.join(temp, "source.mp4")
+            write_test_clip(source, 30)
+            config = AvConfig(
+                source,
+                drop_threshold=1,
+                drop_policy=DROP_POLICY_NEWEST,
+                handoff_mode=HANDOFF_MODE_BATCH,
+            )
+            app = AioApp(config, _on_image)
+            app.start()
+
+        policy = app.drop_policy
+        self.assertEqual(DROP_POLICY_NEWEST, policy.name)
+        self.assertLess(0, policy.dropped)
+        self.assertEqual(app.avio.discarded_frames, policy.dropped)
+        self.assertEqual(
+            app.avio.delivered_frames, app.stats["callback"].step + policy.dropped
+        )
+
+
+if __name__ == "__main__":
+    main()
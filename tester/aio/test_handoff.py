@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import os
+from asyncio import run
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, main
+
+from avplayer.aio.handoff import FrameHandoff, LatestFrameHandoff
+from avplayer.apps.defaults.aio import AioApp
+from avplayer.avconfig import AvConfig
+from avplayer.variables import HANDOFF_MODE_BATCH
+from tester.av.test_av_io import write_test_clip
+
+
+class FrameHandoffTestCase(TestCase):
+    def test_batch(self):
+        consumed = list()
+
+        async def _consume(item: int) -> None:
+            consumed.append(item)
+
+        handoff = FrameHandoff(_consume)
+
+        async def _main():
+            handoff.start()
+            thread = Thread(target=lambda: [handoff.put(i) for i in range(1000)])
+            thread.start()
+            thread.join()
+            await handoff.close()
+
+        run(_main())
+        self.assertEqual(list(range(1000)), consumed)
+        self.assertLessEqual(1, handoff.wakeups)
+        self.assertLessEqual(handoff.wakeups, 1000)
+        self.assertEqual(0, handoff.pending)
+        self.assertFalse(handoff.is_running)
+
+    def test_latest(self):
+        consumed = list()
+
+        async def _consume(item: int) -> None:
+            consumed.append(item)
+
+        handoff = LatestFrameHandoff(_consume)
+        replaced = list()
+
+        async def _main():
+            handoff.start()
+            # The consumer cannot run until this coroutine awaits.
+            for i in range(3):
+                replaced.append(handoff.put(i))
+            await handoff.close()
+
+        run(_main())
+        self.assertEqual([None, 0, 1], replaced)
+        self.assertEqual([2], consumed)
+        self.assertEqual(1, handoff.wakeups)
+
+    def test_aio_app(self):
+        sequences = list()
+
+        async def _on_image(image, meta=None):
+            sequences.append(meta.sequence)
+            return None
+
+        with TemporaryDirectory() as temp:
+            source = os.path.join(temp, "source.mp4")
+            write_test_clip(source, 30)
+            config = AvConfig(source, handoff_mode=HANDOFF_MODE_BATCH)
+            app = AioApp(config, _on_image)
+            app.start()
+
+        self.assertLess(0, len(sequences))
+        self.assertEqual(list(range(app.avio.delivered_frames)), sequences)
+        self.assertEqual(0, app.remain_frames)
+        self.assertIsNotNone(app.handoff)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import os
+from asyncio import sleep
+from tempfile import TemporaryDirectory
+from typing import List
+from unittest import TestCase, main
+
+from avplayer.apps.defaults.aio import AioApp
+from avplayer.avconfig import AvConfig
+from avplayer.variables import (
+    DROP_POLICY_OLDEST,
+    HANDOFF_MODE_BATCH,
+    HANDOFF_MODE_LATEST,
+    HANDOFF_MODE_TASK,
+)
+from tester.av.test_av_io import write_test_clip
+
+
+class _OrderedApp(AioApp):
+    def __init__(self, config: AvConfig):
+        super().__init__(config, self._on_image)
+        self.running = 0
+        self.peak = 0
+        self.grabbed: List[int] = list()
+
+    async def _on_image(self, image, meta=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            # Later frames complete first within each group of three.
+            await sleep((3 - meta.sequence % 3) * 0.002)
+        finally:
+            self.running -= 1
+        return meta.sequence
+
+    def on_grab(self, image) -> None:
+        self.grabbed.append(image)
+
+
+class AsyncAvAppTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def _run(self, handoff_mode: str, max_in_flight: int) -> _OrderedApp:
+        config = AvConfig(
+            self.source,
+            handoff_mode=handoff_mode,
+            max_in_flight=max_in_flight,
+        )
+        app = _OrderedApp(config)
+        app.start()
+        return app
+
+    def test_max_in_flight(self):
+        for mode in (HANDOFF_MODE_TASK, HANDOFF_MODE_BATCH):
+            with self.subTest(mode=mode):
+                app = self._run(mode, 3)
+                delivered = app.avio.delivered_frames
+                self.assertLess(0, delivered)
+                self.assertEqual(3, app.peak)
+                self.assertEqual(list(range(delivered)), app.grabbed)
+                self.assertEqual(0, app.remain_frames)
+
+    def test_sequential(self):
+        app = self._run(HANDOFF_MODE_TASK, 1)
+        self.assertEqual(1, app.peak)
+        self.assertEqual(list(range(app.avio.delivered_frames)), app.grabbed)
+
+    def test_flow_credits(self):
+        pending = list()
+
+        async def _on_image(image):
+            pending.append(app.remain_frames)
+            await sleep(0.005)
+            return image
+
+        app = AioApp(AvConfig(self.source, flow_credits=2), _on_image)
+        app.start()
+
+        self.assertLess(0, app.avio.delivered_frames)
+        self.assertEqual(app.avio.delivered_frames, len(pending))
+        self.assertEqual(0, app.avio.discarded_frames)
+        self.assertLessEqual(max(pending), 2)
+        self.assertLess(0, app.stats["credit"].step)
+
+    def test_drop_oldest_with_max_in_flight(self):
+        for mode in (HANDOFF_MODE_TASK, HANDOFF_MODE_BATCH, HANDOFF_MODE_LATEST):
+            with self.subTest(mode=mode):
+                config = AvConfig(
+                    self.source,
+                    handoff_mode=mode,
+                    max_in_flight=2,
+                    drop_policy=DROP_POLICY_OLDEST,
+                    drop_threshold=1,
+                )
+                app = _OrderedApp(config)
+                app.start()
+
+                # The skipped frames must release their slots, or this never ends.
+                self.assertLess(0, len(app.grabbed))
+                self.assertEqual(0, app.remain_frames)
+
+    def test_drop_oldest_waiting_for_slot(self):
+        async def _on_image(image):
+            await sleep(0.02)
+            return image
+
+        config = AvConfig(
+            self.source,
+            max_in_flight=1,
+            drop_policy=DROP_POLICY_OLDEST,
+            drop_threshold=2,
+        )
+        app = AioApp(config, _on_image)
+        app.start()
+
+        # Frames waiting for the slot are skipped once newer frames arrive.
+        self.assertLess(0, app.drop_policy.dropped)
+        self.assertEqual(0, app.remain_frames)
+
+
+if __name__ == "__main__":
+    main()
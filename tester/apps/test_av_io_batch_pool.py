@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from asyncio import gather
+from asyncio import run as asyncio_run
+from unittest import TestCase, main
+
+from numpy import full, uint8
+
+from avplayer.apps.base.av_io_batch_pool import FrameBatcher
+
+
+class FrameBatcherTestCase(TestCase):
+    def test_batch_size_and_deadline(self):
+        shapes = list()
+
+        async def _on_batch(source_ids, images):
+            shapes.append(images.shape)
+            return images + 1
+
+        async def _main():
+            batcher = FrameBatcher(_on_batch, max_batch_size=4, max_wait=0.01)
+            coros = [
+                batcher.submit(str(i), full((2, 2, 3), i, dtype=uint8))
+                for i in range(6)
+            ]
+            return await gather(*coros)
+
+        results = asyncio_run(_main())
+        self.assertEqual([(4, 2, 2, 3), (2, 2, 2, 3)], shapes)
+        self.assertEqual(list(range(1, 7)), [int(r[0, 0, 0]) for r in results])
+
+    def test_mixed_shapes(self):
+        shapes = list()
+
+        async def _on_batch(source_ids, images):
+            shapes.append(images.shape)
+            return None
+
+        async def _main():
+            batcher = FrameBatcher(_on_batch, max_batch_size=3, max_wait=0.01)
+            return await gather(
+                batcher.submit("a", full((2, 2, 3), 0, dtype=uint8)),
+                batcher.submit("b", full((4, 4, 3), 0, dtype=uint8)),
+                batcher.submit("c", full((2, 2, 3), 0, dtype=uint8)),
+            )
+
+        self.assertEqual([None, None, None], asyncio_run(_main()))
+        self.assertEqual(sorted([(2, 2, 2, 3), (1, 4, 4, 3)]), sorted(shapes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import os
+from collections import Counter
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.apps.defaults.pool import AioPool
+from avplayer.avconfig import AvConfig
+from tester.av.test_av_io import write_test_clip
+
+
+class AvIoPoolTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_multiple_sources(self):
+        counter: Counter = Counter()
+
+        async def _on_image(source_id, image):
+            counter[source_id] += 1
+            return image
+
+        configs = {str(i): AvConfig(self.source) for i in range(3)}
+        pool = AioPool(configs, _on_image, max_workers=2)
+        self.assertEqual(2, pool.max_workers)
+        pool.start()
+
+        self.assertEqual(3, len(counter))
+        self.assertTrue(all(counter.values()))
+        for source_id, source in pool.sources.items():
+            self.assertEqual(source.avio.delivered_frames, counter[source_id])
+
+
+if __name__ == "__main__":
+    main()
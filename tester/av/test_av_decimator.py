@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+from fractions import Fraction
+from unittest import TestCase, main
+
+from avplayer.av.av_decimator import PtsDecimator
+
+
+class PtsDecimatorTestCase(TestCase):
+    def test_even_spacing(self):
+        decimator = PtsDecimator(10)
+        time_base = Fraction(1, 30)
+        accepted = [i for i in range(90) if decimator.accept(i, time_base)]
+        self.assertEqual(list(range(0, 90, 3)), accepted)
+
+    def test_discontinuity(self):
+        decimator = PtsDecimator(1)
+        time_base = Fraction(1, 1000)
+        self.assertTrue(decimator.accept(0, time_base))
+        self.assertFalse(decimator.accept(500, time_base))
+        self.assertTrue(decimator.accept(5000, time_base))
+        self.assertFalse(decimator.accept(5500, time_base))
+        self.assertTrue(decimator.accept(100, time_base))
+        self.assertTrue(decimator.accept(None, time_base))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from threading import Event
+from unittest import TestCase, main
+
+from avplayer.av.av_encoder import EncoderThread
+from avplayer.variables import (
+    ENCODE_OVERFLOW_BLOCK,
+    ENCODE_OVERFLOW_DROP_NEWEST,
+    ENCODE_OVERFLOW_DROP_OLDEST,
+)
+
+
+class EncoderThreadTestCase(TestCase):
+    def test_block(self):
+        encoded = list()
+        encoder = EncoderThread(encoded.append, 2, ENCODE_OVERFLOW_BLOCK)
+        encoder.start()
+        for i in range(100):
+            self.assertTrue(encoder.put(i))
+        encoder.stop()
+        self.assertEqual(list(range(100)), encoded)
+        self.assertEqual(0, encoder.dropped_frames)
+
+    def _run_stalled(self, overflow: str):
+        stalled = Event()
+        resume = Event()
+        encoded = list()
+
+        def _encode(frame):
+            if not stalled.is_set():
+                stalled.set()
+                resume.wait()
+            encoded.append(frame)
+
+        encoder = EncoderThread(_encode, 2, overflow)
+        encoder.start()
+        encoder.put(0)
+        stalled.wait()
+        results = [encoder.put(i) for i in range(1, 6)]
+        resume.set()
+        encoder.stop()
+        return encoder, results, encoded
+
+    def test_drop_newest(self):
+        encoder, results, encoded = self._run_stalled(ENCODE_OVERFLOW_DROP_NEWEST)
+        self.assertEqual([True, True, False, False, False], results)
+        self.assertEqual([0, 1, 2], encoded)
+        self.assertEqual(3, encoder.dropped_frames)
+
+    def test_drop_oldest(self):
+        encoder, results, encoded = self._run_stalled(ENCODE_OVERFLOW_DROP_OLDEST)
+        self.assertEqual([True, True, False, False, False], results)
+        self.assertEqual([0, 4, 5], encoded)
+        self.assertEqual(3, encoder.dropped_frames)
+
+    def test_error(self):
+        errors = list()
+
+        def _encode(frame):
+            raise ValueError(frame)
+
+        encoder = EncoderThread(_encode, 1, on_error=errors.append)
+        encoder.start()
+        encoder.put(0)
+        with self.assertRaises(RuntimeError):
+            for i in range(100):
+                encoder.put(i)
+        encoder.stop()
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(encoder.exception, ValueError)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase, main
+
+from avplayer.av.av_encoder_profile import (
+    ENCODER_PROFILES,
+    EncoderProfile,
+    get_encoder_profile,
+    measure_encode_fps,
+)
+from avplayer.variables import ENCODER_PROFILE_NAMES
+
+
+class EncoderProfileTestCase(TestCase):
+    def test_names(self):
+        self.assertEqual(set(ENCODER_PROFILE_NAMES), set(ENCODER_PROFILES))
+        for name in ENCODER_PROFILE_NAMES:
+            self.assertEqual(name, get_encoder_profile(name).name)
+        with self.assertRaises(ValueError):
+            get_encoder_profile("unknown")
+
+    def test_bitrate_overrides_crf(self):
+        profile = EncoderProfile("test", preset="fast", crf=23)
+        self.assertEqual({"preset": "fast", "crf": "23"}, profile.options())
+        profile = EncoderProfile("test", preset="fast", crf=23, bitrate=1000000)
+        self.assertEqual({"preset": "fast"}, profile.options())
+
+    def test_measure_encode_fps(self):
+        for profile in ENCODER_PROFILES.values():
+            self.assertLess(0.0, measure_encode_fps(profile, 64, 48, 4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import os
+from fractions import Fraction
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.apps.defaults.aio import AioApp
+from avplayer.apps.defaults.pool import AioPool
+from avplayer.av.av_frame_meta import FrameMeta, accepts_frame_meta
+from avplayer.avconfig import AvConfig
+from tester.av.test_av_io import write_test_clip
+
+
+class FrameMetaTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_seconds(self):
+        meta = FrameMeta(0, 512, Fraction(1, 12800), True, 0.0)
+        self.assertEqual(0.04, meta.seconds)
+        self.assertIsNone(FrameMeta(0, None, Fraction(1, 25), False, 0.0).seconds)
+        with self.assertRaises(AttributeError):
+            meta.unknown = 0  # type: ignore[attr-defined]
+
+    def test_accepts_frame_meta(self):
+        self.assertFalse(accepts_frame_meta(lambda image: image))
+        self.assertTrue(accepts_frame_meta(lambda image, meta: image))
+        self.assertTrue(accepts_frame_meta(lambda image, *, meta=None: image))
+        self.assertFalse(accepts_frame_meta(lambda image, **kwargs: image))
+
+    def test_aio_app(self):
+        metas = list()
+
+        async def _on_image(image, meta):
+            metas.append(meta)
+            return image
+
+        app = AioApp(AvConfig(self.source), _on_image)
+        app.start()
+
+        self.assertEqual(app.avio.delivered_frames, len(metas))
+        self.assertEqual(list(range(len(metas))), [m.sequence for m in metas])
+        pts = [m.pts for m in metas]
+        self.assertEqual(sorted(pts), pts)
+        self.assertTrue(all(m.decoded_at > 0 for m in metas))
+        self.assertTrue(any(m.keyframe for m in metas))
+
+    def test_pool(self):
+        source_ids = set()
+
+        def _on_image(source_id, image, meta):
+            self.assertEqual(source_id, meta.source_id)
+            source_ids.add(meta.source_id)
+            return image
+
+        configs = {str(i): AvConfig(self.source) for i in range(2)}
+        AioPool(configs, _on_image).start()
+        self.assertEqual({"0", "1"}, source_ids)
+
+
+if __name__ == "__main__":
+    main()
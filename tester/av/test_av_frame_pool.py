@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from numpy import arange, empty, uint8
+from numpy.testing import assert_array_equal
+
+from avplayer.av.av_frame_pool import (
+    FrameBufferPool,
+    copy_frame_to_ndarray,
+    image_shape,
+)
+from avplayer.av.av_io import AvIo
+from avplayer.ffmpeg.ffmpeg import (
+    IMAGE_PIXEL_FORMATS,
+    PIXEL_FORMAT_BGR24,
+    PIXEL_FORMAT_YUV420P,
+)
+from tester.av.test_av_io import write_test_clip
+
+
+class FrameBufferPoolTestCase(TestCase):
+    def test_reuse(self):
+        pool = FrameBufferPool(2)
+        buffer0 = pool.acquire((4, 4, 3))
+        buffer1 = pool.acquire((4, 4, 3))
+        self.assertEqual(2, pool.allocations)
+
+        pool.release(buffer0)
+        pool.release(buffer1)
+        self.assertIs(buffer0, pool.acquire((4, 4, 3)))
+        self.assertIs(buffer1, pool.acquire((4, 4, 3)))
+        self.assertEqual(2, pool.allocations)
+
+    def test_shape_changed(self):
+        pool = FrameBufferPool(2)
+        buffer = pool.acquire((4, 4, 3))
+        pool.release(buffer)
+        self.assertEqual(2, pool.free_buffers)
+
+        self.assertEqual((2, 2, 3), pool.acquire((2, 2, 3)).shape)
+        self.assertEqual(1, pool.free_buffers)
+        pool.release(buffer)
+        self.assertEqual(1, pool.free_buffers)
+        self.assertEqual(4, pool.allocations)
+
+    def test_copy_frame_to_ndarray(self):
+        from av import VideoFrame
+
+        width, height = 34, 18  # Force padded line sizes
+        source = (arange(height * width * 3) % 251).astype(uint8)
+        frame = VideoFrame.from_ndarray(source.reshape(height, width, 3), "bgr24")
+
+        for pixel_format in IMAGE_PIXEL_FORMATS:
+            converted = frame.reformat(format=pixel_format)
+            buffer = empty(image_shape(pixel_format, width, height), dtype=uint8)
+            copy_frame_to_ndarray(converted, buffer, pixel_format)
+            assert_array_equal(converted.to_ndarray(), buffer, err_msg=pixel_format)
+
+
+class AvIoFramePoolTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_warm_pool(self):
+        avio = AvIo(self.source, frame_pool_size=2, pixel_format=PIXEL_FORMAT_YUV420P)
+        pool = avio.frame_pool
+        assert pool is not None
+
+        images = list()
+        means = list()
+
+        def _callback(image):
+            # The whole ring is allocated with the first frame, and nothing later.
+            self.assertEqual(2, pool.allocations)
+            images.append(image)
+            means.append(float(image[:48].mean()))
+            return None
+
+        avio.open()
+        try:
+            avio.run(_callback)
+        finally:
+            avio.close()
+
+        self.assertEqual(20, len(images))
+        self.assertGreaterEqual(2, len({id(image) for image in images}))
+        # The luma of the last frame, in the limited range of BT.601.
+        self.assertAlmostEqual(16 + 29 * 8 * 219 / 255, means[-1], delta=6.0)
+
+    def test_packed_format_is_not_pooled(self):
+        # The images are views of the converted frames, which a pool only copies.
+        avio = AvIo(self.source, frame_pool_size=2, pixel_format=PIXEL_FORMAT_BGR24)
+        self.assertIsNone(avio.frame_pool)
+
+
+if __name__ == "__main__":
+    main()
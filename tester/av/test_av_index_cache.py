@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import os
+from fractions import Fraction
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.av.av_index_cache import (
+    dumps_keyframe_index,
+    index_cache_path,
+    load_cached_index,
+    loads_keyframe_index,
+    store_cached_index,
+)
+from avplayer.av.av_io import AvIo
+from avplayer.av.av_keyframe_index import KeyframeIndex
+from avplayer.av.av_probe import get_av_probe
+from tester.av.test_av_io import write_test_clip
+
+
+class IndexCacheTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_dumps_loads(self):
+        index = KeyframeIndex(Fraction(1, 90000), [0, 9000], 0, 18000, 20)
+        data = dumps_keyframe_index(index, 100, 200)
+
+        result = loads_keyframe_index(data, 100, 200)
+        self.assertIsNotNone(result)
+        assert result is not None
+        self.assertEqual(index.time_base, result.time_base)
+        self.assertEqual(index.keyframes, result.keyframes)
+        self.assertEqual(index.positions, result.positions)
+        self.assertEqual(index.packets, result.packets)
+
+        self.assertIsNone(loads_keyframe_index(data, 101, 200))
+        self.assertIsNone(loads_keyframe_index(data, 100, 201))
+        self.assertIsNone(loads_keyframe_index(data[:-1], 100, 200))
+        self.assertIsNone(loads_keyframe_index(b"", 100, 200))
+
+    def test_cache_dir(self):
+        cache_dir = os.path.join(self._temp.name, "cache")
+        index = KeyframeIndex(
+            Fraction(1, 25),
+            [0],
+            0,
+            30,
+            30,
+            width=64,
+            height=48,
+            container_duration=1.2,
+        )
+        path = store_cached_index(self.source, index, cache_dir)
+        self.assertEqual(index_cache_path(self.source, cache_dir), path)
+        self.assertIsNotNone(load_cached_index(self.source, cache_dir))
+        self.assertIsNone(load_cached_index(self.source))
+
+        # The probe is answered from the cache.
+        probe = get_av_probe(self.source, index_cache_dir=cache_dir)
+        self.assertEqual((64, 48, 1.2), tuple(probe))
+
+    def test_av_io_sidecar(self):
+        avio = AvIo(self.source, index_cache=True)
+        avio.open()
+        try:
+            # A cold cache is not scanned by `open()`, but by the first step.
+            self.assertFalse(os.path.exists(index_cache_path(self.source)))
+            avio.step(None)
+        finally:
+            avio.close()
+        self.assertTrue(os.path.exists(index_cache_path(self.source)))
+
+        cached = load_cached_index(self.source)
+        assert cached is not None
+        self.assertEqual(avio.keyframe_index.keyframes, cached.keyframes)
+        self.assertEqual(avio.keyframe_index.positions, cached.positions)
+        self.assertEqual((64, 48), (cached.width, cached.height))
+
+        # A modified file invalidates the cache.
+        with open(self.source, "ab") as f:
+            f.write(b"\0")
+        self.assertIsNone(load_cached_index(self.source))
+
+    def test_probe_duration(self):
+        uncached = get_av_probe(self.source)
+
+        avio = AvIo(self.source, index_cache=True)
+        avio.open()
+        try:
+            avio.step(None)
+        finally:
+            avio.close()
+        cached = load_cached_index(self.source)
+        assert cached is not None
+        self.assertIsNotNone(cached.container_duration)
+
+        # The same duration, whether the probe is answered from the cache or not.
+        self.assertEqual(uncached, get_av_probe(self.source))
+        self.assertEqual(uncached.duration, cached.container_duration)
+
+
+if __name__ == "__main__":
+    main()
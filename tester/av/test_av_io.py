@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# mypy: disable-error-code="attr-defined"
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from numpy import full, uint8
+
+from avplayer.av.av_io import AvIo
+from avplayer.variables import DECODE_MODE_ALL, DECODE_MODE_KEYFRAMES
+
+
+def write_test_clip(path: str, frames: int, width=64, height=48) -> None:
+    from av import VideoFrame
+    from av import open as av_open
+
+    container = av_open(path, mode="w")
+    try:
+        stream = container.add_stream("libx264", rate=25)
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = "yuv420p"
+        stream.options = {"g": "10", "bf": "2"}
+        for i in range(frames):
+            image = full((height, width, 3), i * 8, dtype=uint8)
+            frame = VideoFrame.from_ndarray(image, format="bgr24")
+            container.mux(stream.encode(frame))
+        container.mux(stream.encode(None))
+    finally:
+        container.close()
+
+
+class AvIoTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_recv_delivers_delayed_frames(self):
+        avio = AvIo(self.source)
+        avio.open()
+        try:
+            images = list()
+            avio.run(lambda x: images.append(x.copy()))
+        finally:
+            avio.close()
+
+        # 'nobuffer' drops the first group of pictures (g=10) of the 30 frames,
+        # and the tail frames are only released when the decoder is drained.
+        self.assertEqual(20, len(images))
+        self.assertEqual(20, avio.delivered_frames)
+        self.assertEqual(0, avio.discarded_frames)
+        self.assertAlmostEqual(10 * 8, float(images[0].mean()), delta=6.0)
+        self.assertAlmostEqual(29 * 8, float(images[-1].mean()), delta=6.0)
+
+    def test_stream_copy(self):
+        from av import open as av_open
+
+        output = os.path.join(self._temp.name, "output.mp4")
+        avio = AvIo(self.source, output, file_format="mp4", stream_copy=True)
+        avio.open()
+        try:
+            avio.run(None)
+        finally:
+            avio.close()
+
+        with av_open(output) as container:
+            demuxed = container.demux(video=0)
+            packets = [p for p in demuxed if p.dts is not None]
+        with av_open(output) as container:
+            frames = list(container.decode(video=0))
+
+        self.assertEqual(avio.delivered_frames, len(packets))
+        self.assertTrue(all(a.dts < b.dts for a, b in zip(packets, packets[1:])))
+        self.assertTrue(packets[0].is_keyframe)
+        self.assertEqual(len(packets), len(frames))
+        self.assertAlmostEqual(
+            29 * 8, float(frames[-1].to_ndarray(format="bgr24").mean()), delta=6.0
+        )
+
+    def _decode_frames(self, decode_mode: str) -> list:
+        avio = AvIo(self.source, decode_mode=decode_mode)
+        avio.open()
+        try:
+            frames = list()
+            while True:
+                try:
+                    frames.append(avio.next_frame())
+                except EOFError:
+                    break
+        finally:
+            avio.close()
+        return frames
+
+    def test_decode_keyframes(self):
+        frames = self._decode_frames(DECODE_MODE_KEYFRAMES)
+        all_frames = self._decode_frames(DECODE_MODE_ALL)
+
+        # The decoder skips every frame but the keyframes (g=10).
+        self.assertLess(0, len(frames))
+        self.assertTrue(all(frame.key_frame for frame in frames))
+        self.assertLess(len(frames), len(all_frames))
+        keyframes = [frame.pts for frame in all_frames if frame.key_frame]
+        self.assertEqual(keyframes, [frame.pts for frame in frames])
+
+
+if __name__ == "__main__":
+    main()
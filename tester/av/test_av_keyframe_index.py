@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import os
+from fractions import Fraction
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.av.av_io import AvIo
+from avplayer.av.av_keyframe_index import KeyframeIndex
+from tester.av.test_av_io import write_test_clip
+
+
+class KeyframeIndexTestCase(TestCase):
+    def test_find(self):
+        index = KeyframeIndex(Fraction(1, 10), [20, 0, 10], 0, 30, 30)
+        self.assertEqual([0, 10, 20], index.keyframes)
+        self.assertEqual(3.0, index.duration)
+        self.assertIsNone(index.find(-1))
+        self.assertEqual(0, index.find(0))
+        self.assertEqual(0, index.find(9))
+        self.assertEqual(10, index.find(10))
+        self.assertEqual(20, index.find(100))
+        self.assertEqual(15, index.to_pts(1.5))
+        self.assertEqual(1.5, index.to_seconds(15))
+
+
+class AvIoSeekTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_read_frame_at(self):
+        avio = AvIo(self.source)
+        avio.open()
+        try:
+            index = avio.keyframe_index
+            self.assertEqual(3, len(index))
+            self.assertEqual(30, index.packets)
+
+            # 25 fps, and the value of the i-th frame is i * 8.
+            for i in (15, 3, 29, 0, 20):
+                image = avio.read_frame_at(i / 25)
+                self.assertAlmostEqual(i * 8, float(image.mean()), delta=6.0)
+
+            avio.seek(1.0)
+            images = list()
+            avio.run(lambda x: images.append(x))
+        finally:
+            avio.close()
+
+        self.assertEqual(5, len(images))
+        self.assertAlmostEqual(25 * 8, float(images[0].mean()), delta=6.0)
+
+
+if __name__ == "__main__":
+    main()
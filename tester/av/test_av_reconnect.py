@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from unittest import TestCase, main
+
+from avplayer.av.av_io import AvIo
+from avplayer.av.av_reconnect import ExponentialBackoff
+from tester.av.test_av_io import write_test_clip
+
+
+class ExponentialBackoffTestCase(TestCase):
+    def test_delay(self):
+        backoff = ExponentialBackoff(0.1, 1.0, rand=lambda: 0.0)
+        delays = [backoff.delay(i) for i in range(6)]
+        self.assertEqual([0.1, 0.2, 0.4, 0.8, 1.0, 1.0], delays)
+
+    def test_jitter(self):
+        backoff = ExponentialBackoff(1.0, 1.0, jitter=0.5, rand=lambda: 1.0)
+        self.assertEqual(0.5, backoff.delay(0))
+
+
+class AvIoReconnectTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        self.output = os.path.join(self._temp.name, "output.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_warm_reconnect(self):
+        # The URL form is not a local file, so the end of the input is a failure.
+        avio = AvIo(
+            f"file:{self.source}",
+            self.output,
+            file_format="mp4",
+            reconnect=True,
+            reconnect_backoff_min=0.01,
+        )
+        counts = list()
+
+        def _callback(image):
+            counts.append(avio.reconnect_count)
+            if avio.reconnect_count >= 1:
+                avio.done()
+            return image
+
+        avio.open()
+        try:
+            avio.run(_callback)
+        finally:
+            avio.close()
+
+        self.assertEqual(1, avio.reconnect_count)
+        self.assertEqual(0, counts[0])
+        self.assertEqual(1, counts[-1])
+        self.assertLess(0.0, avio.last_recover_seconds)
+
+        # Frames from both connections are written to the same output.
+        from av import open as av_open
+
+        with av_open(self.output) as container:
+            self.assertEqual(len(counts), len(list(container.decode(video=0))))
+
+    def test_give_up(self):
+        avio = AvIo(
+            f"file:{self.source}",
+            reconnect=True,
+            reconnect_max_attempts=2,
+            reconnect_backoff_min=0.01,
+        )
+        avio.open()
+        try:
+            os.remove(self.source)
+            avio.run(None)
+        finally:
+            avio.close()
+        self.assertEqual(0, avio.reconnect_count)
+
+    def test_step_returns_backoff(self):
+        avio = AvIo(
+            f"file:{self.source}",
+            reconnect=True,
+            reconnect_max_attempts=2,
+            reconnect_backoff_min=10.0,
+            reconnect_backoff_max=10.0,
+        )
+        delays = list()
+        avio.open()
+        try:
+            os.remove(self.source)
+            begin = perf_counter()
+            while True:
+                delay = avio.step(None)
+                if delay is None:
+                    break
+                delays.append(delay)
+            elapsed = perf_counter() - begin
+        finally:
+            avio.close()
+
+        # The backoff before each of the two attempts is left to the caller.
+        self.assertEqual(2, len([d for d in delays if d > 0]))
+        self.assertTrue(all(5.0 <= d <= 10.0 for d in delays if d > 0))
+        self.assertLess(elapsed, 5.0)
+        self.assertEqual(0, avio.reconnect_count)
+
+    def test_local_file_end(self):
+        avio = AvIo(self.source, reconnect=True)
+        avio.open()
+        try:
+            avio.run(None)
+        finally:
+            avio.close()
+        self.assertEqual(0, avio.reconnect_count)
+
+
+if __name__ == "__main__":
+    main()
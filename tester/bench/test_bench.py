@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.bench.bench import (
+    APP_BENCH_STAGES,
+    AVIO_BENCH_STAGES,
+    compare_reports,
+)
+from avplayer.entrypoint import main as entrypoint_main
+
+
+def _report(version: str, decode_fps: float):
+    stages = {"decode": {"fps": decode_fps}, "mux": {"fps": 1000.0}}
+    case = {"resolution": "720p", "fps": 100.0, "stages": stages}
+    return {"avplayer": version, "cases": [case]}
+
+
+class BenchTestCase(TestCase):
+    def test_compare_reports(self):
+        baseline = _report("1.0.0", 200.0)
+
+        lines, regressed = compare_reports(baseline, _report("1.1.0", 190.0), 0.1)
+        self.assertFalse(regressed)
+        self.assertEqual(4, len(lines))
+
+        lines, regressed = compare_reports(baseline, _report("1.1.0", 150.0), 0.1)
+        self.assertTrue(regressed)
+        self.assertTrue(any("720p decode" in x and "REGRESSION" in x for x in lines))
+
+    def test_entrypoint(self):
+        lines = list()
+        with TemporaryDirectory() as temp:
+            output = os.path.join(temp, "bench.json")
+            cmdline = ["bench", "--resolutions", "720p", "--frames", "30"]
+            code = entrypoint_main(cmdline + ["-o", output], lines.append)
+            self.assertEqual(0, code)
+            self.assertFalse(lines)
+
+            with open(output, "r", encoding="utf-8") as f:
+                report = json.load(f)
+
+            cmdline += ["--baseline", output, "--tolerance", "1.0"]
+            code = entrypoint_main(cmdline, lines.append)
+            self.assertEqual(0, code)
+            self.assertTrue(lines[0].startswith("Compare avplayer"))
+
+        self.assertEqual(1, len(report["cases"]))
+        case = report["cases"][0]
+        self.assertEqual((1280, 720), (case["width"], case["height"]))
+        self.assertLess(0, case["frames"])
+        stages = set(AVIO_BENCH_STAGES) | set(APP_BENCH_STAGES)
+        self.assertEqual(stages, set(case["stages"]))
+        for stage in stages:
+            self.assertLess(0, case["stages"][stage]["count"])
+
+
+if __name__ == "__main__":
+    main()
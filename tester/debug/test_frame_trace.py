@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import os
+from logging import getLogger
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.av.av_io import AvIo
+from avplayer.debug.frame_trace import (
+    TRACE_STAGE_CALLBACK,
+    TRACE_STAGE_DECODE,
+    TRACE_STAGE_ENCODE,
+    FrameTracer,
+)
+from avplayer.debug.latency_histogram import (
+    LatencyHistogram,
+    bucket_index,
+    bucket_lower_bound,
+    bucket_upper_bound,
+)
+from tester.av.test_av_io import write_test_clip
+
+
+class LatencyHistogramTestCase(TestCase):
+    def test_buckets(self):
+        for value in (0, 1, 7, 8, 15, 16, 1000, 123456789):
+            index = bucket_index(value)
+            self.assertLessEqual(bucket_lower_bound(index), value)
+            self.assertLess(value, bucket_upper_bound(index))
+
+    def test_percentile(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(0.0, histogram.percentile(99))
+        for i in range(1, 1001):
+            histogram.record(i * 1000_000)
+
+        self.assertEqual(1000, histogram.count)
+        self.assertEqual(1.0, histogram.max)
+        self.assertAlmostEqual(0.5, histogram.percentile(50), delta=0.5 * 0.125)
+        self.assertAlmostEqual(0.99, histogram.percentile(99), delta=0.99 * 0.125)
+        self.assertEqual(1.0, histogram.percentile(100))
+
+
+class FrameTracerTestCase(TestCase):
+    def test_spans(self):
+        tracer = FrameTracer("Latency", getLogger(__name__), 100, max_spans=2)
+        span = tracer.begin(0, 1000)
+        span.durations[TRACE_STAGE_DECODE] = 100
+        tracer.stage(0, TRACE_STAGE_CALLBACK, 1500, 1800)
+        tracer.finish(0, 3000)
+
+        self.assertEqual(1, tracer.total.count)
+        self.assertEqual(2000e-9, tracer.total.max)
+        self.assertEqual(1600e-9, tracer.queueing.max)
+        self.assertEqual(300e-9, tracer.stages[TRACE_STAGE_CALLBACK].max)
+
+        for pts in range(1, 4):
+            tracer.begin(pts, 0)
+        tracer.discard(3)
+        self.assertEqual(1, tracer.pending_spans)
+        self.assertEqual(1, tracer.evicted_spans)
+
+    def test_av_io(self):
+        with TemporaryDirectory() as temp:
+            source = os.path.join(temp, "source.mp4")
+            output = os.path.join(temp, "output.mp4")
+            write_test_clip(source, 30)
+
+            avio = AvIo(source, output, file_format="mp4", latency_trace=True)
+            avio.open()
+            try:
+                avio.run(lambda x: x)
+            finally:
+                avio.close()
+
+        tracer = avio.tracer
+        assert tracer is not None
+        self.assertEqual(avio.delivered_frames, tracer.total.count)
+        self.assertEqual(0, tracer.pending_spans)
+        self.assertEqual(tracer.total.count, tracer.stages[TRACE_STAGE_ENCODE].count)
+
+
+if __name__ == "__main__":
+    main()
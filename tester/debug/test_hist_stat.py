@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from logging import getLogger
+from threading import Thread
+from unittest import TestCase, main
+
+from avplayer.debug.hist_stat import HistStat
+
+
+class HistStatTestCase(TestCase):
+    def setUp(self):
+        self.logger = getLogger(__name__)
+
+    def test_record(self):
+        stat = HistStat("Test", self.logger, 1000, alpha=0.5)
+        now = 0
+        for duration in (4_000_000, 2_000_000, 6_000_000):
+            now += 10_000_000
+            stat.record(duration, now)
+
+        self.assertEqual(3, stat.step)
+        self.assertAlmostEqual(0.004, stat.avg)
+        self.assertAlmostEqual(0.002, stat.min)
+        self.assertAlmostEqual(0.006, stat.max)
+        self.assertAlmostEqual(0.0045, stat.ewma)
+        self.assertAlmostEqual(100.0, stat.rate)
+        self.assertAlmostEqual(0.004, stat.percentile(50), delta=0.0005)
+        self.assertIn("[Test] Step #3", stat.get_report())
+
+        stat.clear()
+        self.assertEqual(0, stat.step)
+        self.assertEqual(0.0, stat.rate)
+
+    def test_disabled(self):
+        stat = HistStat("Test", self.logger, 1, enable=False)
+        with stat:
+            pass
+        self.assertEqual(0, stat.step)
+
+    def test_emit(self):
+        stat = HistStat("Test", self.logger, 2, verbose=1, verbose_threshold=1)
+        with self.assertLogs(self.logger, "DEBUG") as logs:
+            for _ in range(4):
+                with stat:
+                    pass
+        self.assertEqual(2, len(logs.output))
+
+    def test_threads(self):
+        stat = HistStat("Test", self.logger, 1000)
+
+        def _record():
+            for i in range(10000):
+                stat.record(i)
+
+        threads = [Thread(target=_record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(40000, stat.step)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from avplayer.apps.defaults.pool import AioPool
+from avplayer.avconfig import AvConfig
+from avplayer.debug.latency_histogram import LatencyHistogram
+from avplayer.debug.metrics import MetricsExporter, MetricsWriter
+from tester.av.test_av_io import write_test_clip
+
+
+class MetricsWriterTestCase(TestCase):
+    def test_render(self):
+        histogram = LatencyHistogram()
+        histogram.record(2_000_000)
+
+        writer = MetricsWriter()
+        writer.counter("frames_total", "Frames", {"source": 'a"b'}, 3)
+        writer.counter("frames_total", "Frames", {"source": "c"}, 4)
+        writer.summary("latency_seconds", "Latency", {"source": "c"}, histogram)
+        lines = writer.render().splitlines()
+
+        self.assertEqual("# TYPE avplayer_frames_total counter", lines[1])
+        self.assertEqual('avplayer_frames_total{source="a\\"b"} 3', lines[2])
+        self.assertEqual('avplayer_frames_total{source="c"} 4', lines[3])
+        self.assertIn(
+            'avplayer_latency_seconds{source="c",quantile="0.99"} 0.002', lines
+        )
+        self.assertIn('avplayer_latency_seconds_count{source="c"} 1', lines)
+
+
+class MetricsExporterTestCase(TestCase):
+    def test_pool(self):
+        with TemporaryDirectory() as temp:
+            source = os.path.join(temp, "source.mp4")
+            write_test_clip(source, 30)
+            configs = {str(i): AvConfig(source, latency_trace=True) for i in range(2)}
+            pool = AioPool(configs)
+            pool.start()
+
+        with MetricsExporter("127.0.0.1", 0) as exporter:
+            exporter.add_source("pool", pool)
+            host, port = exporter.address
+            with urlopen(f"http://{host}:{port}/metrics") as response:
+                body = response.read().decode("utf-8")
+            with self.assertRaises(HTTPError):
+                urlopen(f"http://{host}:{port}/")
+
+        for source_id, source in pool.sources.items():
+            delivered = source.avio.delivered_frames
+            labels = f'source="{source_id}"'
+            self.assertIn(
+                f"avplayer_delivered_frames_total{{{labels}}} {delivered}", body
+            )
+            self.assertIn(f"avplayer_remain_frames{{{labels}}} 0", body)
+            self.assertIn(
+                f'avplayer_stage_duration_seconds_count{{{labels},stage="decode"}}',
+                body,
+            )
+            self.assertIn(f"avplayer_frame_latency_seconds_count{{{labels}}}", body)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter_ns
+from unittest import TestCase, main
+
+from avplayer.av.av_io import AvIo
+from avplayer.debug.frame_trace import (
+    TRACE_STAGE_CALLBACK,
+    TRACE_STAGE_CONVERT,
+    TRACE_STAGE_DECODE,
+    TRACE_STAGE_ENCODE,
+    TRACE_STAGE_READ,
+    TRACE_STAGE_WRITE,
+)
+from avplayer.debug.trace_events import (
+    TraceEventWriter,
+    acquire_trace_writer,
+    release_trace_writer,
+)
+from tester.av.test_av_io import write_test_clip
+
+
+def _load_events(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class TraceEventsTestCase(TestCase):
+    def test_writer(self):
+        with TemporaryDirectory() as temp:
+            path = os.path.join(temp, "trace.json")
+            writer = TraceEventWriter(path, flush_interval=0.01)
+            writer.open()
+
+            def _record():
+                writer.complete("decode", 1000_000, 1500_000, {"pts": 1})
+
+            thread = Thread(target=_record, name="Decoder")
+            thread.start()
+            thread.join()
+            writer.complete("callback", 2000_000, 2250_000)
+            writer.close()
+            events = _load_events(path)
+
+        complete = [e for e in events if e["ph"] == "X"]
+        self.assertEqual(2, len(complete))
+        decode = next(e for e in complete if e["name"] == "decode")
+        self.assertEqual(1000.0, decode["ts"])
+        self.assertEqual(500.0, decode["dur"])
+        self.assertEqual({"pts": 1}, decode["args"])
+
+        names = {
+            e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"
+        }
+        self.assertEqual("Decoder", names[decode["tid"]])
+        self.assertEqual(len(events), writer.written_events)
+
+    def test_shared_writer(self):
+        with TemporaryDirectory() as temp:
+            path = os.path.join(temp, "trace.json")
+            first = acquire_trace_writer(path)
+            second = acquire_trace_writer(path)
+            self.assertIs(first, second)
+
+            first.complete("read", perf_counter_ns(), perf_counter_ns())
+            release_trace_writer(first)
+            second.complete("read", perf_counter_ns(), perf_counter_ns())
+            release_trace_writer(second)
+
+            events = _load_events(path)
+            self.assertEqual(2, len([e for e in events if e["ph"] == "X"]))
+
+    def test_av_io(self):
+        with TemporaryDirectory() as temp:
+            source = os.path.join(temp, "source.mp4")
+            output = os.path.join(temp, "output.mp4")
+            path = os.path.join(temp, "trace.json")
+            write_test_clip(source, 30)
+
+            avio = AvIo(source, output, file_format="mp4", trace_file=path)
+            avio.open()
+            try:
+                self.assertIsNotNone(avio.trace_events)
+                avio.run(lambda x: x)
+            finally:
+                avio.close()
+            self.assertIsNone(avio.trace_events)
+            events = _load_events(path)
+
+        names = {e["name"] for e in events if e["ph"] == "X"}
+        for stage in (
+            TRACE_STAGE_READ,
+            TRACE_STAGE_DECODE,
+            TRACE_STAGE_CONVERT,
+            TRACE_STAGE_CALLBACK,
+            TRACE_STAGE_ENCODE,
+            TRACE_STAGE_WRITE,
+        ):
+            self.assertIn(stage, names)
+
+        callbacks = [e for e in events if e["name"] == TRACE_STAGE_CALLBACK]
+        self.assertEqual(avio.delivered_frames, len(callbacks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import os
+from asyncio import gather
+from asyncio import run as asyncio_run
+from tempfile import TemporaryDirectory
+from time import sleep
+from unittest import TestCase, main
+
+from numpy import full, uint8
+
+from avplayer.apps.defaults.io import IoApp
+from avplayer.avconfig import AvConfig
+from avplayer.mp.process_callback_pool import ProcessCallbackPool
+from tester.av.test_av_io import write_test_clip
+
+
+def _increase(image):
+    image += 1
+    return image
+
+
+def _slow_increase(image):
+    sleep(0.02)
+    return _increase(image)
+
+
+def _downscale(image):
+    return image[::2, ::2].copy()
+
+
+def _odd_only(image):
+    return image if image[0, 0, 0] % 2 else None
+
+
+class ProcessCallbackPoolTestCase(TestCase):
+    def setUp(self):
+        self.images = [full((4, 4, 3), i, dtype=uint8) for i in range(20)]
+
+    def _push_all(self, callback):
+        # Results in shared memory are only valid until the next push/pop.
+        values = list()
+        with ProcessCallbackPool(callback, 2) as pool:
+            for image in self.images:
+                result = pool.push(image)
+                if result is not None:
+                    values.append(int(result[0, 0, 0]))
+            for result in pool.drain():
+                if result is not None:
+                    values.append(int(result[0, 0, 0]))
+        return values
+
+    def test_push_in_order(self):
+        self.assertEqual(list(range(1, 21)), self._push_all(_increase))
+        self.assertEqual(list(range(20)), self._push_all(_downscale))
+        self.assertEqual(list(range(1, 20, 2)), self._push_all(_odd_only))
+
+    def test_apply_in_order(self):
+        async def _main():
+            with ProcessCallbackPool(_increase, 2) as pool:
+                coros = [pool.apply(image) for image in self.images]
+                return await gather(*coros)
+
+        results = asyncio_run(_main())
+        self.assertEqual(list(range(1, 21)), [int(r[0, 0, 0]) for r in results])
+
+    def test_pop_with_pts(self):
+        values = list()
+        with ProcessCallbackPool(_increase, 2) as pool:
+            for pts, image in enumerate(self.images):
+                pool.submit(image, pts * 10)
+                if pool.is_full:
+                    result, pts = pool.pop_with_pts()
+                    values.append((int(result[0, 0, 0]) - 1, pts))
+            for result, pts in pool.drain_with_pts():
+                values.append((int(result[0, 0, 0]) - 1, pts))
+        self.assertEqual([(i, i * 10) for i in range(20)], values)
+
+    def test_latency_trace(self):
+        with TemporaryDirectory() as temp:
+            source = os.path.join(temp, "source.mp4")
+            write_test_clip(source, 30)
+
+            config = AvConfig(source, callback_processes=2, latency_trace=True)
+            app = IoApp(config, _slow_increase)
+            app.start()
+
+        # Each result finishes the span of its own frame, including the drained ones.
+        avio = app.avio
+        tracer = avio.tracer
+        assert tracer is not None
+        self.assertLess(0, avio.delivered_frames)
+        self.assertEqual(avio.delivered_frames, tracer.total.count)
+        self.assertEqual(0, tracer.pending_spans)
+        # No span finishes before the worker has run the callback of its frame.
+        self.assertLessEqual(0.015, tracer.total.percentile(0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import os
+from fractions import Fraction
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from avplayer.av.av_keyframe_index import KeyframeIndex
+from avplayer.mp.sharded_decoder import ShardedDecoder, plan_shards
+from tester.av.test_av_io import write_test_clip
+
+
+def _mean(image):
+    return round(float(image.mean()), 3)
+
+
+class ShardedDecoderTestCase(TestCase):
+    def setUp(self):
+        self._temp = TemporaryDirectory()
+        self.source = os.path.join(self._temp.name, "source.mp4")
+        write_test_clip(self.source, 30)
+
+    def tearDown(self):
+        self._temp.cleanup()
+
+    def test_plan_shards(self):
+        index = KeyframeIndex(Fraction(1, 10), [0, 10, 20], 0, 30, 30)
+        shards = plan_shards(index, 3)
+        self.assertEqual([(0, 10), (10, 20), (20, None)], [s[1:] for s in shards])
+
+        # Shards never split a GOP.
+        self.assertEqual(3, len(plan_shards(index, 8)))
+        self.assertEqual([(0, None)], [s[1:] for s in plan_shards(index, 1)])
+        with self.assertRaises(ValueError):
+            plan_shards(index, 0)
+
+    def test_results(self):
+        from av import open as av_open
+
+        with av_open(self.source) as container:
+            frames = container.decode(video=0)
+            expected = [_mean(f.to_ndarray(format="bgr24")) for f in frames]
+
+        decoder = ShardedDecoder(self.source, _mean, shards=3, processes=2)
+        results = list(decoder.results())
+        self.assertEqual(3, len(decoder.shards))
+        self.assertEqual(expected, [r for _, r in results])
+        self.assertEqual([i / 25 for i in range(30)], [s for s, _ in results])
+
+
+if __name__ == "__main__":
+    main()